@@ -6,13 +6,17 @@ Enhances screen reader accessibility and keyboard navigation
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
+from rule_engine import apply_rule, compile_rules
 
 # ARIA label improvements
 ARIA_IMPROVEMENTS = [
-    # Navigation menu button
+    # Navigation menu button - the attribute-appending rules skip tags that already
+    # carry an aria-label, so a rerun over the pass's own output is a no-op
     (
-        r'(<div class="navbar_menu-button w-nav-button"[^>]*?)(>)',
+        r'(<div class="navbar_menu-button w-nav-button"(?![^>]*aria-label=)[^>]*?)(>)',
         r'\1 aria-label="Open main navigation menu" aria-expanded="false"\2'
     ),
 
@@ -93,7 +97,7 @@ ARIA_IMPROVEMENTS = [
 
     # Search/Filter if exists
     (
-        r'(<input[^>]*type="text"[^>]*class="[^"]*search[^"]*"[^>]*)(>)',
+        r'(<input(?![^>]*aria-label=)[^>]*type="text"[^>]*class="[^"]*search[^"]*"[^>]*)(>)',
         r'\1 aria-label="Search treatments"\2'
     ),
 
@@ -104,17 +108,23 @@ ARIA_IMPROVEMENTS = [
     ),
 ]
 
+# Compiled once at import
+ARIA_RULES = compile_rules(ARIA_IMPROVEMENTS, name='ARIA_IMPROVEMENTS')
+
+ARIA_LABEL_PATTERN = re.compile(r'aria-label="([^"]+)"')
+
 def add_aria_labels(content):
     """Apply ARIA label improvements"""
     changes = []
 
-    for pattern, replacement in ARIA_IMPROVEMENTS:
-        matches = re.findall(pattern, content)
-        if matches:
-            content = re.sub(pattern, replacement, content)
+    for regex, replacement in ARIA_RULES:
+        new_content, count = apply_rule(content, regex, replacement)
+        # Rules that rewrite a tag to the text it already has are not changes
+        if count and new_content != content:
+            content = new_content
             # Extract what was added
             if 'aria-label="' in replacement:
-                label = re.search(r'aria-label="([^"]+)"', replacement)
+                label = ARIA_LABEL_PATTERN.search(replacement)
                 if label:
                     changes.append(f"  - Added: {label.group(1)}")
 
@@ -134,10 +144,8 @@ def process_file(file_path):
     print(f"Existing ARIA attributes: {existing_aria}")
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.aria_backup_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'aria')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Add ARIA labels
     new_content, changes = add_aria_labels(content)
@@ -147,7 +155,7 @@ def process_file(file_path):
     added = new_aria - existing_aria
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ ARIA improvements:")
     for change in changes:
@@ -6,7 +6,9 @@ Phase 4.3: Smooth animations, transitions, and interactive feedback
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
 
 # Micro-interactions CSS
 MICRO_INTERACTIONS_CSS = '''
@@ -340,10 +342,8 @@ def process_file(file_path):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.interactions_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'interactions')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Add micro-interactions
     new_content, changes = add_micro_interactions(content)
@@ -353,7 +353,7 @@ def process_file(file_path):
         return True
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Micro-interactions added:")
     for change in changes:
@@ -6,7 +6,9 @@ Phase 3.4: Responsive dosage tables, touch targets, mobile layout
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
 
 # Mobile optimization CSS to add before </head>
 MOBILE_OPTIMIZATION_CSS = '''
@@ -251,6 +253,18 @@ def add_mobile_script(content):
 
     return content, changes
 
+def apply_mobile_optimizations(content):
+    """Add mobile CSS and the mobile interaction script"""
+    all_changes = []
+
+    content, changes1 = add_mobile_css(content)
+    all_changes.extend(changes1)
+
+    content, changes2 = add_mobile_script(content)
+    all_changes.extend(changes2)
+
+    return content, all_changes
+
 def process_file(file_path):
     """Process a single file with mobile optimizations"""
     print(f"\n{'='*60}")
@@ -261,26 +275,18 @@ def process_file(file_path):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.mobile_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
-
-    all_changes = []
+    blob = backup_page(file_path, content, 'mobile')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Apply mobile optimizations
-    new_content, changes1 = add_mobile_css(content)
-    all_changes.extend(changes1)
-
-    new_content, changes2 = add_mobile_script(new_content)
-    all_changes.extend(changes2)
+    new_content, all_changes = apply_mobile_optimizations(content)
 
     if not all_changes:
         print("✓ Mobile optimizations already present")
         return True
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Mobile optimizations added:")
     for change in all_changes:
@@ -6,7 +6,10 @@ Phase 2.4: Preconnect links, deferred scripts, lazy loading
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from image_dimensions import add_image_dimensions
+from page_writer import write_page
 
 # Performance optimization additions
 PERFORMANCE_HEAD_TAGS = '''
@@ -76,22 +79,17 @@ def defer_scripts(content):
 
     return content, changes
 
-def optimize_images(content):
+def optimize_images(content, base_path):
     """Enhance image loading with explicit dimensions where missing"""
     changes = []
 
     # Count images with loading="lazy"
-    lazy_images = len(re.findall(r'loading="lazy"', content))
+    lazy_images = content.count('loading="lazy"')
     changes.append(f"  - Verified {lazy_images} images with lazy loading")
 
-    # Check for images without width/height (potential CLS issues)
-    images_without_dimensions = re.findall(
-        r'<img[^>]*(?<!width=")[^>]*(?<!height=")[^>]*src="[^"]*"[^>]*>',
-        content
-    )
-
-    if images_without_dimensions:
-        changes.append(f"  - Note: {len(images_without_dimensions)} images could benefit from explicit dimensions")
+    # Write intrinsic width/height so the browser reserves space (no layout shift)
+    content, dimension_changes = add_image_dimensions(content, base_path)
+    changes.extend(dimension_changes)
 
     return content, changes
 
@@ -112,6 +110,18 @@ def add_resource_hints(content):
 
     return content, changes
 
+def apply_performance_optimizations(content, base_path):
+    """Run every performance optimization in order"""
+    all_changes = []
+
+    optimizations = (add_performance_tags, defer_scripts,
+                     lambda content: optimize_images(content, base_path), add_resource_hints)
+    for optimize in optimizations:
+        content, changes = optimize(content)
+        all_changes.extend(changes)
+
+    return content, all_changes
+
 def process_file(file_path):
     """Process a single file with performance optimizations"""
     print(f"\n{'='*60}")
@@ -122,29 +132,15 @@ def process_file(file_path):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.perf_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
-
-    all_changes = []
+    blob = backup_page(file_path, content, 'perf')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Apply optimizations
-    new_content, changes1 = add_performance_tags(content)
-    all_changes.extend(changes1)
-
-    new_content, changes2 = defer_scripts(new_content)
-    all_changes.extend(changes2)
-
-    new_content, changes3 = optimize_images(new_content)
-    all_changes.extend(changes3)
-
-    new_content, changes4 = add_resource_hints(new_content)
-    all_changes.extend(changes4)
+    new_content, all_changes = apply_performance_optimizations(content, file_path.parent)
 
     # Write back if changes were made
     if new_content != content:
-        file_path.write_text(new_content, encoding='utf-8')
+        write_page(file_path, new_content, content)
         print(f"\n✓ Performance optimizations applied:")
     else:
         print(f"\n✓ Performance analysis:")
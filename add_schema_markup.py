@@ -7,7 +7,9 @@ Enables rich snippets in Google search results
 import re
 import json
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
 
 # Organization schema (same for all pages)
 ORGANIZATION_SCHEMA = {
@@ -156,6 +158,25 @@ def create_breadcrumb_schema(page_name):
         ]
     }
 
+# Schemas injected into each page
+PAGE_SCHEMAS = {
+    'mens-health.html': [
+        ORGANIZATION_SCHEMA,
+        MENS_HEALTH_SCHEMA,
+        create_breadcrumb_schema("Men's Health")
+    ],
+    'recovery.html': [
+        ORGANIZATION_SCHEMA,
+        RECOVERY_SCHEMA,
+        create_breadcrumb_schema("Recovery")
+    ],
+    'weight-management.html': [
+        ORGANIZATION_SCHEMA,
+        WEIGHT_MANAGEMENT_SCHEMA,
+        create_breadcrumb_schema("Weight Management")
+    ]
+}
+
 def create_schema_script_tags(schemas):
     """Convert schema objects to JSON-LD script tags"""
     tags = []
@@ -165,6 +186,30 @@ def create_schema_script_tags(schemas):
         tags.append(tag)
     return ''.join(tags)
 
+def add_schema_markup(content, schemas):
+    """Insert JSON-LD script tags before </head>"""
+    changes = []
+
+    # Check if schema already exists
+    if 'application/ld+json' in content:
+        changes.append("  - Schema markup already exists")
+        return content, changes
+
+    if '</head>' not in content:
+        changes.append("  - Warning: Could not find </head> tag")
+        return content, changes
+
+    # Insert schema markup
+    schema_html = create_schema_script_tags(schemas)
+    content = content.replace('</head>', f'\n<!-- Structured Data / Schema.org Markup -->\n{schema_html}</head>')
+
+    for schema in schemas:
+        schema_type = schema.get('@type', 'Unknown')
+        schema_name = schema.get('name', schema_type)
+        changes.append(f"  - {schema_type}: {schema_name}")
+
+    return content, changes
+
 def add_schema_to_file(file_path, schemas):
     """Add schema markup to HTML file"""
     print(f"\n{'='*60}")
@@ -180,30 +225,22 @@ def add_schema_to_file(file_path, schemas):
         return False
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.schema_backup_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
-
-    # Create schema script tags
-    schema_html = create_schema_script_tags(schemas)
+    blob = backup_page(file_path, content, 'schema')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Insert before closing </head> tag
     if '</head>' not in content:
         print(f"✗ Error: Could not find </head> tag")
         return False
 
-    # Insert schema markup
-    new_content = content.replace('</head>', f'\n<!-- Structured Data / Schema.org Markup -->\n{schema_html}</head>')
+    new_content, changes = add_schema_markup(content, schemas)
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"✓ Added {len(schemas)} schema objects:")
-    for schema in schemas:
-        schema_type = schema.get('@type', 'Unknown')
-        schema_name = schema.get('name', schema_type)
-        print(f"  - {schema_type}: {schema_name}")
+    for change in changes:
+        print(change)
 
     print(f"✓ File updated: {file_path.name}")
 
@@ -217,28 +254,10 @@ def main():
 
     base_path = Path("/Users/raiyanabdullah/Desktop/Evolife FInal and last")
 
-    pages = [
-        ('mens-health.html', [
-            ORGANIZATION_SCHEMA,
-            MENS_HEALTH_SCHEMA,
-            create_breadcrumb_schema("Men's Health")
-        ]),
-        ('recovery.html', [
-            ORGANIZATION_SCHEMA,
-            RECOVERY_SCHEMA,
-            create_breadcrumb_schema("Recovery")
-        ]),
-        ('weight-management.html', [
-            ORGANIZATION_SCHEMA,
-            WEIGHT_MANAGEMENT_SCHEMA,
-            create_breadcrumb_schema("Weight Management")
-        ])
-    ]
-
     success_count = 0
     total_schemas = 0
 
-    for filename, schemas in pages:
+    for filename, schemas in PAGE_SCHEMAS.items():
         file_path = base_path / filename
         if file_path.exists():
             if add_schema_to_file(file_path, schemas):
@@ -6,7 +6,9 @@ Handles minified HTML on single lines
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
 
 # SEO Tag Definitions
 SEO_TAGS = {
@@ -74,28 +76,15 @@ def create_seo_block(page_config):
 
 '''
 
-def add_seo_to_file(file_path, page_name):
-    """Add SEO tags to a single HTML file"""
-    print(f"\n{'='*60}")
-    print(f"Processing: {page_name}")
-    print(f"{'='*60}")
-
-    # Read file
-    content = file_path.read_text(encoding='utf-8')
+def add_seo_tags(content, seo_config):
+    """Insert the SEO block right after <head>"""
+    changes = []
 
     # Check if SEO tags already exist
     if '<title>' in content:
-        print(f"⚠ Warning: Page already has a <title> tag. Skipping to avoid duplicates.")
-        return False
+        changes.append("  - Page already has a <title> tag")
+        return content, changes
 
-    # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.seo_backup_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
-
-    # Get SEO config
-    seo_config = SEO_TAGS[file_path.name]
     seo_block = create_seo_block(seo_config)
 
     # Find insertion point (right after <head>)
@@ -103,16 +92,45 @@ def add_seo_to_file(file_path, page_name):
     pattern = r'(<head[^>]*>)'
 
     if not re.search(pattern, content):
-        print(f"✗ Error: Could not find <head> tag")
-        return False
+        changes.append("  - Warning: Could not find <head> tag")
+        return content, changes
 
     # Insert SEO block right after <head>
-    new_content = re.sub(
+    content = re.sub(
         pattern,
         r'\1' + seo_block,
         content,
         count=1
     )
+    changes.append(f"  - Title: {seo_config['title'][:60]}...")
+    changes.append(f"  - Meta Description: {len(seo_config['description'])} chars")
+    changes.append("  - Open Graph tags: 5 tags")
+    changes.append("  - Twitter Card tags: 5 tags")
+    changes.append("  - Additional meta tags: 5 tags")
+
+    return content, changes
+
+def add_seo_to_file(file_path, page_name):
+    """Add SEO tags to a single HTML file"""
+    print(f"\n{'='*60}")
+    print(f"Processing: {page_name}")
+    print(f"{'='*60}")
+
+    # Read file
+    content = file_path.read_text(encoding='utf-8')
+
+    # Check if SEO tags already exist
+    if '<title>' in content:
+        print(f"⚠ Warning: Page already has a <title> tag. Skipping to avoid duplicates.")
+        return False
+
+    # Create backup
+    blob = backup_page(file_path, content, 'seo')
+    print(f"✓ Backup stored: {blob[:12]}")
+
+    # Get SEO config
+    seo_config = SEO_TAGS[file_path.name]
+    new_content, changes = add_seo_tags(content, seo_config)
 
     # Verify insertion
     if '<title>' not in new_content:
@@ -120,14 +138,11 @@ def add_seo_to_file(file_path, page_name):
         return False
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"✓ Added SEO tags:")
-    print(f"  - Title: {seo_config['title'][:60]}...")
-    print(f"  - Meta Description: {len(seo_config['description'])} chars")
-    print(f"  - Open Graph tags: 5 tags")
-    print(f"  - Twitter Card tags: 5 tags")
-    print(f"  - Additional meta tags: 5 tags")
+    for change in changes:
+        print(change)
     print(f"✓ File updated: {file_path.name}")
 
     return True
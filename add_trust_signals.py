@@ -6,7 +6,9 @@ Phase 3.2: HIPAA compliance, medical licensing, security badges
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
 
 # Trust signals HTML to add in footer area
 TRUST_SIGNALS_HTML = '''
@@ -119,6 +121,21 @@ def enhance_footer_disclaimer(content):
 
     return content, changes
 
+def add_trust_signals(content):
+    """Apply all trust signal additions"""
+    all_changes = []
+
+    content, changes1 = add_trust_signals_footer(content)
+    all_changes.extend(changes1)
+
+    content, changes2 = add_hipaa_to_expert_care(content)
+    all_changes.extend(changes2)
+
+    content, changes3 = enhance_footer_disclaimer(content)
+    all_changes.extend(changes3)
+
+    return content, all_changes
+
 def process_file(file_path):
     """Process a single file with trust signals"""
     print(f"\n{'='*60}")
@@ -129,29 +146,18 @@ def process_file(file_path):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.trust_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
-
-    all_changes = []
+    blob = backup_page(file_path, content, 'trust')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Apply trust signal additions
-    new_content, changes1 = add_trust_signals_footer(content)
-    all_changes.extend(changes1)
-
-    new_content, changes2 = add_hipaa_to_expert_care(new_content)
-    all_changes.extend(changes2)
-
-    new_content, changes3 = enhance_footer_disclaimer(new_content)
-    all_changes.extend(changes3)
+    new_content, all_changes = add_trust_signals(content)
 
     if not all_changes or all_changes == ["  - Trust signals already present"]:
         print("✓ Trust signals already added")
         return True
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Trust signals added:")
     for change in all_changes:
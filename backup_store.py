@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Content-addressed, deduplicating backup store for page rewrites
+Snapshots are zlib-compressed blobs keyed by SHA-256; a journal maps (page, run, pass) to blobs
+Replaces the timestamped .perf_<ts>.html / .faq_backup_<ts>.html style copies
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+from datetime import datetime
+
+from page_writer import write_page
+
+STORE_DIR = '.evolife-backups'
+JOURNAL_NAME = 'journal.jsonl'
+COMPRESSION_LEVEL = 9
+
+# One run id per process, in the same format the old backup names used
+RUN_ID = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+# Legacy backup files left in the tree by the old scripts
+LEGACY_PATTERNS = ['*.backup.html', '*.html.backup', '*.html.bak_*', '*.*_backup_*.html', '*.backup_*.html',
+                   '*.perf_*.html', '*.mobile_*.html', '*.interactions_*.html', '*.contrast_*.html',
+                   '*.trust_*.html', '*.brand_*.html', '*.cta_*.html', '*.testimonials_*.html',
+                   '*.alt_enhanced_*.html', '*.content_fix_*.html', '*.pipeline_*.html',
+                   '*.pre_treatment_removal.html']
+
+def store_path(base_path):
+    """Root of the backup store for a site"""
+    return Path(base_path) / STORE_DIR
+
+def blob_path(base_path, blob):
+    """Path of a blob, fanned out by the first two hex digits"""
+    return store_path(base_path) / 'objects' / blob[:2] / blob[2:]
+
+def store_blob(base_path, content):
+    """Store page content once and return its hash"""
+    data = content.encode('utf-8')
+    blob = hashlib.sha256(data).hexdigest()
+    path = blob_path(base_path, blob)
+
+    # Identical snapshots are only written the first time
+    if path.exists():
+        return blob
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(zlib.compress(data, COMPRESSION_LEVEL))
+    os.replace(tmp_path, path)
+
+    return blob
+
+def load_blob(base_path, blob):
+    """Return the page content stored under a hash"""
+    return zlib.decompress(blob_path(base_path, blob).read_bytes()).decode('utf-8')
+
+def append_journal(base_path, entries):
+    """Append journal entries - one JSON object per line"""
+    path = store_path(base_path) / JOURNAL_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = ''.join(json.dumps(entry, sort_keys=True) + '\n' for entry in entries)
+    # One append-mode write per call keeps lines whole when workers share the journal
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(lines)
+
+def read_journal(base_path, page_name=None):
+    """Return journal entries, oldest first, optionally for one page"""
+    path = store_path(base_path) / JOURNAL_NAME
+    if not path.exists():
+        return []
+
+    entries = []
+    for line in path.read_text(encoding='utf-8').splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if page_name is None or entry['page'] == page_name:
+            entries.append(entry)
+    return entries
+
+def journal_entry(page_name, blob, pass_name, run_id=None):
+    """Build a journal entry for a snapshot"""
+    return {
+        'page': page_name,
+        'run': run_id or RUN_ID,
+        'pass': pass_name,
+        'blob': blob,
+        'time': datetime.now().isoformat(timespec='seconds'),
+    }
+
+def backup_page(file_path, content, pass_name, run_id=None):
+    """Snapshot a page's content before a pass rewrites it"""
+    blob = store_blob(file_path.parent, content)
+    append_journal(file_path.parent, [journal_entry(file_path.name, blob, pass_name, run_id)])
+    return blob
+
+def restore_page(base_path, page_name, run_id):
+    """Roll a page back to how it was before the given run"""
+    entries = [entry for entry in read_journal(base_path, page_name) if entry['run'] == run_id]
+    if not entries:
+        raise KeyError(f"No backup of {page_name} in run {run_id}")
+
+    # The first snapshot of a run is the page before that run touched it
+    content = load_blob(base_path, entries[0]['blob'])
+    write_page(Path(base_path) / page_name, content)
+    return entries[0]
+
+def import_legacy_backups(base_path, delete=False):
+    """Move old timestamped backup copies into the store"""
+    base_path = Path(base_path)
+    imported = []
+
+    legacy_paths = sorted({path for pattern in LEGACY_PATTERNS for path in base_path.glob(pattern)})
+    for legacy_path in legacy_paths:
+        page_name = legacy_path.name.split('.', 1)[0] + '.html'
+        content = legacy_path.read_text(encoding='utf-8')
+        blob = store_blob(base_path, content)
+        run_id = datetime.fromtimestamp(legacy_path.stat().st_mtime).strftime('%Y%m%d_%H%M%S')
+        entry = journal_entry(page_name, blob, f'legacy:{legacy_path.name}', run_id)
+        imported.append(entry)
+        if delete:
+            legacy_path.unlink()
+
+    append_journal(base_path, imported)
+    return imported
+
+def store_size(base_path):
+    """Total bytes used by stored blobs"""
+    objects = store_path(base_path) / 'objects'
+    return sum(path.stat().st_size for path in objects.rglob('*') if path.is_file())
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Inspect and restore page backups")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = subparsers.add_parser('list', help="list backups, optionally for one page")
+    list_parser.add_argument('page', nargs='?')
+
+    restore_parser = subparsers.add_parser('restore', help="roll a page back to before a run")
+    restore_parser.add_argument('page')
+    restore_parser.add_argument('run')
+
+    import_parser = subparsers.add_parser('import', help="move legacy *.backup.html / .bak_* copies into the store")
+    import_parser.add_argument('--delete', action='store_true', help="delete the legacy files after importing")
+
+    args = parser.parse_args(argv)
+    base_path = Path(__file__).parent
+
+    if args.command == 'list':
+        entries = read_journal(base_path, args.page)
+        for entry in entries:
+            print(f"{entry['run']}  {entry['page']:45} {entry['pass']:25} {entry['blob'][:12]}")
+        blobs = {entry['blob'] for entry in entries}
+        print(f"\n{len(entries)} snapshots, {len(blobs)} unique blobs")
+        print(f"Store size: {store_size(base_path) / 1024:.1f} KB")
+
+    elif args.command == 'restore':
+        try:
+            entry = restore_page(base_path, args.page, args.run)
+        except KeyError as e:
+            raise SystemExit(f"✗ {e.args[0]}")
+        print(f"✓ Restored {args.page} from run {entry['run']} ({entry['pass']}, {entry['blob'][:12]})")
+
+    elif args.command == 'import':
+        imported = import_legacy_backups(base_path, delete=args.delete)
+        print(f"✓ Imported {len(imported)} legacy backups "
+              f"({len({entry['blob'] for entry in imported})} unique blobs)")
+        print(f"  Store size: {store_size(base_path) / 1024:.1f} KB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Benchmark every pipeline pass on fixed page corpora
+Reports per-page latency percentiles, throughput and peak memory per pass,
+and saves JSON baselines under benchmarks/ so regressions show up in review
+"""
+
+import argparse
+import gc
+import io
+import json
+import math
+import platform
+import random
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+
+import page_writer
+from pipeline import pass_pages, select_passes
+
+BASELINE_DIR = 'benchmarks'
+
+# Real pages the corpus is drawn from
+CORPUS_PAGES = ['index.html', 'compounded-medications.html',
+                'mens-health.html', 'recovery.html', 'weight-management.html']
+
+# Synthetic corpora: name -> page count
+SYNTHETIC_SIZES = {'synthetic-1k': 1000, 'synthetic-10k': 10000}
+DEFAULT_SEED = 20251103
+
+# The real corpus is small, so it is timed several times for stable percentiles
+DEFAULT_REPEATS = {'real': 5}
+
+# Pages traced for peak memory per pass (tracing slows the timed loop, so it runs separately)
+MEMORY_SAMPLE = 20
+
+# Relative slowdown that counts as a regression in --compare,
+# ignored below an absolute change where timer noise dominates
+DEFAULT_THRESHOLD = 0.25
+MIN_DELTA_MS = 0.5
+
+# A pass's own noise: a change within this many times the spread of a percentile
+# across the repeats (of the baseline or of this run) is not reported
+NOISE_FACTOR = 1.5
+
+# A shared runner can be uniformly slower from one process to the next. With at least
+# this many passes compared, each is judged against the median slowdown of all of them
+MIN_PASSES_FOR_SPEED = 8
+
+FILLER_WORDS = ['energy', 'recovery', 'metabolism', 'provider', 'treatment', 'wellness', 'clinician',
+                'results', 'support', 'personalized', 'health', 'plan', 'licensed', 'weekly', 'goals']
+
+def load_real_corpus(base_path):
+    """(name, content) for each real corpus page"""
+    return [(name, (base_path / name).read_text(encoding='utf-8'))
+            for name in CORPUS_PAGES if (base_path / name).exists()]
+
+def filler_section(rng, index):
+    """A seeded content section with the markup the passes look for"""
+    heading = ' '.join(rng.choices(FILLER_WORDS, k=rng.randint(3, 8))).capitalize()
+    text = ' '.join(rng.choices(FILLER_WORDS, k=rng.randint(40, 200)))
+    return (f'<section class="section_synthetic"><div class="container-large">'
+            f'<h2 class="heading-style-h2">{heading}</h2><p class="text-size-medium">{text}</p>'
+            f'<img loading="lazy" src="assets/images/synthetic-{index}.webp" alt="" class="edge__card-img">'
+            f'<a href="/get-started.html?category=synthetic" class="button-18 w-button">Get Started</a>'
+            f'</div></section>')
+
+def synthetic_corpus(templates, count, seed):
+    """Lazily generate `count` pages from the real templates
+
+    Page i only depends on (seed, i), so every pass sees the same corpus
+    without it ever being held in memory.
+    """
+    for i in range(count):
+        rng = random.Random(f'{seed}:{i}')
+        template_name, content = rng.choice(templates)
+        sections = ''.join(filler_section(rng, n) for n in range(rng.randint(0, 12)))
+        content = content.replace('</body>', sections + '</body>', 1)
+        # Synthetic pages keep their template's name so passes pick the same configuration
+        yield template_name, content
+
+def config_path(base_path, page_name, pages):
+    """Path a pass sees for a page: the page itself, or the first page the pass is configured for"""
+    if pages is None or page_name in pages:
+        return base_path / page_name
+    return base_path / pages[0]
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def time_corpus(entry, corpus, base_path, sink):
+    """Time one pass over the corpus once; returns (sorted latencies, bytes processed)"""
+    _name, _module_name, function, _pages = entry
+    pages = pass_pages(entry)
+    run = []
+    total_bytes = 0
+    for page_name, content in corpus():
+        file_path = config_path(base_path, page_name, pages)
+        start = time.perf_counter()
+        function(content, file_path)
+        run.append(time.perf_counter() - start)
+        total_bytes += len(content.encode('utf-8'))
+        sink.seek(0)
+        sink.truncate()
+        page_writer.take_diffs()
+    return sorted(run), total_bytes
+
+def peak_memory(entry, corpus, base_path):
+    """Peak traced memory of one pass over a sample of the corpus"""
+    _name, _module_name, function, _pages = entry
+    pages = pass_pages(entry)
+    peak = 0
+    for index, (page_name, content) in enumerate(corpus()):
+        if index == MEMORY_SAMPLE:
+            break
+        file_path = config_path(base_path, page_name, pages)
+        tracemalloc.start()
+        function(content, file_path)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return peak
+
+def summarize(runs, total_bytes, peak):
+    """Percentiles, throughput and noise of one pass's timed runs"""
+    latencies = sorted(latency for run in runs for latency in run)
+    total_time = sum(latencies)
+
+    def spread_ms(p):
+        """Range of a percentile across the repeats"""
+        values = [percentile(run, p) for run in runs]
+        return round((max(values) - min(values)) * 1000, 4)
+
+    return {
+        'pages': len(latencies),
+        'mb': round(total_bytes / 1e6, 3),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 4),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 4),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 4),
+        'mb_per_s': round(total_bytes / 1e6 / total_time, 2) if total_time else None,
+        'peak_kb': round(peak / 1024, 1),
+        'p50_noise_ms': spread_ms(50),
+        'p95_noise_ms': spread_ms(95),
+    }
+
+def benchmark_passes(passes, corpus, base_path, repeats):
+    """Time every pass over a corpus and trace its peak memory; returns name -> result
+
+    The repeats are interleaved - each round runs every pass once - so a slow stretch
+    of the machine is spread across the passes and shows up in each one's noise,
+    instead of landing on whichever pass was being timed.
+    """
+    runs = {entry[0]: [] for entry in passes}
+    total_bytes = dict.fromkeys(runs, 0)
+    sink = io.StringIO()
+
+    # Untimed first call: a pass module is imported and its tables compiled on first use
+    with redirect_stdout(sink):
+        for entry in passes:
+            for page_name, content in corpus():
+                entry[2](content, config_path(base_path, page_name, pass_pages(entry)))
+                break
+
+    for round_number in range(repeats):
+        print(f"  … round {round_number + 1}/{repeats}", flush=True)
+        # Collector pauses land on whichever page allocates past the threshold; like
+        # timeit, collect up front and keep the collector off while timing
+        gc.collect()
+        gc.disable()
+        try:
+            with redirect_stdout(sink):
+                for entry in passes:
+                    run, size = time_corpus(entry, corpus, base_path, sink)
+                    runs[entry[0]].append(run)
+                    total_bytes[entry[0]] += size
+        finally:
+            gc.enable()
+
+    with redirect_stdout(sink):
+        return {entry[0]: summarize(runs[entry[0]], total_bytes[entry[0]], peak_memory(entry, corpus, base_path))
+                for entry in passes}
+
+def print_results(results):
+    """Print the per-pass table"""
+    print(f"\n{'Pass':24} {'pages':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'MB/s':>9} {'peak KB':>9}")
+    print("-"*80)
+    for name, result in results.items():
+        mb_per_s = f"{result['mb_per_s']:.1f}" if result['mb_per_s'] is not None else '-'
+        print(f"{name:24} {result['pages']:6} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} "
+              f"{result['p99_ms']:9.3f} {mb_per_s:>9} {result['peak_kb']:9.1f}")
+
+def machine_speed(results, baseline):
+    """Median p50 ratio to the baseline over the passes slow enough to time, or 1.0 if too few"""
+    ratios = sorted(result['p50_ms'] / baseline['passes'][name]['p50_ms'] for name, result in results.items()
+                    if baseline['passes'].get(name, {}).get('p50_ms', 0) >= MIN_DELTA_MS)
+    if len(ratios) < MIN_PASSES_FOR_SPEED:
+        return 1.0
+    return ratios[len(ratios) // 2]
+
+def compare_results(results, baseline, threshold):
+    """Print changes against a saved baseline; returns the regressed pass names"""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline['meta']['date']} ({baseline['meta']['python']}):")
+    speed = machine_speed(results, baseline)
+    if speed != 1.0:
+        print(f"  Machine speed: passes take {speed:.2f}x their baseline time overall; changes are relative to that")
+    for name, result in results.items():
+        previous = baseline['passes'].get(name)
+        if previous is None:
+            print(f"  + {name}: new pass")
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if not previous[metric]:
+                continue
+            expected = previous[metric] * speed
+            change = result[metric] / expected - 1
+            # Baselines saved before noise was recorded fall back to the fixed floor
+            noise = max(previous.get(f'{metric[:3]}_noise_ms', 0) * speed, result[f'{metric[:3]}_noise_ms'])
+            if abs(result[metric] - expected) < max(MIN_DELTA_MS, NOISE_FACTOR * noise):
+                continue
+            if change > threshold:
+                regressions.append(name)
+                print(f"  ⚠ {name}: {metric} {previous[metric]:.3f} → {result[metric]:.3f} ({change:+.0%})")
+            elif change < -threshold:
+                print(f"  ✓ {name}: {metric} {previous[metric]:.3f} → {result[metric]:.3f} ({change:+.0%})")
+    if not regressions:
+        print(f"  ✓ No pass slower than {threshold:.0%}")
+    return sorted(set(regressions))
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline passes")
+    parser.add_argument('--corpus', choices=['real', *SYNTHETIC_SIZES], default='real',
+                        help="page corpus to run (default: real)")
+    parser.add_argument('--pass', dest='passes', action='append', metavar='NAME',
+                        help="benchmark only this pass (repeatable, default: all)")
+    parser.add_argument('--repeat', type=int, help="times to run the corpus per pass")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="seed for synthetic corpora")
+    parser.add_argument('--save', action='store_true', help=f"write the results as the baseline in {BASELINE_DIR}/")
+    parser.add_argument('--compare', action='store_true', help="compare the results with the saved baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="relative slowdown reported as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    base_path = Path(__file__).parent
+    passes = select_passes(args.passes)
+    # Passes that write files of their own (shared stylesheets, caches) only diff them
+    page_writer.set_dry_run(True)
+    repeats = args.repeat or DEFAULT_REPEATS.get(args.corpus, 1)
+
+    real_corpus = load_real_corpus(base_path)
+    if args.corpus == 'real':
+        corpus = lambda: iter(real_corpus)
+    else:
+        corpus = lambda: synthetic_corpus(real_corpus, SYNTHETIC_SIZES[args.corpus], args.seed)
+
+    print("\n" + "="*60)
+    print(f"EVOLIFE - PASS BENCHMARK ({args.corpus}, {repeats}x)")
+    print("="*60)
+
+    results = benchmark_passes(passes, corpus, base_path, repeats)
+
+    print_results(results)
+
+    baseline_path = base_path / BASELINE_DIR / f'{args.corpus}.json'
+    regressions = []
+    if args.compare:
+        if baseline_path.exists():
+            baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+            regressions = compare_results(results, baseline, args.threshold)
+        else:
+            print(f"\n⚠ No baseline at {baseline_path.relative_to(base_path)} - run with --save first")
+
+    if args.save:
+        baseline_path.parent.mkdir(exist_ok=True)
+        baseline = {
+            'meta': {
+                'corpus': args.corpus,
+                'repeats': repeats,
+                'seed': args.seed,
+                'python': platform.python_version(),
+                'date': datetime.now().isoformat(timespec='seconds'),
+            },
+            'passes': results,
+        }
+        baseline_path.write_text(json.dumps(baseline, indent=2) + '\n', encoding='utf-8')
+        print(f"\n✓ Baseline saved: {baseline_path.relative_to(base_path)}")
+
+    if regressions:
+        raise SystemExit(f"\n✗ Regressions: {', '.join(regressions)}")
+
+if __name__ == "__main__":
+    main()
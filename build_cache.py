@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Incremental rebuild manifest for the page pipeline
+Records each page's content hash and the rule-set hash of every pass that ran on it,
+so reruns skip pages whose input and rules are unchanged without opening them
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+CACHE_DIR = '.evolife-cache'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+def content_sha256(content):
+    """SHA-256 of page text as written to disk"""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+def file_sha256(file_path):
+    """SHA-256 of a file's bytes"""
+    return hashlib.sha256(Path(file_path).read_bytes()).hexdigest()
+
+@lru_cache(maxsize=None)
+def rules_hash(*source_paths):
+    """Rule-set version of a pass: hash of the source files that define it"""
+    digest = hashlib.sha256()
+    for source_path in source_paths:
+        digest.update(Path(source_path).read_bytes())
+    return digest.hexdigest()
+
+def manifest_path(base_path):
+    """Location of the manifest for a site root"""
+    return Path(base_path) / CACHE_DIR / MANIFEST_NAME
+
+def load_manifest(base_path):
+    """Load the manifest, or start an empty one if missing or outdated"""
+    path = manifest_path(base_path)
+    try:
+        manifest = json.loads(path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+
+    if manifest.get('version') != MANIFEST_VERSION:
+        manifest = {'version': MANIFEST_VERSION, 'pages': {}}
+
+    return manifest
+
+def save_manifest(base_path, manifest):
+    """Write the manifest atomically"""
+    path = manifest_path(base_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def page_is_current(manifest, file_path, pass_hashes):
+    """True if the page and the rules of every pass for it are unchanged
+
+    Pages whose size and mtime match the manifest are never opened. If only
+    the mtime moved (checkout, touch), the content hash decides.
+    """
+    entry = manifest['pages'].get(file_path.name)
+    if entry is None:
+        return False
+
+    recorded = entry['passes']
+    if any(recorded.get(name) != version for name, version in pass_hashes.items()):
+        return False
+
+    stat = file_path.stat()
+    if stat.st_size != entry['size']:
+        return False
+    if stat.st_mtime_ns == entry['mtime_ns']:
+        return True
+
+    if file_sha256(file_path) != entry['sha256']:
+        return False
+
+    # Same bytes, new mtime: remember the new stat so the next check is free
+    entry['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+def record_page(manifest, file_path, sha256, pass_hashes, changed, resumed=False):
+    """Store a page's post-run state
+
+    When the run rewrote the page, results of passes that did not run this
+    time no longer describe its content and are dropped - unless the run
+    resumed: it reran only the passes from the first one with a changed input,
+    over content the manifest described, so the passes before still hold.
+    """
+    stat = file_path.stat()
+    previous = manifest['pages'].get(file_path.name)
+
+    kept = previous is not None and (resumed or (not changed and previous['sha256'] == sha256))
+    passes = dict(previous['passes']) if kept else {}
+    passes.update(pass_hashes)
+
+    manifest['pages'][file_path.name] = {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'passes': passes,
+    }
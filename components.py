@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Shared navbar and footer markup, included into pages from components/
+A page declares a slot once, <!-- component:navbar --> ... <!-- /component:navbar -->,
+and the components pass fills it with components/navbar.html in one left-to-right scan.
+Compiled components are cached in .evolife-cache/components.json by mtime, size and content
+hash; each expansion is recorded in the dependency graph, so a component edit only rebuilds
+the pages that include it
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import deps
+from backup_store import backup_page
+from build_cache import CACHE_DIR
+from html_tokenizer import find_close, find_element, parse_attrs, tokenize
+from page_writer import is_dry_run, write_page
+
+COMPONENT_DIR = 'components'
+CACHE_NAME = 'components.json'
+CACHE_VERSION = 1
+
+SLOT_OPEN_PATTERN = re.compile(r'<!-- component:([\w-]+) -->')
+
+def slot_open(name):
+    """Marker opening a component slot"""
+    return f'<!-- component:{name} -->'
+
+def slot_close(name):
+    """Marker closing a component slot"""
+    return f'<!-- /component:{name} -->'
+
+def component_path(base_path, name):
+    """Source file of a component"""
+    return Path(base_path) / COMPONENT_DIR / f'{name}.html'
+
+def compile_component(source):
+    """Component markup without the usage notes commented above and below it"""
+    fragment = source.strip()
+    while fragment.startswith('<!--') and '-->' in fragment:
+        fragment = fragment[fragment.index('-->') + len('-->'):].lstrip()
+    while fragment.endswith('-->') and '<!--' in fragment:
+        fragment = fragment[:fragment.rindex('<!--')].rstrip()
+    return fragment
+
+# Component cache
+
+_cache = None
+_dirty = False
+
+def cache_path(base_path):
+    """Location of the component cache for a site root"""
+    return Path(base_path) / CACHE_DIR / CACHE_NAME
+
+def load_cache(base_path):
+    """Load the component cache once per process"""
+    global _cache
+    if _cache is None:
+        try:
+            cache = json.loads(cache_path(base_path).read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            cache = {}
+        _cache = cache.get('components', {}) if cache.get('version') == CACHE_VERSION else {}
+    return _cache
+
+def save_cache(base_path):
+    """Write new entries, merged with what other processes saved meanwhile; not in a dry run"""
+    global _dirty
+    if not _dirty or is_dry_run():
+        return
+
+    path = cache_path(base_path)
+    components = dict(_cache)
+    try:
+        saved = json.loads(path.read_text(encoding='utf-8'))
+        if saved.get('version') == CACHE_VERSION:
+            components = {**saved['components'], **components}
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{CACHE_NAME}.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'components': components}, indent=1, sort_keys=True),
+                        encoding='utf-8')
+    os.replace(tmp_path, path)
+    _dirty = False
+
+def compiled_component(base_path, name):
+    """Cache entry holding a component's compiled markup, or None if there is no such component
+
+    An unchanged mtime and size reuse the entry without reading the file; otherwise
+    its content hash decides, so a touched but identical component is not recompiled.
+    """
+    global _dirty
+    path = component_path(base_path, name)
+    deps.record_input(path)
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    components = load_cache(base_path)
+    entry = components.get(name)
+    if entry is not None and [entry['mtime_ns'], entry['size']] == [stat.st_mtime_ns, stat.st_size]:
+        return entry
+
+    source = path.read_bytes()
+    digest = hashlib.sha256(source).hexdigest()
+    fragment = (entry['fragment'] if entry is not None and entry['sha256'] == digest
+                else compile_component(source.decode('utf-8')))
+    entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest, 'fragment': fragment}
+    components[name] = entry
+    _dirty = True
+    return entry
+
+def expand_components(content, base_path):
+    """Fill every component slot with the component's current markup"""
+    changes = []
+    pieces = []
+    pos = 0
+
+    for match in SLOT_OPEN_PATTERN.finditer(content):
+        # A marker inside a slot already filled belongs to the old markup
+        if match.start() < pos:
+            continue
+        name = match.group(1)
+        close = content.find(slot_close(name), match.end())
+        if close == -1:
+            changes.append(f"  - Warning: {name} slot is never closed")
+            continue
+        component = compiled_component(base_path, name)
+        if component is None:
+            changes.append(f"  - Warning: No component {COMPONENT_DIR}/{name}.html")
+            continue
+
+        body = f"\n{component['fragment']}\n"
+        if content[match.end():close] != body:
+            changes.append(f"  - Expanded component: {name}")
+        pieces += [content[pos:match.end()], body]
+        pos = close
+
+    save_cache(base_path)
+    if not pieces:
+        return content, changes
+    pieces.append(content[pos:])
+    return ''.join(pieces), changes
+
+def element_selector(name, attr_text):
+    """Selector for an element: by id, else by its exact class list"""
+    attrs = parse_attrs(attr_text)
+    if attrs.get('id'):
+        return f"{name}#{attrs['id']}"
+    if attrs.get('class'):
+        return f"{name}[class=\"{attrs['class']}\"]"
+    return name
+
+def root_selectors(fragment):
+    """Selectors for each top-level element of a component, in order"""
+    selectors = []
+    pos = 0
+    while True:
+        token = next((token for token in tokenize(fragment, pos) if token[0] in ('start', 'empty')), None)
+        if token is None:
+            return selectors
+        kind, name, _start, end, attr_text = token
+        selectors.append(element_selector(name, attr_text))
+        close = find_close(fragment, name, end) if kind == 'start' else None
+        pos = close[1] if close else end
+
+def is_blank(html, start, end):
+    """True if html[start:end] holds only whitespace and comments"""
+    pieces = []
+    pos = start
+    for kind, _name, token_start, token_end, _attr_text in tokenize(html, start, end):
+        if kind != 'comment':
+            return False
+        pieces.append(html[pos:token_start])
+        pos = token_end
+    pieces.append(html[pos:end])
+    return not ''.join(pieces).strip()
+
+def missing_lines(current, fragment):
+    """Lines of a page's copy of a component that the component does not have"""
+    lines = {line.strip() for line in fragment.splitlines()}
+    return [line.strip() for line in current.splitlines() if line.strip() and line.strip() not in lines]
+
+def adopt_component(content, base_path, name):
+    """Wrap the page's copy of a component in slot markers, so the build keeps it current
+
+    The slot spans every top-level element of the component (the navbar's overlay as
+    well as its <nav>). A copy holding anything the component lacks raises ValueError
+    rather than being adopted, since the next build would replace it.
+    """
+    changes = []
+    if slot_open(name) in content:
+        return content, changes
+
+    component = compiled_component(base_path, name)
+    selectors = root_selectors(component['fragment'])
+    first = find_element(content, selectors[0]) if selectors else None
+    if first is None:
+        return content, changes
+
+    start, end = first.start, first.end
+    for selector in selectors[1:]:
+        element = find_element(content, selector, end)
+        if element is None:
+            continue
+        if not is_blank(content, end, element.start):
+            raise ValueError(f"{selector} is not next to {selectors[0]}; cannot slot the {name} copy")
+        end = element.end
+
+    current = content[start:end]
+    missing = missing_lines(current, component['fragment'])
+    if missing:
+        listing = '\n'.join(f"      {line}" for line in missing)
+        raise ValueError(f"{len(missing)} lines of the {name} copy are not in {COMPONENT_DIR}/{name}.html; "
+                         f"add them there first:\n{listing}")
+
+    content = (content[:start] + f"{slot_open(name)}\n" + current
+               + f"\n{slot_close(name)}" + content[end:])
+    changes.append(f"  - Added {name} slot")
+    return content, changes
+
+def process_file(file_path, adopt):
+    """Adopt and expand the components of a single file"""
+    base_path = file_path.parent
+
+    # Read file
+    content = file_path.read_text(encoding='utf-8')
+
+    new_content = content
+    changes = []
+    for name in adopt:
+        new_content, adopted = adopt_component(new_content, base_path, name)
+        changes += adopted
+    new_content, expanded = expand_components(new_content, base_path)
+    changes += expanded
+
+    if new_content == content:
+        for change in changes:
+            print(f"{file_path.name}: {change.strip()}")
+        return False
+
+    print(f"\n{'='*60}")
+    print(f"Processing: {file_path.name}")
+    print(f"{'='*60}")
+
+    # Create backup
+    blob = backup_page(file_path, content, 'components')
+    print(f"✓ Backup stored: {blob[:12]}")
+
+    # Write back
+    write_page(file_path, new_content, content)
+
+    for change in changes:
+        print(change)
+
+    print(f"✓ File updated: {file_path.name}")
+
+    return True
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Fill the component slots of every page")
+    parser.add_argument('--adopt', action='append', default=[], metavar='NAME',
+                        help="first add NAME slots around pages' existing copies of the component (repeatable)")
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("EVOLIFE - COMPONENTS")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    for name in args.adopt:
+        if compiled_component(base_path, name) is None:
+            raise SystemExit(f"✗ No component {COMPONENT_DIR}/{name}.html")
+
+    files = sorted(path for path in base_path.glob('*.html')
+                   if len(path.suffixes) == 1 and 'backup' not in path.name)
+
+    # Adopt all pages or none: a copy the component would lose content from stops the run
+    refused = []
+    for file_path in files:
+        content = file_path.read_text(encoding='utf-8')
+        for name in args.adopt:
+            try:
+                content, _changes = adopt_component(content, base_path, name)
+            except ValueError as error:
+                refused.append(f"✗ {file_path.name}: {error}")
+    if refused:
+        print('\n'.join(refused))
+        raise SystemExit(f"✗ Nothing adopted: {len(refused)} page copies differ from {COMPONENT_DIR}/")
+
+    updated_count = 0
+    for file_path in files:
+        if process_file(file_path, args.adopt):
+            updated_count += 1
+
+    included = {}
+    for file_path in files:
+        for name in set(SLOT_OPEN_PATTERN.findall(file_path.read_text(encoding='utf-8'))):
+            included.setdefault(name, []).append(file_path.name)
+    save_cache(base_path)
+
+    print("\n" + "="*60)
+    print(f"COMPONENTS COMPLETE: {updated_count}/{len(files)} pages updated")
+    for name, pages in sorted(included.items()):
+        print(f"  - {name}: {len(pages)} pages")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
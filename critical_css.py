@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Inline the above-the-fold subset of each page's stylesheets and load the rest asynchronously
+The fold is the page's markup up to the end of its hero section; only rules whose selectors
+can match that markup are inlined, and every local stylesheet becomes a preload/onload swap
+"""
+
+import re
+from pathlib import Path
+
+from backup_store import backup_page
+from css_parser import load_rooted_stylesheet, selector_requirements, serialize_rules, split_selectors
+from html_tokenizer import find_element, parse_attrs, tokenize
+from page_writer import write_page
+
+# The fold ends with the first of these elements, usually the hero
+FOLD_SELECTORS = ['main header', 'main section', 'body header', 'body section']
+
+# Fold size when a page has no hero element
+FOLD_FALLBACK_BYTES = 30000
+
+# Classes set by scripts before first paint, so never present in the markup
+RUNTIME_CLASSES = {'w-mod-js', 'w-mod-ix', 'w-mod-touch'}
+
+# At-rules always inlined: fonts are only fetched once a kept rule uses them
+# (remote @imports are left to the deferred sheet, they would block rendering again)
+KEPT_AT_RULES = ('@font-face',)
+
+CRITICAL_STYLE_ID = 'critical-css'
+
+STYLESHEET_LINK_PATTERN = re.compile(r'<link\b[^>]*\brel=["\']?stylesheet["\']?[^>]*>', re.IGNORECASE)
+CRITICAL_STYLE_PATTERN = re.compile(rf'<style id="{CRITICAL_STYLE_ID}">.*?</style>\n?', re.DOTALL)
+DEFERRED_LINK_PATTERN = re.compile(
+    r'<link rel="preload" href="([^"]*)" as="style" onload="[^"]*"><noscript><link rel="stylesheet" href="\1"></noscript>')
+
+def fold_end(html, body_start):
+    """Offset where the above-the-fold markup ends"""
+    ends = [element.end for element in (find_element(html, selector, body_start) for selector in FOLD_SELECTORS)
+            if element is not None]
+    if ends:
+        return min(ends)
+    return min(len(html), body_start + FOLD_FALLBACK_BYTES)
+
+def fold_names(html):
+    """Tags, classes and ids used above the fold, as ('tag'|'class'|'id', name) pairs"""
+    names = {('tag', 'html'), ('tag', 'body')}
+    names.update(('class', name) for name in RUNTIME_CLASSES)
+
+    html_tag = re.search(r'<html\b([^>]*)>', html, re.IGNORECASE)
+    body_start = html.find('<body')
+    if body_start == -1:
+        body_start = 0
+
+    tags = list(tokenize(html, body_start, fold_end(html, body_start)))
+    if html_tag:
+        tags.append(('start', 'html', html_tag.start(), html_tag.end(), html_tag.group(1)))
+
+    for kind, name, _start, _end, attr_text in tags:
+        if kind not in ('start', 'empty'):
+            continue
+        names.add(('tag', name))
+        attrs = parse_attrs(attr_text)
+        names.update(('class', value) for value in attrs.get('class', '').split())
+        if attrs.get('id'):
+            names.add(('id', attrs['id']))
+
+    return names
+
+def critical_rules(rules, names):
+    """Rules that can apply above the fold; grouping at-rules keep only those children"""
+    kept = []
+    for rule in rules:
+        if rule.children is not None:
+            children = critical_rules(rule.children, names)
+            if children:
+                kept.append(rule._replace(children=children))
+        elif rule.prelude.startswith('@'):
+            if rule.prelude.lower().startswith(KEPT_AT_RULES):
+                kept.append(rule)
+        elif any(selector_requirements(selector) <= names for selector in split_selectors(rule.prelude)):
+            kept.append(rule)
+    return kept
+
+def local_stylesheet(base_path, href):
+    """Path of a stylesheet served from the site, or None for remote and missing files"""
+    if re.match(r'(?:[a-z]+:)?//', href, re.IGNORECASE):
+        return None
+    path = Path(base_path) / href.split('?')[0].split('#')[0].lstrip('/')
+    return path if path.is_file() else None
+
+def deferred_link(href):
+    """Preload that swaps itself to a stylesheet once loaded, with a no-JS fallback"""
+    return (f'<link rel="preload" href="{href}" as="style" onload="this.onload=null;this.rel=\'stylesheet\'">'
+            f'<noscript><link rel="stylesheet" href="{href}"></noscript>')
+
+def restore_links(content):
+    """Undo a previous run, so the critical subset is recomputed from the current markup"""
+    content = CRITICAL_STYLE_PATTERN.sub('', content)
+    return DEFERRED_LINK_PATTERN.sub(r'<link href="\1" rel="stylesheet" type="text/css"/>', content)
+
+def inline_critical_css(content, base_path):
+    """Inline the critical CSS of every local stylesheet in <head> and defer the sheets"""
+    changes = []
+    original = content
+    content = restore_links(content)
+
+    head_end = content.find('</head>')
+    if head_end == -1:
+        changes.append("  - Warning: Could not find </head> tag")
+        return original, changes
+
+    links = []
+    for match in STYLESHEET_LINK_PATTERN.finditer(content, 0, head_end):
+        attrs = parse_attrs(match.group()[len('<link'):-1])
+        if attrs.get('media', 'all') not in ('all', 'screen'):
+            continue
+        path = local_stylesheet(base_path, attrs.get('href', ''))
+        if path is not None:
+            links.append((match, attrs['href'], path))
+
+    if not links:
+        return original, changes
+
+    names = fold_names(content)
+    critical = []
+    total_rules = 0
+    for _match, href, path in links:
+        rules = load_rooted_stylesheet(path, base_path)
+        kept = critical_rules(rules, names)
+        total_rules += len(rules)
+        critical.append(serialize_rules(kept))
+        changes.append(f"  - {href.rsplit('/', 1)[-1][:48]}: {len(kept)}/{len(rules)} rules inlined, sheet deferred")
+
+    # Replace the links back to front so earlier offsets stay valid
+    for match, href, _path in reversed(links):
+        content = content[:match.start()] + deferred_link(href) + content[match.end():]
+
+    # The critical styles go where the first sheet was, keeping the cascade order
+    first = links[0][0].start()
+    style = f'<style id="{CRITICAL_STYLE_ID}">' + '\n'.join(css for css in critical if css) + '</style>\n'
+    content = content[:first] + style + content[first:]
+
+    changes.append(f"  - Inlined {len(style.encode('utf-8')) // 1024} KB of critical CSS")
+    return content, changes
+
+def process_file(file_path):
+    """Process a single file with critical CSS"""
+    print(f"\n{'='*60}")
+    print(f"Processing: {file_path.name}")
+    print(f"{'='*60}")
+
+    # Read file
+    content = file_path.read_text(encoding='utf-8')
+
+    new_content, changes = inline_critical_css(content, file_path.parent)
+
+    if new_content == content:
+        print("✓ Critical CSS up to date")
+        return False
+
+    # Create backup
+    blob = backup_page(file_path, content, 'critical-css')
+    print(f"✓ Backup stored: {blob[:12]}")
+
+    # Write back
+    write_page(file_path, new_content, content)
+
+    for change in changes:
+        print(change)
+
+    print(f"✓ File updated: {file_path.name}")
+
+    return True
+
+def main():
+    """Main execution"""
+    print("\n" + "="*60)
+    print("EVOLIFE - CRITICAL CSS")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+
+    files = sorted(path for path in base_path.glob('*.html')
+                   if len(path.suffixes) == 1 and 'backup' not in path.name)
+
+    updated_count = 0
+    for file_path in files:
+        if process_file(file_path):
+            updated_count += 1
+
+    print("\n" + "="*60)
+    print(f"CRITICAL CSS COMPLETE: {updated_count}/{len(files)} pages updated")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Small CSS rule parser for the stylesheet passes
+Splits a stylesheet into rules and grouping at-rules, reads which classes, ids and
+tags a selector needs, and writes rules back out
+"""
+
+import posixpath
+import re
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+import deps
+
+# prelude is the selector list or at-rule text; body the declarations (None for
+# statements like @import); children the nested rules of @media and @supports
+Rule = namedtuple('Rule', 'prelude body children')
+
+# At-rules whose block holds rules rather than declarations
+GROUPING_AT_RULES = ('@media', '@supports', '@document', '@-moz-document', '@container', '@layer')
+
+TOKEN_PATTERN = re.compile(r'/\*.*?\*/|"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|[{};]', re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|\s+')
+
+# Selector parts; group 2 is a tag, class or id name with its prefix in group 1
+# Attribute selectors and pseudo-classes (with their arguments) need nothing from the markup
+SELECTOR_TOKEN_PATTERN = re.compile(
+    r'\[(?:[^\]"\']|"[^"]*"|\'[^\']*\')*\]'
+    r'|::?[\w-]+(?:\((?:[^()]|\([^()]*\))*\))?'
+    r'|([#.]?)((?:[\w-]|\\.)+)'
+)
+
+URL_PATTERN = re.compile(r'url\(\s*(["\']?)([^"\')]*)\1\s*\)', re.IGNORECASE)
+IMPORT_PATTERN = re.compile(r'@import\s+(?:url\(\s*)?(["\']?)([^"\')\s;]+)\1', re.IGNORECASE)
+
+# URLs that do not depend on the stylesheet's location
+ABSOLUTE_URL_PATTERN = re.compile(r'(?:[a-z][a-z0-9+.-]*:|//|/|#)', re.IGNORECASE)
+
+# Whitespace around punctuation that never needs it, outside strings. Only , and > in
+# preludes: a space before : is a descendant combinator, and + and - may be calc() operators
+PRELUDE_SPACE_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|\s*([,>])\s*')
+BODY_SPACE_PATTERN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|\s*([,:;])\s*')
+
+def collapse_whitespace(text):
+    """Collapse runs of whitespace to one space, leaving strings alone"""
+    return WHITESPACE_PATTERN.sub(lambda match: match.group(1) or ' ', text).strip()
+
+def read_block(css, pos):
+    """Raw text of a declaration block up to its closing brace; returns (text, end)
+
+    Nested braces (as in @keyframes) stay part of the text; comments are dropped.
+    """
+    depth = 0
+    parts = []
+    while True:
+        match = TOKEN_PATTERN.search(css, pos)
+        if match is None:
+            parts.append(css[pos:])
+            return ''.join(parts), len(css)
+
+        parts.append(css[pos:match.start()])
+        token = match.group()
+        pos = match.end()
+        if token.startswith('/*'):
+            continue
+        if token == '}':
+            if depth == 0:
+                return ''.join(parts), pos
+            depth -= 1
+        elif token == '{':
+            depth += 1
+        parts.append(token)
+
+def parse_rules(css, pos=0):
+    """Parse rules up to the end of the enclosing block; returns (rules, end)"""
+    rules = []
+    prelude = []
+    while True:
+        match = TOKEN_PATTERN.search(css, pos)
+        if match is None:
+            return rules, len(css)
+
+        prelude.append(css[pos:match.start()])
+        token = match.group()
+        pos = match.end()
+
+        if token.startswith('/*'):
+            continue
+        if token[0] in '"\'':
+            prelude.append(token)
+            continue
+        if token == '}':
+            return rules, pos
+
+        text = collapse_whitespace(''.join(prelude))
+        prelude = []
+        if token == ';':
+            # Statement at-rules: @import, @charset, @namespace
+            if text:
+                rules.append(Rule(text, None, None))
+        elif text.lower().startswith(GROUPING_AT_RULES):
+            children, pos = parse_rules(css, pos)
+            rules.append(Rule(text, None, children))
+        else:
+            body, pos = read_block(css, pos)
+            rules.append(Rule(text, collapse_whitespace(body), None))
+
+def parse_stylesheet(css):
+    """Parse a stylesheet into a list of Rules"""
+    rules, _end = parse_rules(css)
+    return rules
+
+@lru_cache(maxsize=None)
+def _load_stylesheet(path, _mtime_ns, _size):
+    return parse_stylesheet(Path(path).read_text(encoding='utf-8'))
+
+def load_stylesheet(path):
+    """Parsed rules of a stylesheet file, cached until the file changes"""
+    deps.record_input(path)
+    stat = Path(path).stat()
+    return _load_stylesheet(str(path), stat.st_mtime_ns, stat.st_size)
+
+def rebase_url(url, prefix):
+    """A stylesheet-relative URL made relative to another directory, given by prefix"""
+    if not url or ABSOLUTE_URL_PATTERN.match(url):
+        return url
+    return posixpath.normpath(posixpath.join(prefix, url))
+
+def rebase_urls(text, prefix):
+    """Rewrite the relative url() references in CSS text"""
+    if 'url(' not in text.lower():
+        return text
+    return URL_PATTERN.sub(lambda match: f'url({match.group(1)}{rebase_url(match.group(2), prefix)}{match.group(1)})', text)
+
+def rebase_rules(rules, prefix):
+    """Rules with their relative url() references rewritten, for CSS moved to another directory"""
+    if prefix in ('', '.'):
+        return rules
+
+    rebased = []
+    for rule in rules:
+        if rule.children is not None:
+            rule = rule._replace(children=rebase_rules(rule.children, prefix))
+        elif 'url(' in (rule.body or rule.prelude):
+            rule = rule._replace(prelude=rebase_urls(rule.prelude, prefix), body=rule.body and rebase_urls(rule.body, prefix))
+        rebased.append(rule)
+    return rebased
+
+def import_target(rule, sheet_path):
+    """Local file pulled in by an @import statement, or None"""
+    if rule.body is not None or rule.children is not None:
+        return None
+    match = IMPORT_PATTERN.match(rule.prelude)
+    if match is None or ABSOLUTE_URL_PATTERN.match(match.group(2)):
+        return None
+    path = Path(sheet_path).parent / match.group(2)
+    return path if path.is_file() else None
+
+def load_rooted_stylesheet(path, root):
+    """Rules of a stylesheet as if written in a page at root
+
+    Local @imports are replaced by the imported rules and relative url()s are
+    rebased, so the rules can be inlined or merged into one file.
+    """
+    path = Path(path)
+    prefix = posixpath.relpath(path.parent.as_posix(), Path(root).as_posix())
+    rules = []
+    for rule in load_stylesheet(path):
+        target = import_target(rule, path)
+        if target is None:
+            rules.append(rule)
+        else:
+            rules.extend(load_rooted_stylesheet(target, root))
+    return rebase_rules(rules, prefix)
+
+@lru_cache(maxsize=None)
+def split_selectors(prelude):
+    """Split a selector list on its top-level commas; shared stylesheets repeat across pages"""
+    selectors = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(prelude):
+        if char in '([':
+            depth += 1
+        elif char in ')]':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            selectors.append(prelude[start:index].strip())
+            start = index + 1
+    selectors.append(prelude[start:].strip())
+    return tuple(selector for selector in selectors if selector)
+
+@lru_cache(maxsize=None)
+def selector_requirements(selector):
+    """Frozen set of ('tag'|'class'|'id', name) a selector needs present in the markup"""
+    kinds = {'': 'tag', '.': 'class', '#': 'id'}
+    requirements = set()
+    for match in SELECTOR_TOKEN_PATTERN.finditer(selector):
+        prefix, name = match.groups()
+        if name is None:
+            continue
+        name = name.replace('\\', '')
+        requirements.add((kinds[prefix], name.lower() if prefix == '' else name))
+    return frozenset(requirements)
+
+def serialize_rules(rules):
+    """Write rules back out as compact CSS"""
+    parts = []
+    for rule in rules:
+        if rule.children is not None:
+            parts.append(f'{rule.prelude}{{{serialize_rules(rule.children)}}}')
+        elif rule.body is None:
+            parts.append(f'{rule.prelude};')
+        else:
+            parts.append(f'{rule.prelude}{{{rule.body}}}')
+    return '\n'.join(parts)
+
+def tighten(text, pattern):
+    """Drop the whitespace pattern matches around punctuation"""
+    return pattern.sub(lambda match: match.group(1) or match.group(2), text)
+
+def minify_rules(rules):
+    """Write rules back out with no optional whitespace, for minified output"""
+    parts = []
+    for rule in rules:
+        prelude = tighten(rule.prelude, PRELUDE_SPACE_PATTERN)
+        if rule.children is not None:
+            parts.append(f'{prelude}{{{minify_rules(rule.children)}}}')
+        elif rule.body is None:
+            parts.append(f'{prelude};')
+        elif '{' in rule.body:
+            # Nested rules: a space before : may be a descendant combinator
+            parts.append(f'{prelude}{{{rule.body}}}')
+        else:
+            parts.append(f'{prelude}{{{tighten(rule.body, BODY_SPACE_PATTERN).rstrip(";")}}}')
+    return ''.join(parts)
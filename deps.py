@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Dependency graph between build inputs and the pages built from them
+While a page is generated or a pass transforms it, every file the step reads is recorded
+as an input of that page and step; records of a data file (a product in
+data/product-content.json) are inputs of their own. .evolife-cache/deps.json keeps each
+page's inputs with the hash they had, so the next run rebuilds exactly the pages whose
+inputs changed
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from build_cache import CACHE_DIR
+
+GRAPH_NAME = 'deps.json'
+GRAPH_VERSION = 1
+
+# Data files whose records are tracked one by one: path -> (list field, key field)
+# Node 'data/product-content.json#sermorelin' is the product whose slug is sermorelin
+SLICED_DATA = {
+    'data/product-content.json': ('products', 'slug'),
+}
+
+# Hash of an input that does not exist; creating it changes the hash
+MISSING = 'missing'
+
+# Recording
+
+_recorded = None
+
+def start_recording():
+    """Start collecting the inputs read by the step about to run"""
+    global _recorded
+    _recorded = set()
+
+def record_input(path):
+    """Note that the running step read path (a file, or a data node 'path#key')"""
+    if _recorded is not None:
+        _recorded.add(str(path))
+
+def stop_recording():
+    """Inputs read since start_recording(), sorted"""
+    global _recorded
+    inputs, _recorded = sorted(_recorded or ()), None
+    return inputs
+
+def data_node(path, key):
+    """Node for one record of a sliced data file"""
+    return f'{path}#{key}'
+
+def node_name(base_path, path):
+    """Graph node for a recorded path: relative to the site root where possible"""
+    if '#' in str(path):
+        return str(path)
+    path = Path(path)
+    if not path.is_absolute():
+        return path.as_posix()
+    try:
+        return path.resolve().relative_to(Path(base_path).resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+# Graph
+
+# Hashes of the inputs computed this run, by node; reset when a graph is loaded
+_current = {}
+_data = {}
+
+def graph_path(base_path):
+    """Location of the dependency graph for a site root"""
+    return Path(base_path) / CACHE_DIR / GRAPH_NAME
+
+def load_graph(base_path):
+    """Load the graph, or start an empty one if missing or outdated"""
+    _current.clear()
+    _data.clear()
+    try:
+        graph = json.loads(graph_path(base_path).read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        graph = {}
+    if graph.get('version') != GRAPH_VERSION:
+        graph = {'version': GRAPH_VERSION, 'inputs': {}, 'pages': {}}
+    return graph
+
+def save_graph(base_path, graph):
+    """Write the graph atomically, dropping stat entries of inputs no page uses any more"""
+    used = {node for steps in graph['pages'].values() for inputs in steps.values() for node in inputs}
+    used |= {node.split('#')[0] for node in used}
+    graph['inputs'] = {node: entry for node, entry in graph['inputs'].items() if node in used}
+    path = graph_path(base_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{GRAPH_NAME}.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps(graph, indent=1, sort_keys=True), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def file_hash(graph, base_path, node):
+    """Content hash of a file input; unchanged mtime and size reuse the stored hash"""
+    path = Path(node) if Path(node).is_absolute() else Path(base_path) / node
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return MISSING
+    entry = graph['inputs'].get(node)
+    if entry is not None and [entry['mtime_ns'], entry['size']] == [stat.st_mtime_ns, stat.st_size]:
+        return entry['sha256']
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    graph['inputs'][node] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+    return digest
+
+def data_hash(graph, base_path, node):
+    """Hash of one record of a sliced data file; the file is parsed only when it changed"""
+    path, key = node.split('#', 1)
+    source = file_hash(graph, base_path, path)
+    entry = graph['inputs'].get(node)
+    if entry is not None and entry['source'] == source:
+        return entry['sha256']
+
+    if path not in _data:
+        try:
+            data = json.loads((Path(base_path) / path).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            data = {}
+        list_field, key_field = SLICED_DATA[path]
+        _data[path] = {str(record[key_field]): record for record in data.get(list_field, [])}
+    record = _data[path].get(key)
+    digest = (hashlib.sha256(json.dumps(record, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+              if record is not None else MISSING)
+    graph['inputs'][node] = {'source': source, 'sha256': digest}
+    return digest
+
+def current_hash(graph, base_path, node):
+    """Hash of an input as it is now, computed once per run"""
+    if node not in _current:
+        _current[node] = (data_hash if '#' in node else file_hash)(graph, base_path, node)
+    return _current[node]
+
+def changed_inputs(graph, base_path, page_name, steps):
+    """Inputs of a page's steps that changed since they were recorded; None if a step has no record"""
+    recorded = graph['pages'].get(page_name, {})
+    changed = []
+    for step in steps:
+        if step not in recorded:
+            return None
+        changed += [node for node, digest in recorded[step].items()
+                    if current_hash(graph, base_path, node) != digest]
+    return changed
+
+def dirty_pages(graph, base_path, pages):
+    """Pages, given as {page: steps}, whose inputs for any of their steps changed or were never recorded"""
+    return [name for name, steps in pages.items() if changed_inputs(graph, base_path, name, steps) != []]
+
+def record_page(graph, base_path, page_name, step, inputs):
+    """Store the inputs a step read for a page, with their current hashes"""
+    nodes = sorted({node_name(base_path, path) for path in inputs})
+    graph['pages'].setdefault(page_name, {})[step] = {node: current_hash(graph, base_path, node) for node in nodes}
+
+def dependents(graph, node):
+    """{page: [steps]} for every page with an input at node (a file, data node or directory)"""
+    node = node.rstrip('/')
+    pages = {}
+    for page_name, steps in graph['pages'].items():
+        for step, inputs in steps.items():
+            if any(name == node or name.split('#')[0] == node or name.startswith(node + '/') for name in inputs):
+                pages.setdefault(page_name, []).append(step)
+    return pages
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Query the dependency graph the last builds recorded")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    affected = subparsers.add_parser('affected', help="pages a change to FILE rebuilds")
+    affected.add_argument('files', nargs='+', metavar='FILE')
+    inputs = subparsers.add_parser('inputs', help="inputs recorded for PAGE, by step")
+    inputs.add_argument('page', metavar='PAGE')
+    subparsers.add_parser('dirty', help="pages whose recorded inputs changed since their last build")
+    args = parser.parse_args(argv)
+
+    base_path = Path(__file__).parent
+    graph = load_graph(base_path)
+    if not graph['pages']:
+        raise SystemExit("✗ No dependency graph yet - run the pipeline first")
+
+    if args.command == 'affected':
+        for file in args.files:
+            node = node_name(base_path, Path(file).absolute()) if '#' not in file else file
+            pages = dependents(graph, node)
+            print(f"{node}: {len(pages)} pages")
+            for page_name, steps in sorted(pages.items()):
+                print(f"  - {page_name} ({', '.join(steps)})")
+    elif args.command == 'inputs':
+        for step, nodes in sorted(graph['pages'].get(Path(args.page).name, {}).items()):
+            print(f"{step}:")
+            for node in nodes:
+                print(f"  - {node}")
+    else:
+        for page_name, steps in sorted(graph['pages'].items()):
+            changed = changed_inputs(graph, base_path, page_name, steps)
+            if changed:
+                print(f"{page_name}: {', '.join(sorted(set(changed)))}")
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,14 @@ Enhance image alt text with more specific, descriptive alternatives
 Phase 3.1: Improve alt text quality for better accessibility and SEO
 """
 
+import argparse
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import sync_writes, write_page
+from parallel import add_jobs_argument, map_pages
+from rule_engine import apply_rule, compile_rules
 
 # Enhanced alt text improvements for all pages
 GENERIC_ALT_IMPROVEMENTS = [
@@ -128,23 +133,48 @@ WEIGHT_MANAGEMENT_ALT_IMPROVEMENTS = [
     ),
 ]
 
-def apply_alt_improvements(content, improvements):
+# Compiled once at import
+GENERIC_ALT_RULES = compile_rules(GENERIC_ALT_IMPROVEMENTS, re.DOTALL, name='GENERIC_ALT_IMPROVEMENTS')
+MENS_HEALTH_ALT_RULES = compile_rules(MENS_HEALTH_ALT_IMPROVEMENTS, re.DOTALL, name='MENS_HEALTH_ALT_IMPROVEMENTS')
+RECOVERY_ALT_RULES = compile_rules(RECOVERY_ALT_IMPROVEMENTS, re.DOTALL, name='RECOVERY_ALT_IMPROVEMENTS')
+WEIGHT_MANAGEMENT_ALT_RULES = compile_rules(WEIGHT_MANAGEMENT_ALT_IMPROVEMENTS, re.DOTALL, name='WEIGHT_MANAGEMENT_ALT_IMPROVEMENTS')
+
+ALT_ATTR_PATTERN = re.compile(r'alt="([^"]+)"')
+
+# Pages and their page-specific configuration
+PAGES = [
+    ('mens-health.html', MENS_HEALTH_ALT_RULES, 'Men\'s Health'),
+    ('recovery.html', RECOVERY_ALT_RULES, 'Recovery'),
+    ('weight-management.html', WEIGHT_MANAGEMENT_ALT_RULES, 'Weight Management')
+]
+
+def apply_alt_improvements(content, rules):
     """Apply alt text improvements"""
     changes = []
 
-    for pattern, replacement in improvements:
-        matches = re.findall(pattern, content, re.DOTALL)
-        if matches:
-            old_content = content
-            content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-            if old_content != content:
-                # Extract alt text from replacement
-                alt_match = re.search(r'alt="([^"]+)"', replacement)
-                if alt_match:
-                    changes.append(f"  - Enhanced: {alt_match.group(1)[:60]}...")
+    for regex, replacement in rules:
+        old_content = content
+        content, count = apply_rule(content, regex, replacement)
+        if count and old_content != content:
+            # Extract alt text from replacement
+            alt_match = ALT_ATTR_PATTERN.search(replacement)
+            if alt_match:
+                changes.append(f"  - Enhanced: {alt_match.group(1)[:60]}...")
 
     return content, changes
 
+def enhance_alt_text(content, specific_improvements):
+    """Apply generic then page-specific alt text improvements"""
+    all_changes = []
+
+    content, changes1 = apply_alt_improvements(content, GENERIC_ALT_RULES)
+    all_changes.extend(changes1)
+
+    content, changes2 = apply_alt_improvements(content, specific_improvements)
+    all_changes.extend(changes2)
+
+    return content, all_changes
+
 def process_file(file_path, specific_improvements, category):
     """Process a single file with alt text enhancements"""
     print(f"\n{'='*60}")
@@ -155,27 +185,18 @@ def process_file(file_path, specific_improvements, category):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.alt_enhanced_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
-
-    all_changes = []
-
-    # Apply generic improvements
-    new_content, changes1 = apply_alt_improvements(content, GENERIC_ALT_IMPROVEMENTS)
-    all_changes.extend(changes1)
+    blob = backup_page(file_path, content, 'alt_enhanced')
+    print(f"✓ Backup stored: {blob[:12]}")
 
-    # Apply page-specific improvements
-    new_content, changes2 = apply_alt_improvements(new_content, specific_improvements)
-    all_changes.extend(changes2)
+    # Apply generic and page-specific improvements
+    new_content, all_changes = enhance_alt_text(content, specific_improvements)
 
     if not all_changes:
         print("✓ No generic alt text found (already enhanced)")
         return True
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Alt text enhancements ({len(all_changes)} improvements):")
     for change in all_changes[:10]:  # Show first 10
@@ -189,6 +210,10 @@ def process_file(file_path, specific_improvements, category):
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Enhance image alt text with specific descriptions")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("EVOLIFE - ENHANCE ALT TEXT QUALITY")
     print("="*60)
@@ -196,22 +221,24 @@ def main():
 
     base_path = Path("/Users/raiyanabdullah/Desktop/Evolife FInal and last")
 
-    pages = [
-        ('mens-health.html', MENS_HEALTH_ALT_IMPROVEMENTS, 'Men\'s Health'),
-        ('recovery.html', RECOVERY_ALT_IMPROVEMENTS, 'Recovery'),
-        ('weight-management.html', WEIGHT_MANAGEMENT_ALT_IMPROVEMENTS, 'Weight Management')
-    ]
-
     success_count = 0
 
-    for filename, specific_improvements, category in pages:
+    items = []
+    for filename, specific_improvements, category in PAGES:
         file_path = base_path / filename
         if file_path.exists():
-            if process_file(file_path, specific_improvements, category):
-                success_count += 1
+            items.append((file_path, specific_improvements, category))
         else:
             print(f"\n✗ File not found: {filename}")
 
+    # Pages run in parallel; output is replayed in page order
+    for success, output in map_pages(process_file, items, args.jobs, capture=True):
+        print(output, end='')
+        if success:
+            success_count += 1
+    # The workers wrote the pages; flush them to disk in one pass
+    sync_writes(file_path for file_path, *_ in items)
+
     print("\n" + "="*60)
     print(f"ALT TEXT ENHANCEMENT COMPLETE: {success_count}/3 pages")
     print("="*60)
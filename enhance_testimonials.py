@@ -4,9 +4,11 @@ Enhance testimonials with category-specific, varied examples
 Phase 4.1: Create 6-8 authentic testimonials per category
 """
 
-import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from html_tokenizer import replace_inner
+from page_writer import write_page
 
 # Men's Health Testimonials (PT-141, ED medications)
 MENS_HEALTH_TESTIMONIALS = [
@@ -110,6 +112,16 @@ WEIGHT_MANAGEMENT_TESTIMONIALS = [
     }
 ]
 
+# Pages and their page-specific configuration
+PAGES = [
+    ('mens-health.html', MENS_HEALTH_TESTIMONIALS, "Men's Health", 'mens-health'),
+    ('recovery.html', RECOVERY_TESTIMONIALS, 'Recovery', 'recovery'),
+    ('weight-management.html', WEIGHT_MANAGEMENT_TESTIMONIALS, 'Weight Management', 'weight-management')
+]
+
+# The testimonials slider whose items are replaced
+TESTIMONIAL_SLIDER_SELECTOR = '#cms-slider-2.testimonial-slider-copy'
+
 def create_testimonial_html(testimonials, category_class):
     """Generate HTML for testimonial cards"""
     html_parts = []
@@ -124,18 +136,13 @@ def replace_testimonials(content, testimonials, category_class):
     """Replace testimonials section with new content"""
     changes = []
 
-    # Pattern to match the testimonials slider items
-    pattern = r'(<div id="cms-slider-2" role="list" class="slick-slider cms-slider-copy testimonial-slider-copy w-dyn-items[^>]*>)(.*?)(</div>\s*</div>\s*<a href="/get-started\.html)'
+    # Create new testimonial HTML
+    new_testimonials_html = create_testimonial_html(testimonials, category_class)
 
-    match = re.search(pattern, content, re.DOTALL)
-    if match:
-        # Create new testimonial HTML
-        new_testimonials_html = create_testimonial_html(testimonials, category_class)
-
-        # Replace with simple non-Slick HTML structure (Slick will initialize it)
-        replacement = f'{match.group(1)}<div role="list" class="w-dyn-items">{new_testimonials_html}</div>{match.group(3)}'
-
-        content = re.sub(pattern, replacement, content, flags=re.DOTALL)
+    # Replace the slider items with simple non-Slick HTML structure (Slick will initialize it)
+    content, slider = replace_inner(content, TESTIMONIAL_SLIDER_SELECTOR,
+                                    f'<div role="list" class="w-dyn-items">{new_testimonials_html}</div>')
+    if slider is not None:
         changes.append(f"  - Replaced with {len(testimonials)} category-specific testimonials")
         changes.append(f"  - Added varied testimonial titles")
         changes.append(f"  - Included specific patient attributions")
@@ -155,10 +162,8 @@ def process_file(file_path, testimonials, category_name, category_class):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.testimonials_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'testimonials')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Replace testimonials
     new_content, changes = replace_testimonials(content, testimonials, category_class)
@@ -168,7 +173,7 @@ def process_file(file_path, testimonials, category_name, category_class):
         return False
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Testimonials enhanced:")
     for change in changes:
@@ -187,15 +192,9 @@ def main():
 
     base_path = Path("/Users/raiyanabdullah/Desktop/Evolife FInal and last")
 
-    pages = [
-        ('mens-health.html', MENS_HEALTH_TESTIMONIALS, "Men's Health", 'mens-health'),
-        ('recovery.html', RECOVERY_TESTIMONIALS, 'Recovery', 'recovery'),
-        ('weight-management.html', WEIGHT_MANAGEMENT_TESTIMONIALS, 'Weight Management', 'weight-management')
-    ]
-
     success_count = 0
 
-    for filename, testimonials, category_name, category_class in pages:
+    for filename, testimonials, category_name, category_class in PAGES:
         file_path = base_path / filename
         if file_path.exists():
             if process_file(file_path, testimonials, category_name, category_class):
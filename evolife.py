@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the site tooling: evolife COMMAND [ARGS]
+Commands import only the module they dispatch to, and the pipeline imports
+only the pass scripts that are selected, so single-pass runs start quickly
+"""
+
+import importlib
+import sys
+
+# Command -> (module whose main() handles it, arguments put in front, description)
+COMMANDS = {
+    'run': ('pipeline', [], "run the named passes, e.g. evolife run seo-tags --page index.html"),
+    'run-all': ('pipeline', [], "run every pass over every page in one interpreter"),
+    'list': ('pipeline', ['--list'], "list registered passes"),
+    'components': ('components', [], "fill navbar/footer slots from components/; --adopt NAME adds slots"),
+    'products': ('generate_product_pages', [], "render product pages from data/product-content.json"),
+    'watch': ('watch', [], "rebuild the affected pages whenever a page, component, data or asset file changes"),
+    'deps': ('deps', [], "show which pages an input affects, a page's inputs, or pages due a rebuild"),
+    'backup': ('backup_store', [], "list, restore or import page backups"),
+    'benchmark': ('benchmark', [], "benchmark the passes"),
+    'images': ('responsive_images', [], "generate responsive WebP/AVIF image variants"),
+    'purge-css': ('purge_css', [], "write stylesheets pruned to the selectors the pages use"),
+    'fingerprint': ('fingerprint_assets', [], "write content-hashed copies of assets and their manifest"),
+    'minify': ('minify_html', [], "write minified pages and an assets mirror to dist/ for deployment"),
+    'compress': ('precompress', [], "write precompressed .gz/.br copies of pages and text assets"),
+    'serve': ('serve', [], "serve the site locally with compression, ETags and ranges"),
+}
+
+def print_usage():
+    """Print the command list"""
+    print("usage: evolife COMMAND [ARGS]\n")
+    for command, (_module_name, _prefix, description) in COMMANDS.items():
+        print(f"  {command:12} {description}")
+    print("\nRun 'evolife COMMAND --help' for a command's options.")
+
+def main(argv=None):
+    """Main execution"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print_usage()
+        return
+
+    command, args = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print_usage()
+        raise SystemExit(f"\n✗ Unknown command: {command}")
+    if command == 'run' and not args:
+        raise SystemExit("✗ Name at least one pass to run, or use run-all")
+
+    module_name, prefix, _description = COMMANDS[command]
+    importlib.import_module(module_name).main(prefix + args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Content-hashed copies of everything under assets/, for immutable caching
+Each file gets a copy named <stem>.<hash>.<ext> beside it and an entry in assets/manifest.json;
+stylesheet copies have their url() and @import references pointed at the hashed copies too.
+Hashes are kept in .evolife-cache/asset-hashes.json by mtime and size, so reruns only stat files
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import unquote
+
+import deps
+from build_cache import CACHE_DIR
+from css_parser import URL_PATTERN
+from image_dimensions import REMOTE_URL_PATTERN
+from precompress import ENCODINGS
+
+ASSET_DIR = 'assets'
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+HASH_CACHE_NAME = 'asset-hashes.json'
+
+# Hex digits of SHA-256 in a fingerprinted name, as in the shared-css stylesheet names
+HASH_LENGTH = 10
+
+# Already content-addressed (one folder per source hash)
+SKIPPED_DIRS = {'variants'}
+
+FINGERPRINT_PATTERN = re.compile(rf'\.([0-9a-f]{{{HASH_LENGTH}}})(?=\.[^./]+$|$)')
+CSS_IMPORT_STRING_PATTERN = re.compile(r'(@import\s+)(["\'])([^"\']+)\2', re.IGNORECASE)
+
+# Attributes holding one URL, and those holding a srcset candidate list
+URL_ATTRS = ('href', 'src', 'poster', 'data-src')
+SRCSET_ATTRS = ('srcset', 'imagesrcset', 'data-srcset')
+ATTR_PATTERN = re.compile(r'(\s(' + '|'.join(URL_ATTRS + SRCSET_ATTRS) + r')\s*=\s*)(["\'])(.*?)\3',
+                          re.IGNORECASE | re.DOTALL)
+
+def content_hash(data):
+    """Fingerprint of file bytes"""
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def fingerprinted_name(name, digest):
+    """name with the hash before its extension: site.css -> site.<hash>.css"""
+    stem, dot, suffix = name.rpartition('.')
+    return f'{stem}.{digest}.{suffix}' if dot and stem else f'{name}.{digest}'
+
+def carries_hash(name, digest):
+    """True if name is already fingerprinted with digest (shared-css output, for one)"""
+    match = FINGERPRINT_PATTERN.search(name)
+    return match is not None and match.group(1) == digest
+
+def strip_fingerprint(name):
+    """name without a fingerprint, or None if it has none"""
+    stripped = FINGERPRINT_PATTERN.sub('', name, count=1)
+    return stripped if stripped != name else None
+
+def manifest_path(base_path):
+    """Location of the asset manifest for a site root"""
+    return Path(base_path) / ASSET_DIR / MANIFEST_NAME
+
+def load_manifest(base_path):
+    """Load the asset manifest: source path -> fingerprinted path, relative to the site root"""
+    try:
+        manifest = json.loads(manifest_path(base_path).read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    return manifest.get('assets', {}) if manifest.get('version') == MANIFEST_VERSION else {}
+
+def save_json(path, data):
+    """Write JSON atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps(data, indent=1, sort_keys=True), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def load_hash_cache(base_path):
+    """Raw content hashes by path: path -> [mtime_ns, size, hash]"""
+    try:
+        cache = json.loads((Path(base_path) / CACHE_DIR / HASH_CACHE_NAME).read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+    return cache.get('files', {}) if cache.get('version') == MANIFEST_VERSION else {}
+
+def original_asset(path):
+    """The source file a fingerprinted copy was made from, or path itself"""
+    stripped = strip_fingerprint(path.name)
+    if stripped is not None and (path.parent / stripped).is_file():
+        return path.parent / stripped
+    return path
+
+def is_precompressed(path):
+    """True for a .gz/.br file; precompress.py writes those beside the assets"""
+    return path.suffix in ENCODINGS.values()
+
+def asset_files(base_path):
+    """Files under assets/, fingerprinted copies included
+
+    Precompressed siblings are left out; fingerprinted copies of them, which older
+    runs made, are kept so they show up as outdated.
+    """
+    root = Path(base_path) / ASSET_DIR
+    for path in sorted(root.rglob('*')):
+        parts = path.relative_to(root).parts
+        if not path.is_file() or path == manifest_path(base_path):
+            continue
+        if any(part.startswith('.') or part in SKIPPED_DIRS for part in parts[:-1]) or path.name.startswith('.'):
+            continue
+        if is_precompressed(path) and strip_fingerprint(path.name) is None:
+            continue
+        if not path.name.endswith('.tmp'):
+            yield path
+
+def source_assets(base_path):
+    """Files under assets/ that get fingerprinted copies (not the copies themselves)"""
+    return (path for path in asset_files(base_path) if original_asset(path) == path and not is_precompressed(path))
+
+def asset_key(manifest, url_path):
+    """Manifest key for a site-root-relative path, also when it is an older fingerprinted name"""
+    for candidate in (url_path, unquote(url_path)):
+        if candidate in manifest:
+            return candidate
+        stripped = strip_fingerprint(candidate)
+        if stripped is not None and stripped in manifest:
+            return stripped
+    return None
+
+def fingerprint_url(url, manifest, page_dir):
+    """url pointed at the current fingerprinted copy, or unchanged
+
+    page_dir is the directory the URL is relative to, as a site-root-relative posix path.
+    Only the file name changes, so the URL keeps its own encoding, query and fragment.
+    """
+    if not url or REMOTE_URL_PATTERN.match(url) or url.startswith('#'):
+        return url
+    split = min((i for i in (url.find('?'), url.find('#')) if i != -1), default=len(url))
+    path, rest = url[:split], url[split:]
+
+    resolved = posixpath.normpath(path.lstrip('/') if path.startswith('/') else posixpath.join(page_dir, path))
+    key = asset_key(manifest, resolved)
+    if key is None:
+        return url
+
+    digest = FINGERPRINT_PATTERN.search(posixpath.basename(manifest[key])).group(1)
+    directory, _slash, name = path.rpartition('/')
+    # An older fingerprinted name loses its hash first; a source name may itself look hashed
+    if key not in (resolved, unquote(resolved)):
+        name = strip_fingerprint(name)
+    new_url = (f'{directory}/' if _slash else '') + fingerprinted_name(name, digest) + rest
+    return url if carries_hash(path, digest) else new_url
+
+def fingerprint_srcset(value, manifest, page_dir):
+    """srcset with every candidate URL fingerprinted"""
+    candidates = []
+    for candidate in value.split(','):
+        parts = candidate.strip().split(None, 1)
+        if parts:
+            parts[0] = fingerprint_url(parts[0], manifest, page_dir)
+        candidates.append(' '.join(parts))
+    return ', '.join(candidates)
+
+def fingerprint_css(css, manifest, css_dir):
+    """Stylesheet text with url() and @import references fingerprinted"""
+    css = URL_PATTERN.sub(lambda match: f'url({match.group(1)}{fingerprint_url(match.group(2), manifest, css_dir)}'
+                                        f'{match.group(1)})', css)
+    return CSS_IMPORT_STRING_PATTERN.sub(
+        lambda match: f'{match.group(1)}{match.group(2)}{fingerprint_url(match.group(3), manifest, css_dir)}'
+                      f'{match.group(2)}', css)
+
+def write_copy(path, data):
+    """Write a fingerprinted copy unless it already exists"""
+    if path.exists():
+        return False
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.tmp')
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return True
+
+def build_manifest(base_path, hash_cache):
+    """Fingerprint every asset; returns (manifest, hash cache, copies written, outdated copies)
+
+    Stylesheets are hashed after their references are rewritten, so a changed font or image
+    also changes the hash of every stylesheet using it. They are fingerprinted after all other
+    files, in @import order.
+    """
+    base_path = Path(base_path)
+    manifest = {}
+    files = {}
+    written = []
+    stylesheets = []
+
+    for path in source_assets(base_path):
+        key = path.relative_to(base_path).as_posix()
+        if path.suffix.lower() == '.css':
+            stylesheets.append((key, path))
+            continue
+
+        stat = path.stat()
+        entry = hash_cache.get(key)
+        data = None
+        if entry is None or entry[:2] != [stat.st_mtime_ns, stat.st_size]:
+            data = path.read_bytes()
+            entry = [stat.st_mtime_ns, stat.st_size, content_hash(data)]
+        files[key] = entry
+
+        # A file whose name already carries its own hash is its own copy
+        if carries_hash(path.name, entry[2]):
+            manifest[key] = key
+            continue
+
+        manifest[key] = posixpath.join(posixpath.dirname(key), fingerprinted_name(path.name, entry[2]))
+        if not (base_path / manifest[key]).exists():
+            write_copy(base_path / manifest[key], data if data is not None else path.read_bytes())
+            written.append(manifest[key])
+
+    pending = dict(stylesheets)
+    def fingerprint_stylesheet(key):
+        path = pending.pop(key)
+        css = path.read_text(encoding='utf-8')
+        # Imported sheets first, so this one points at their final names; a sheet being
+        # fingerprinted is no longer pending, which ends @import cycles
+        css_dir = posixpath.dirname(key)
+        references = ([match.group(3) for match in CSS_IMPORT_STRING_PATTERN.finditer(css)]
+                      + [match.group(2) for match in URL_PATTERN.finditer(css)])
+        for url in references:
+            target = asset_key(pending, posixpath.normpath(posixpath.join(css_dir, url.split('?')[0])))
+            if target is not None:
+                fingerprint_stylesheet(target)
+
+        data = fingerprint_css(css, manifest, css_dir).encode('utf-8')
+        digest = content_hash(data)
+        if carries_hash(path.name, digest) and data == path.read_bytes():
+            manifest[key] = key
+            return
+        manifest[key] = posixpath.join(posixpath.dirname(key), fingerprinted_name(path.name, digest))
+        if write_copy(base_path / manifest[key], data):
+            written.append(manifest[key])
+
+    while pending:
+        fingerprint_stylesheet(next(iter(pending)))
+
+    current = set(manifest.values())
+    stale = [path.relative_to(base_path).as_posix() for path in asset_files(base_path)
+             if (original_asset(path) != path or is_precompressed(path))
+             and path.relative_to(base_path).as_posix() not in current]
+    return dict(sorted(manifest.items())), files, written, stale
+
+# Manifest loaded once per process, and again if the file changes under a watch process
+_manifest = None
+_manifest_stat = None
+
+def current_manifest(base_path):
+    """The manifest, reloaded only when its mtime or size moved since the last load"""
+    global _manifest, _manifest_stat
+    try:
+        stat = manifest_path(base_path).stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        key = None
+    if _manifest is None or key != _manifest_stat:
+        _manifest, _manifest_stat = load_manifest(base_path), key
+    return _manifest
+
+def fingerprint_references(content, base_path, page_dir=None):
+    """Point every local asset URL in a page at its fingerprinted copy"""
+    changes = []
+    base_path = Path(base_path)
+    deps.record_input(manifest_path(base_path))
+    manifest = current_manifest(base_path)
+    if not manifest:
+        return content, changes
+
+    page_dir = posixpath.relpath(Path(page_dir or base_path).resolve().as_posix(), base_path.resolve().as_posix())
+    page_dir = '' if page_dir == '.' else page_dir
+    rewritten = 0
+
+    def rewrite_url(match):
+        nonlocal rewritten
+        url = fingerprint_url(match.group(2), manifest, page_dir)
+        if url == match.group(2):
+            return match.group()
+        rewritten += 1
+        return f'url({match.group(1)}{url}{match.group(1)})'
+
+    def rewrite_attr(match):
+        nonlocal rewritten
+        value = match.group(4)
+        if match.group(2).lower() in SRCSET_ATTRS:
+            new_value = fingerprint_srcset(value, manifest, page_dir)
+        else:
+            new_value = fingerprint_url(value, manifest, page_dir)
+        if new_value == value:
+            return match.group()
+        rewritten += 1
+        return f'{match.group(1)}{match.group(3)}{new_value}{match.group(3)}'
+
+    content = ATTR_PATTERN.sub(rewrite_attr, content)
+    # Inline <style> blocks and style attributes
+    if 'url(' in content:
+        content = URL_PATTERN.sub(rewrite_url, content)
+
+    if rewritten:
+        changes.append(f"  - Pointed {rewritten} asset references at fingerprinted copies")
+    return content, changes
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Write content-hashed copies of the site's assets")
+    parser.add_argument('--prune', action='store_true',
+                        help="delete fingerprinted copies the manifest no longer points at")
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("EVOLIFE - ASSET FINGERPRINTS")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    manifest, files, written, stale = build_manifest(base_path, load_hash_cache(base_path))
+
+    save_json(manifest_path(base_path), {'version': MANIFEST_VERSION, 'assets': manifest})
+    save_json(base_path / CACHE_DIR / HASH_CACHE_NAME, {'version': MANIFEST_VERSION, 'files': files})
+
+    print(f"✓ {len(manifest)} assets fingerprinted, {len(written)} new copies")
+    for name in written:
+        print(f"  - {name}")
+    for name in stale:
+        if args.prune:
+            (base_path / name).unlink()
+            print(f"  - Removed {name}")
+        else:
+            print(f"⚠ Outdated copy kept for cached pages (--prune removes it): {name}")
+
+    print("\n" + "="*60)
+    print(f"FINGERPRINTS COMPLETE: manifest written to {manifest_path(base_path).relative_to(base_path)}")
+    print("Point the pages at them with: python3 pipeline.py --pass asset-urls")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,10 @@ Adds descriptive alt text based on image context
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
+from rule_engine import apply_rule, compile_rules
 
 # Alt text mapping based on image purpose and context
 ALT_TEXT_RULES = [
@@ -54,6 +57,19 @@ ALT_TEXT_RULES = [
     # These are handled separately
 ]
 
+# Remaining generic empty alts in specific contexts
+CONTEXT_ALT_RULES = [
+    # For images in product cards without alt text
+    (r'(<img[^>]+class="[^"]*lowdown-card__img[^"]*"[^>]+)alt=""', r'\\1alt="Product illustration"'),
+
+    # For images in testimonials
+    (r'(<img[^>]+class="[^"]*testimonial[^"]*"[^>]+)alt=""', r'\\1alt="Customer testimonial"'),
+]
+
+# Compiled once at import
+COMPILED_ALT_TEXT_RULES = compile_rules(ALT_TEXT_RULES, re.IGNORECASE, name='ALT_TEXT_RULES')
+COMPILED_CONTEXT_ALT_RULES = compile_rules(CONTEXT_ALT_RULES, name='CONTEXT_ALT_RULES')
+
 # Images that should remain decorative (alt="") but need role="presentation"
 DECORATIVE_PATTERNS = [
     r'class="[^"]*card-gradient[^"]*"',
@@ -65,28 +81,15 @@ def fix_alt_tags_in_content(content):
     """Apply all alt text rules to content"""
     changes_made = []
 
-    for pattern, replacement in ALT_TEXT_RULES:
-        matches = re.findall(pattern, content, re.IGNORECASE)
-        if matches:
-            content = re.sub(pattern, replacement, content, flags=re.IGNORECASE)
-            # Count how many times this pattern was replaced
-            count = len(re.findall(re.escape(replacement.split('alt="')[1].split('"')[0]), content))
-            changes_made.append(f"  - Added '{replacement.split('alt=\"')[1].split('\"')[0]}' ({len(matches)} images)")
+    for regex, replacement in COMPILED_ALT_TEXT_RULES:
+        content, count = apply_rule(content, regex, replacement)
+        if count:
+            alt_text = replacement.split('alt="')[1].split('"')[0]
+            changes_made.append(f"  - Added '{alt_text}' ({count} images)")
 
     # Fix remaining generic empty alts in specific contexts
-    # For images in product cards without alt text
-    content = re.sub(
-        r'(<img[^>]+class="[^"]*lowdown-card__img[^"]*"[^>]+)alt=""',
-        r'\\1alt="Product illustration"',
-        content
-    )
-
-    # For images in testimonials
-    content = re.sub(
-        r'(<img[^>]+class="[^"]*testimonial[^"]*"[^>]+)alt=""',
-        r'\\1alt="Customer testimonial"',
-        content
-    )
+    for regex, replacement in COMPILED_CONTEXT_ALT_RULES:
+        content, _count = apply_rule(content, regex, replacement)
 
     return content, changes_made
 
@@ -104,10 +107,8 @@ def fix_alt_tags_in_file(file_path):
     print(f"Empty alt tags found: {empty_alts_before}")
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.alt_backup_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'alt')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Apply fixes
     new_content, changes = fix_alt_tags_in_content(content)
@@ -117,7 +118,7 @@ def fix_alt_tags_in_file(file_path):
     fixed_count = empty_alts_before - empty_alts_after
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Changes applied:")
     if changes:
@@ -6,7 +6,10 @@ Phase 3.3: Ensure consistent branding across all pages
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
+from rule_engine import apply_rule, compile_rules
 
 # Brand consistency fixes
 BRAND_FIXES = [
@@ -25,21 +28,22 @@ BRAND_FIXES = [
     # Already has "Your Evolife feeling awaits" so just verify it's there
 ]
 
-def apply_brand_fixes(content, fixes):
+# Compiled once at import
+BRAND_RULES = compile_rules(BRAND_FIXES, name='BRAND_FIXES')
+
+def apply_brand_fixes(content, rules):
     """Apply brand consistency fixes"""
     changes = []
 
-    for pattern, replacement in fixes:
-        matches = re.findall(pattern, content)
-        if matches:
-            old_content = content
-            content = re.sub(pattern, replacement, content)
-            if old_content != content:
-                # Describe the change
-                if 'facebook' in pattern:
-                    changes.append("  - Updated Facebook link: joinfridays → joinevolife")
-                elif 'tiktok' in pattern:
-                    changes.append("  - Updated TikTok link: @joinfridays → @joinevolife")
+    for regex, replacement in rules:
+        old_content = content
+        content, count = apply_rule(content, regex, replacement)
+        if count and old_content != content:
+            # Describe the change
+            if 'facebook' in regex.pattern:
+                changes.append("  - Updated Facebook link: joinfridays → joinevolife")
+            elif 'tiktok' in regex.pattern:
+                changes.append("  - Updated TikTok link: @joinfridays → @joinevolife")
 
     # Check for any remaining problematic Friday references
     # Exclude: "Friday feeling" (intentional marketing), "section_fridays-feeling" (CSS class)
@@ -68,13 +72,11 @@ def process_file(file_path):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.brand_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'brand')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Apply brand fixes
-    new_content, changes = apply_brand_fixes(content, BRAND_FIXES)
+    new_content, changes = apply_brand_fixes(content, BRAND_RULES)
 
     if not changes:
         print("✓ No brand consistency issues found")
@@ -82,7 +84,7 @@ def process_file(file_path):
 
     # Write back if changes were made
     if new_content != content:
-        file_path.write_text(new_content, encoding='utf-8')
+        write_page(file_path, new_content, content)
 
     print(f"\n✓ Brand consistency check:")
     for change in changes:
@@ -6,7 +6,9 @@ Phase 3.5: Ensure 4.5:1 contrast ratio for normal text, 3:1 for large text
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
 
 # Color contrast fixes CSS
 # Based on WCAG AA requirements: 4.5:1 for normal text, 3:1 for large text
@@ -196,10 +198,8 @@ def process_file(file_path):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.contrast_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'contrast')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Apply contrast fixes
     new_content, changes = add_contrast_fixes(content)
@@ -209,7 +209,7 @@ def process_file(file_path):
         return True
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Color contrast enhancements:")
     for change in changes:
@@ -6,7 +6,10 @@ Handles minified HTML format where alt="" comes before class
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import write_page
+from rule_engine import apply_rule, compile_rules
 
 # Direct replacements for empty alt tags based on class names
 ALT_FIXES = [
@@ -40,18 +43,22 @@ ALT_FIXES = [
     (r'alt=""([^>]*?)src="[^"]*muscle', 'alt="Strength icon"\\1src="'),
 ]
 
+# Compiled once at import
+ALT_FIX_RULES = compile_rules(ALT_FIXES, name='ALT_FIXES')
+
+ALT_ATTR_PATTERN = re.compile(r'alt="([^"]+)"')
+
 def fix_empty_alts(content):
     """Fix empty alt attributes"""
     changes = []
 
-    for pattern, replacement in ALT_FIXES:
-        count_before = len(re.findall(pattern, content))
-        if count_before > 0:
-            content = re.sub(pattern, replacement, content)
+    for regex, replacement in ALT_FIX_RULES:
+        content, count = apply_rule(content, regex, replacement)
+        if count > 0:
             # Extract alt text for reporting
-            alt_text = re.search(r'alt="([^"]+)"', replacement)
+            alt_text = ALT_ATTR_PATTERN.search(replacement)
             if alt_text:
-                changes.append(f"  - '{alt_text.group(1)}' ({count_before} images)")
+                changes.append(f"  - '{alt_text.group(1)}' ({count} images)")
 
     return content, changes
 
@@ -65,24 +72,22 @@ def process_file(file_path):
     content = file_path.read_text(encoding='utf-8')
 
     # Count empty alts
-    empty_before = len(re.findall(r'alt=""', content))
+    empty_before = content.count('alt=""')
     print(f"Empty alt tags before: {empty_before}")
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.alt_v2_backup_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'alt_v2')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Fix empty alts
     new_content, changes = fix_empty_alts(content)
 
     # Count after
-    empty_after = len(re.findall(r'alt=""', new_content))
+    empty_after = new_content.count('alt=""')
     fixed = empty_before - empty_after
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Alt text added:")
     for change in changes:
@@ -4,9 +4,14 @@ Fix incorrect testosterone content on recovery and weight-management pages
 Phase 2.3: Remove testosterone charts and fix category-specific content
 """
 
+import argparse
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from page_writer import sync_writes, write_page
+from parallel import add_jobs_argument, map_pages
+from rule_engine import apply_rule, compile_flagged_rules
 
 # Fixes for Recovery page
 RECOVERY_FIXES = [
@@ -80,29 +85,33 @@ WEIGHT_MANAGEMENT_FIXES = [
     ),
 ]
 
-def apply_fixes(content, fixes):
+# Compiled once at import
+RECOVERY_RULES = compile_flagged_rules(RECOVERY_FIXES, name='RECOVERY_FIXES')
+WEIGHT_MANAGEMENT_RULES = compile_flagged_rules(WEIGHT_MANAGEMENT_FIXES, name='WEIGHT_MANAGEMENT_FIXES')
+
+EDGE_CARD_TITLE_PATTERN = re.compile(r'<h4 class="edge__card-title">([^<]+)</h4>')
+
+# Pages and their page-specific configuration
+PAGES = [
+    ('recovery.html', RECOVERY_RULES, 'Recovery'),
+    ('weight-management.html', WEIGHT_MANAGEMENT_RULES, 'Weight Management')
+]
+
+def apply_fixes(content, rules):
     """Apply all fixes to content"""
     changes = []
 
-    for pattern, replacement, flags in fixes:
-        if flags == re.DOTALL:
-            matches = re.findall(pattern, content, flags)
-        else:
-            matches = re.findall(pattern, content)
-
-        if matches:
-            if flags == re.DOTALL:
-                content = re.sub(pattern, replacement, content, flags=flags)
-            else:
-                content = re.sub(pattern, replacement, content)
+    for regex, replacement in rules:
+        content, count = apply_rule(content, regex, replacement)
 
+        if count:
             # Describe the change
             if replacement == '':
                 changes.append(f"  - Removed testosterone chart section")
-            elif 'heading-style-h4-7' in pattern:
+            elif 'heading-style-h4-7' in regex.pattern:
                 changes.append(f"  - Updated section heading to category-appropriate")
-            elif 'edge__card-title' in pattern:
-                title_match = re.search(r'<h4 class="edge__card-title">([^<]+)</h4>', replacement)
+            elif 'edge__card-title' in regex.pattern:
+                title_match = EDGE_CARD_TITLE_PATTERN.search(replacement)
                 if title_match:
                     changes.append(f"  - Updated edge card: {title_match.group(1)}")
 
@@ -118,10 +127,8 @@ def process_file(file_path, fixes, category):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.content_fix_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'content_fix')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Apply fixes
     new_content, changes = apply_fixes(content, fixes)
@@ -131,7 +138,7 @@ def process_file(file_path, fixes, category):
         return True
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ Content fixes applied:")
     for change in changes:
@@ -143,6 +150,10 @@ def process_file(file_path, fixes, category):
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Fix incorrect testosterone content on recovery and weight-management pages")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("EVOLIFE - FIX INCORRECT TESTOSTERONE CONTENT")
     print("="*60)
@@ -150,21 +161,24 @@ def main():
 
     base_path = Path("/Users/raiyanabdullah/Desktop/Evolife FInal and last")
 
-    pages = [
-        ('recovery.html', RECOVERY_FIXES, 'Recovery'),
-        ('weight-management.html', WEIGHT_MANAGEMENT_FIXES, 'Weight Management')
-    ]
-
     success_count = 0
 
-    for filename, fixes, category in pages:
+    items = []
+    for filename, fixes, category in PAGES:
         file_path = base_path / filename
         if file_path.exists():
-            if process_file(file_path, fixes, category):
-                success_count += 1
+            items.append((file_path, fixes, category))
         else:
             print(f"\n✗ File not found: {filename}")
 
+    # Pages run in parallel; output is replayed in page order
+    for success, output in map_pages(process_file, items, args.jobs, capture=True):
+        print(output, end='')
+        if success:
+            success_count += 1
+    # The workers wrote the pages; flush them to disk in one pass
+    sync_writes(file_path for file_path, *_ in items)
+
     print("\n" + "="*60)
     print(f"CONTENT FIX COMPLETE: {success_count}/2 pages updated")
     print("="*60)
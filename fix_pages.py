@@ -5,7 +5,10 @@ Batch fix content issues across Recovery and Weight Management pages
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from literal_replace import compile_literals, replace_literals
+from page_writer import write_page
 
 # Define all replacements for each page
 RECOVERY_REPLACEMENTS = [
@@ -128,25 +131,27 @@ WEIGHT_MANAGEMENT_REPLACEMENTS = [
     ('text-color-red--950', 'text-color-green--950'),
 ]
 
+# Built once at import
+RECOVERY_MATCHER = compile_literals(RECOVERY_REPLACEMENTS)
+WEIGHT_MANAGEMENT_MATCHER = compile_literals(WEIGHT_MANAGEMENT_REPLACEMENTS)
+
 def create_backup(file_path):
-    """Create a timestamped backup of the file"""
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.backup_{timestamp}{file_path.suffix}')
-    backup_path.write_text(file_path.read_text(encoding='utf-8'), encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
-    return backup_path
-
-def apply_replacements(content, replacements):
-    """Apply all replacements to content"""
+    """Snapshot the file in the backup store"""
+    blob = backup_page(file_path, file_path.read_text(encoding='utf-8'), 'backup')
+    print(f"✓ Backup stored: {blob[:12]}")
+    return blob
+
+def apply_replacements(content, matcher):
+    """Apply all replacements to content in a single scan"""
     changes_made = []
-    for old, new in replacements:
-        if old in content:
-            count = content.count(old)
-            content = content.replace(old, new)
-            changes_made.append(f"  - Replaced '{old[:50]}...' ({count} occurrence(s))")
+    content, counts = replace_literals(content, matcher)
+    _regex, replacements = matcher
+    for old in replacements:
+        if counts.get(old):
+            changes_made.append(f"  - Replaced '{old[:50]}...' ({counts[old]} occurrence(s))")
     return content, changes_made
 
-def fix_file(file_path, replacements, page_name):
+def fix_file(file_path, matcher, page_name):
     """Fix a single HTML file with given replacements"""
     print(f"\n{'='*60}")
     print(f"Processing: {page_name}")
@@ -156,22 +161,24 @@ def fix_file(file_path, replacements, page_name):
     content = file_path.read_text(encoding='utf-8')
     original_length = len(content)
 
+    # Apply replacements
+    new_content, changes = apply_replacements(content, matcher)
+
+    # Nothing matched: leave the page, and its mtime, alone
+    if not changes:
+        print("\n⚠ No changes made (patterns not found)")
+        return 0
+
     # Create backup
     create_backup(file_path)
 
-    # Apply replacements
-    new_content, changes = apply_replacements(content, replacements)
-
     # Show changes
-    if changes:
-        print(f"\n✓ Changes applied:")
-        for change in changes:
-            print(change)
-    else:
-        print("\n⚠ No changes made (patterns not found)")
+    print(f"\n✓ Changes applied:")
+    for change in changes:
+        print(change)
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
     new_length = len(new_content)
 
     print(f"\n✓ File updated: {file_path.name}")
@@ -190,7 +197,7 @@ def main():
     # Fix Recovery page
     recovery_path = base_path / "recovery.html"
     if recovery_path.exists():
-        changes = fix_file(recovery_path, RECOVERY_REPLACEMENTS, "Recovery Page")
+        changes = fix_file(recovery_path, RECOVERY_MATCHER, "Recovery Page")
         print(f"\n✓ Recovery page: {changes} replacements applied")
     else:
         print(f"\n✗ Recovery page not found: {recovery_path}")
@@ -198,7 +205,7 @@ def main():
     # Fix Weight Management page
     weight_path = base_path / "weight-management.html"
     if weight_path.exists():
-        changes = fix_file(weight_path, WEIGHT_MANAGEMENT_REPLACEMENTS, "Weight Management Page")
+        changes = fix_file(weight_path, WEIGHT_MANAGEMENT_MATCHER, "Weight Management Page")
         print(f"\n✓ Weight Management page: {changes} replacements applied")
     else:
         print(f"\n✗ Weight Management page not found: {weight_path}")
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Product pages rendered from data/product-content.json over the semaglutide-new.html template
+The template is compiled once per process into static text and per-product fields, so a
+render is a single join. Each page's inputs - its product's record in the data file, the
+template and this script - go into the dependency graph, so only products whose inputs
+changed are rendered again
+"""
+
+import argparse
+import json
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+
+import deps
+from backup_store import RUN_ID, append_journal, journal_entry, store_blob
+from page_writer import sync_writes, write_page
+from parallel import add_jobs_argument, map_pages
+
+TEMPLATE_PAGE = 'semaglutide-new.html'
+DATA_PATH = 'data/product-content.json'
+STEP = 'products'
+
+DOCTOR_QUOTE = (
+    '"{hero.title} represents a significant advancement in peptide therapy. As a physician specializing in '
+    "wellness optimization, I've witnessed firsthand how this treatment helps patients achieve their health "
+    'goals when combined with proper medical supervision and lifestyle support. The clinical evidence is '
+    'compelling, and real-world outcomes demonstrate consistent results."'
+)
+
+def field(product, path):
+    """Value at a dotted path in a product's data, e.g. hero.title"""
+    value = product
+    for key in path.split('.'):
+        value = value[key]
+    return str(value)
+
+def stats_section(product, original):
+    """The stats bar, one stat per entry"""
+    if not product.get('stats'):
+        return original
+    stats = ''.join(f'''
+      <div class="stat">
+        <div class="stat__number">{stat['number']}</div>
+        <div class="stat__label">{stat['label']}</div>
+      </div>''' for stat in product['stats'])
+    return f'''<section class="stats-bar">
+  <div class="container container--xl">
+    <div class="stats-bar__grid">{stats}
+    </div>
+  </div>
+</section>'''
+
+def info_box(product, original):
+    """The "How it works" box closing the What is section"""
+    box = product['whatIs'].get('infoBox')
+    if not box:
+        return original
+    mechanisms = '\n'.join(f'        <li>{item}</li>' for item in box['mechanisms'])
+    return f'''<div class="info-box">
+      <div class="info-box__title">{box['title']}</div>
+      <p class="mb-4">
+        {box['intro']}
+      </p>
+      <ul class="checklist">
+{mechanisms}
+      </ul>
+      <p class="mt-4">
+        {box['conclusion']}
+      </p>
+    </div>
+  </div>
+</section>'''
+
+def benefits_subtitle(product, original=None):
+    """Subtitle of the Key Benefits section"""
+    return product['benefits'].get('subtitle') or f"Why thousands choose {product['hero']['title']} for optimal results"
+
+def benefits_section(product, original):
+    """The Key Benefits section with the product's first six benefit cards"""
+    items = product.get('benefits', {}).get('items', [])
+    if len(items) < 6:
+        return original
+    cards = '\n'.join(f'''      <!-- Benefit: {benefit['title']} -->
+      <div class="card card--benefit">
+        <div class="icon-circle">
+          <span class="icon-lg">{benefit['icon']}</span>
+        </div>
+        <h3 class="h4">{benefit['title']}</h3>
+        <p class="body-text">
+          {benefit['description']}
+        </p>
+      </div>
+''' for benefit in items[:6])
+    return f'''<section class="section section--padded section--bg-light">
+  <div class="container container--xl">
+    <div class="text-center mb-12">
+      <h2 class="display-md">Key Benefits</h2>
+      <p class="body-lg text-muted">
+        {benefits_subtitle(product)}
+      </p>
+    </div>
+
+    <div class="grid grid--3">
+{cards}
+    </div>
+  </div>
+</section>'''
+
+def what_is_comment(product, original):
+    """Section comment naming the product"""
+    return f"<!-- SECTION 3: WHAT IS {product['hero']['title'].upper()}? -->"
+
+def removed_section(name):
+    """Comment left where a semaglutide-only section is dropped"""
+    return f'<!-- {name} section removed - product-specific data to be added -->'
+
+# Template edits in order: (pattern, replacement, count; 0 = every match)
+# A string replacement may name product fields as {dotted.path}; a function gets the
+# product and the matched template text and returns the markup for that product
+TEMPLATE_EDITS = [
+    # Meta and title
+    (r'<meta name="description" content="[^"]*">', '<meta name="description" content="{meta.description}">', 1),
+    (r'<title>[^<]*</title>', '<title>{meta.title}</title>', 1),
+
+    # Hero
+    (r'<span class="badge badge--category">[^<]*</span>', '<span class="badge badge--category">{hero.category}</span>', 1),
+    (r'<h1 class="hero__title">[^<]*</h1>', '<h1 class="hero__title">{hero.title}</h1>', 1),
+    (r'<p class="hero__subtitle">\s*[\s\S]*?</p>', '<p class="hero__subtitle">\n        {hero.subtitle}\n      </p>', 1),
+    (r'<span class="display-md text-white">\$\d+<span class="price-suffix">/month</span></span>',
+     '<span class="display-md text-white">${hero.price}<span class="price-suffix">/month</span></span>', 1),
+    (r'<p class="body-sm text-white-soft">\s*[\s\S]*?</p>',
+     '<p class="body-sm text-white-soft">\n          {hero.priceNote}\n        </p>', 1),
+    (r'href="get-started\.html\?category=semaglutide"', 'href="get-started.html?category={slug}"', 0),
+
+    # Stats, What is, Key Benefits
+    (r'<section class="stats-bar">[\s\S]*?</section>', stats_section, 1),
+    (r'<h2 class="display-md mb-6">What is Semaglutide\?</h2>', '<h2 class="display-md mb-6">{whatIs.heading}</h2>', 1),
+    (r'<p class="body-xl text-center mb-8">\s*[\s\S]*?</p>',
+     '<p class="body-xl text-center mb-8">\n        {whatIs.description}\n      </p>', 1),
+    (r'<div class="info-box">[\s\S]*?</div>\s*</div>\s*</section>', info_box, 1),
+    (r'<section class="section section--padded section--bg-light">[\s\S]*?<h2 class="display-md">Key Benefits</h2>'
+     r'[\s\S]*?<div class="grid grid--3">[\s\S]*?</div>\s*</div>\s*</section>', benefits_section, 1),
+
+    # Remaining semaglutide references
+    (r'<!-- SECTION 3: WHAT IS SEMAGLUTIDE\? -->', what_is_comment, 0),
+    (r'Why thousands choose Semaglutide for sustainable weight loss', benefits_subtitle, 0),
+    (r'Your semaglutide prescription is filled', 'Your {hero.title} prescription is filled', 0),
+    (r'if semaglutide is right for you', 'if {hero.title} is right for you', 0),
+    (r'"Semaglutide represents a breakthrough in weight management medicine[^"]*"', DOCTOR_QUOTE, 1),
+    (r'Every batch of semaglutide is independently tested', 'Every batch of {hero.title} is independently tested', 0),
+    (r'Ready to transform your health with Semaglutide\?', 'Ready to optimize your health with {hero.title}?', 0),
+    (r'Join thousands who have achieved sustainable weight loss with physician-supervised Semaglutide therapy',
+     'Join thousands who have achieved optimal results with physician-supervised {hero.title} therapy', 0),
+
+    # Semaglutide-only sections
+    (r'<!-- SECTION 6: SCIENTIFIC BACKING -->[\s\S]*?</section>', removed_section('Research'), 1),
+    (r'<!-- SECTION 7: EXPECTED RESULTS TIMELINE -->[\s\S]*?<section class="section section--padded section--bg-white">'
+     r'[\s\S]*?<h2 class="display-md">When to Expect Results</h2>[\s\S]*?</section>', removed_section('Timeline'), 1),
+    (r'<!-- SECTION 9: TESTIMONIALS -->[\s\S]*?<section class="section section--padded section--bg-white">'
+     r'[\s\S]*?<h2 class="display-md">What Our Patients Say</h2>[\s\S]*?</section>', removed_section('Testimonials'), 1),
+    (r'<!-- SECTION 10: SAFETY INFORMATION -->[\s\S]*?<section class="section section--padded section--bg-light">'
+     r'[\s\S]*?<h2 class="display-md mb-8 text-center">Important Safety Information</h2>[\s\S]*?</section>',
+     removed_section('Safety information'), 1),
+    (r'<!-- SECTION 11: FAQ -->[\s\S]*?<section class="section section--padded section--bg-white">'
+     r'[\s\S]*?<h2 class="display-md">Frequently Asked Questions</h2>[\s\S]*?</section>', removed_section('FAQ'), 1),
+]
+
+FIELD_PATTERN = re.compile(r'\{([\w.]+)\}')
+
+# Private-use characters mark where a product field goes while the edits run
+SLOT_START, SLOT_END = '\ue000', '\ue001'
+SLOT_PATTERN = re.compile(f'{SLOT_START}(\\d+){SLOT_END}')
+
+def compile_template(template):
+    """Compile the template into render(product) -> page text
+
+    The edits run once, leaving numbered slots where product values go; rendering
+    then only evaluates the fields and joins them with the static text between.
+    Values are inserted literally, so markup in the data is never re-matched by a
+    later edit.
+    """
+    fields = []
+
+    def slot(function):
+        fields.append(function)
+        return f'{SLOT_START}{len(fields) - 1}{SLOT_END}'
+
+    html = template
+    for pattern, replacement, count in TEMPLATE_EDITS:
+        if callable(replacement):
+            def substitute(match, replacement=replacement):
+                original = match.group()
+                return slot(lambda product: replacement(product, original))
+        else:
+            def substitute(match, replacement=replacement):
+                return FIELD_PATTERN.sub(lambda field_match: slot(
+                    lambda product, path=field_match.group(1): field(product, path)), replacement)
+        html = re.sub(pattern, substitute, html, count=count)
+
+    parts = SLOT_PATTERN.split(html)
+    static = parts[0::2]
+    slots = [fields[int(index)] for index in parts[1::2]]
+
+    def render(product):
+        pieces = [static[0]]
+        for function, text in zip(slots, static[1:]):
+            pieces += [function(product), text]
+        return ''.join(pieces)
+
+    return render
+
+@lru_cache(maxsize=4)
+def compiled_template(template_path, mtime_ns):
+    """Render function for a template file, compiled once per process and file version"""
+    return compile_template(Path(template_path).read_text(encoding='utf-8'))
+
+def load_products(base_path):
+    """Products from the data file, in file order"""
+    return json.loads((Path(base_path) / DATA_PATH).read_text(encoding='utf-8'))['products']
+
+def render_page(template_path, mtime_ns, product, output):
+    """Render one product page and write it atomically; runs in pool workers
+
+    Returns the backup blob of the page it replaced, '' if the page is new, or None
+    if the rendered page is identical to the one on disk (which is then not touched).
+    """
+    output = Path(output)
+    html = compiled_template(template_path, mtime_ns)(product)
+    try:
+        previous = output.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        previous = None
+    if html == previous:
+        return None
+
+    blob = store_blob(output.parent, previous) if previous is not None else ''
+    write_page(output, html, previous)
+    return blob
+
+def stale_products(base_path, graph, products):
+    """Products whose data or template changed since their page was rendered, or that have no page"""
+    dirty = set(deps.dirty_pages(graph, base_path, {f"{product['slug']}.html": [STEP] for product in products}))
+    return [product for product in products
+            if f"{product['slug']}.html" in dirty or not (Path(base_path) / f"{product['slug']}.html").exists()]
+
+def render_products(base_path, graph, products, jobs=1):
+    """Render the products' pages and record their inputs; yields (page name, blob) in order"""
+    template_path = Path(base_path) / TEMPLATE_PAGE
+    mtime_ns = template_path.stat().st_mtime_ns
+    items = [(str(template_path), mtime_ns, product, str(Path(base_path) / f"{product['slug']}.html"))
+             for product in products]
+    for product, blob in zip(products, map_pages(render_page, items, jobs)):
+        page_name = f"{product['slug']}.html"
+        deps.record_page(graph, base_path, page_name, STEP,
+                         [deps.data_node(DATA_PATH, product['slug']), TEMPLATE_PAGE, Path(__file__)])
+        yield page_name, blob
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description=f"Render product pages from {DATA_PATH}")
+    parser.add_argument('slugs', nargs='*', metavar='SLUG', help="products to render (default: all)")
+    parser.add_argument('--list', action='store_true', help="list the products and exit")
+    parser.add_argument('--force', action='store_true', help="render products whose inputs are unchanged too")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+
+    base_path = Path(__file__).parent
+    products = load_products(base_path)
+
+    if args.list:
+        for product in products:
+            print(f"{product['slug']:35} {product['hero']['title']}")
+        return
+
+    print("\n" + "="*60)
+    print("EVOLIFE - PRODUCT PAGES")
+    print("="*60)
+
+    started = time.perf_counter()
+    unknown = set(args.slugs) - {product['slug'] for product in products}
+    if unknown:
+        raise SystemExit(f"✗ Unknown product: {', '.join(sorted(unknown))}")
+    if args.slugs:
+        products = [product for product in products if product['slug'] in args.slugs]
+
+    graph = deps.load_graph(base_path)
+    pending = products if args.force else stale_products(base_path, graph, products)
+    print(f"✓ {len(products)} products, {len(pending)} with changed data or template")
+
+    journal = []
+    written = []
+    for page_name, blob in render_products(base_path, graph, pending, args.jobs):
+        if blob is None:
+            print(f"  - {page_name}: unchanged")
+            continue
+        if blob:
+            journal.append(journal_entry(page_name, blob, 'product-pages'))
+        written.append(base_path / page_name)
+        print(f"  - {page_name}: {'written' if blob else 'created'}")
+
+    sync_writes(written)
+    deps.save_graph(base_path, graph)
+    if journal:
+        append_journal(base_path, journal)
+
+    print("\n" + "="*60)
+    print(f"PRODUCT PAGES COMPLETE: {len(pending)} rendered, {len(products) - len(pending)} skipped "
+          f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+    if journal:
+        print(f"Backup run: {RUN_ID} (undo with: python3 backup_store.py restore PAGE {RUN_ID})")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Streaming, element-aware HTML tokenizer with a small selector API
+Finds a section by tag, class, id or attribute and replaces its subtree in one
+left-to-right pass - no lazy DOTALL spans, so a missing anchor costs a single scan
+Works on minified single-line pages as well as formatted markup
+"""
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+# Elements whose content is not markup
+RAW_TEXT_ELEMENTS = {'script', 'style', 'textarea', 'title'}
+
+START_TAG_PATTERN = re.compile(r'<([a-zA-Z][^\t\n\f\r />]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>')
+END_TAG_PATTERN = re.compile(r'</([a-zA-Z][^\t\n\f\r />]*)[^>]*>')
+ATTR_PATTERN = re.compile(r'([^\s"\'>/=]+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'=<>`]+)))?')
+RAW_TEXT_END_PATTERNS = {name: re.compile(f'</{name}[\\s/>]', re.IGNORECASE) for name in RAW_TEXT_ELEMENTS}
+
+SELECTOR_PART_PATTERN = re.compile(
+    r'(?P<tag>^[a-zA-Z][\w-]*|^\*)'
+    r'|#(?P<id>[\w-]+)'
+    r'|\.(?P<class>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:(?P<op>[\^$*]?=)(?P<quote>["\']?)(?P<value>.*?)(?P=quote))?\]'
+)
+
+# A located element: offsets of the open tag, the content and the close tag
+Element = namedtuple('Element', 'name start open_end close_start end attr_text')
+
+def tokenize(html, pos=0, endpos=None):
+    """Yield (kind, name, start, end, attr_text) for every tag in html[pos:endpos]
+
+    kind is 'start', 'empty' (void or self-closing), 'end', 'comment' or
+    'declaration'. Text is not yielded; the content of script, style,
+    textarea and title elements is skipped without being parsed.
+    """
+    if endpos is None:
+        endpos = len(html)
+    find = html.find
+
+    while True:
+        lt = find('<', pos, endpos)
+        if lt < 0:
+            return
+
+        if html.startswith('<!--', lt):
+            close = find('-->', lt + 4, endpos)
+            pos = endpos if close < 0 else close + 3
+            yield ('comment', None, lt, pos, None)
+            continue
+
+        match = START_TAG_PATTERN.match(html, lt, endpos)
+        if match:
+            name = match.group(1).lower()
+            attr_text = match.group(2)
+            pos = match.end()
+            if name in VOID_ELEMENTS or attr_text.endswith('/'):
+                yield ('empty', name, lt, pos, attr_text)
+                continue
+            yield ('start', name, lt, pos, attr_text)
+            if name in RAW_TEXT_ELEMENTS:
+                raw_end = RAW_TEXT_END_PATTERNS[name].search(html, pos, endpos)
+                pos = raw_end.start() if raw_end else endpos
+            continue
+
+        match = END_TAG_PATTERN.match(html, lt, endpos)
+        if match:
+            pos = match.end()
+            yield ('end', match.group(1).lower(), lt, pos, None)
+            continue
+
+        if html.startswith('<!', lt) or html.startswith('<?', lt):
+            close = find('>', lt, endpos)
+            pos = endpos if close < 0 else close + 1
+            yield ('declaration', None, lt, pos, None)
+            continue
+
+        # A bare '<' in text
+        pos = lt + 1
+
+def parse_attrs(attr_text):
+    """Attribute dict of a tag; names are lower-cased, bare attributes map to ''"""
+    attrs = {}
+    for match in ATTR_PATTERN.finditer(attr_text or ''):
+        name, double, single, bare = match.groups()
+        attrs.setdefault(name.lower(), double if double is not None else single if single is not None else bare or '')
+    return attrs
+
+@lru_cache(maxsize=None)
+def parse_selector(selector):
+    """Parse 'tag#id.class[attr^="value"] descendant' into compound selectors
+
+    Each compound is (tag or None, ((attr, op, value), ...)). Supported
+    operators are presence, =, ^=, $=, *= and class membership.
+    """
+    compounds = []
+    for part in selector.split():
+        tag = None
+        conditions = []
+        pos = 0
+        while pos < len(part):
+            match = SELECTOR_PART_PATTERN.match(part, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Unsupported selector: {selector!r}")
+            if match.group('tag'):
+                tag = None if match.group('tag') == '*' else match.group('tag').lower()
+            elif match.group('id'):
+                conditions.append(('id', '=', match.group('id')))
+            elif match.group('class'):
+                conditions.append(('class', '~=', match.group('class')))
+            else:
+                conditions.append((match.group('attr').lower(), match.group('op'), match.group('value')))
+            pos = match.end()
+        compounds.append((tag, tuple(conditions)))
+    return tuple(compounds)
+
+def condition_holds(attrs, attr, op, value):
+    """Check one attribute condition"""
+    actual = attrs.get(attr)
+    if actual is None:
+        return False
+    if op is None:
+        return True
+    if op == '=':
+        return actual == value
+    if op == '~=':
+        return value in actual.split()
+    if op == '^=':
+        return actual.startswith(value)
+    if op == '$=':
+        return actual.endswith(value)
+    return value in actual
+
+def compound_matches(compound, name, attr_text):
+    """True if a start tag matches a compound selector"""
+    tag, conditions = compound
+    if tag is not None and tag != name:
+        return False
+    if not conditions:
+        return True
+    # Every wanted value appears verbatim in a matching tag - skip parsing the rest
+    if any(value and value not in attr_text for _attr, _op, value in conditions):
+        return False
+    attrs = parse_attrs(attr_text)
+    return all(condition_holds(attrs, attr, op, value) for attr, op, value in conditions)
+
+def find_close(html, name, pos, endpos=None):
+    """Offsets (close_start, end) of the tag closing an element opened before pos
+
+    End tags that were never opened are ignored; an end tag closes any
+    elements left open inside it, as browsers do for <p> and <li>.
+    """
+    stack = [name]
+    for kind, tag, start, end, _attr_text in tokenize(html, pos, endpos):
+        if kind == 'start':
+            stack.append(tag)
+        elif kind == 'end' and tag in stack:
+            while stack.pop() != tag:
+                pass
+            if not stack:
+                return start, end
+    return None
+
+def iter_elements(html, compound, pos=0, endpos=None):
+    """Yield elements matching one compound selector, in document order"""
+    for kind, name, start, end, attr_text in tokenize(html, pos, endpos):
+        if kind not in ('start', 'empty') or not compound_matches(compound, name, attr_text):
+            continue
+        if kind == 'empty':
+            yield Element(name, start, end, end, end, attr_text)
+            continue
+        close = find_close(html, name, end, endpos)
+        if close is None:
+            # Unclosed element - its extent is unknown
+            continue
+        yield Element(name, start, end, close[0], close[1], attr_text)
+
+def find_descendant(html, compounds, pos, endpos):
+    """First element matching the last compound inside elements matching the others"""
+    for element in iter_elements(html, compounds[0], pos, endpos):
+        if len(compounds) == 1:
+            return element
+        found = find_descendant(html, compounds[1:], element.open_end, element.close_start)
+        if found is not None:
+            return found
+    return None
+
+def find_element(html, selector, pos=0, endpos=None):
+    """First element matching a selector, or None"""
+    compounds = parse_selector(selector)
+    # Every wanted value appears verbatim in a match - a missing section costs one
+    # substring search instead of a tokenizer pass over the page
+    for _tag, conditions in compounds:
+        if any(value and html.find(value, pos, endpos) < 0 for _attr, _op, value in conditions):
+            return None
+    return find_descendant(html, compounds, pos, endpos)
+
+def inner_html(html, element):
+    """Content between an element's open and close tags"""
+    return html[element.open_end:element.close_start]
+
+def replace_inner(html, selector, new_inner):
+    """Replace the content of the first matching element; returns (html, element or None)"""
+    element = find_element(html, selector)
+    if element is None:
+        return html, None
+    return html[:element.open_end] + new_inner + html[element.close_start:], element
+
+def replace_outer(html, selector, new_html):
+    """Replace the first matching element including its tags; returns (html, element or None)"""
+    element = find_element(html, selector)
+    if element is None:
+        return html, None
+    return html[:element.start] + new_html + html[element.end:], element
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Intrinsic image dimensions from file headers, for width/height attributes
+PNG, GIF, WebP, JPEG and SVG sizes are read without decoding the image and kept in
+.evolife-cache/image-dimensions.json keyed by path, mtime and size, so reruns only stat files
+"""
+
+import json
+import os
+import re
+import struct
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import deps
+from build_cache import CACHE_DIR
+from html_tokenizer import parse_attrs
+from page_writer import is_dry_run
+
+INDEX_NAME = 'image-dimensions.json'
+INDEX_VERSION = 1
+
+# Bytes read from an SVG to find its root element
+SVG_HEAD_BYTES = 65536
+
+IMG_TAG_PATTERN = re.compile(r'<img\b((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>', re.IGNORECASE)
+SVG_ROOT_PATTERN = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE)
+SVG_LENGTH_PATTERN = re.compile(r'\s*([0-9]*\.?[0-9]+)\s*(px)?\s*$')
+REMOTE_URL_PATTERN = re.compile(r'(?:[a-z][a-z0-9+.-]*:|//)', re.IGNORECASE)
+
+# Hosts whose images are mirrored into assets/images as <path segments joined by _>,
+# e.g. cdn.prod.website-files.com/66c8.../6891..._Evolife-Ozempic.webp
+MIRRORED_HOSTS = {'cdn.prod.website-files.com'}
+MIRROR_DIR = 'assets/images'
+
+# With intrinsic width/height on an image scaled down by max-width, height:auto keeps
+# the aspect ratio; :where() has no specificity, so any class rule setting a height wins
+DIMENSIONS_CSS = '''
+<!-- Image Dimensions -->
+<style>:where(img[width][height]){height:auto}</style>
+'''
+
+# JPEG start-of-frame markers (not DHT C4, JPG C8 or DAC CC)
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+# EXIF orientations that rotate by 90 degrees, so browsers swap width and height
+EXIF_TRANSPOSED = {5, 6, 7, 8}
+
+def png_size(head):
+    """Width and height from the IHDR chunk"""
+    if head[:8] == b'\x89PNG\r\n\x1a\n' and head[12:16] == b'IHDR':
+        return struct.unpack('>II', head[16:24])
+    return None
+
+def gif_size(head):
+    """Width and height from the logical screen descriptor"""
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return struct.unpack('<HH', head[6:10])
+    return None
+
+def webp_size(head):
+    """Width and height from the first VP8, VP8L or VP8X chunk"""
+    if head[:4] != b'RIFF' or head[8:12] != b'WEBP':
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and head[20:21] == b'\x2f':
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+def exif_orientation(segment):
+    """Orientation tag of an APP1 Exif segment, or None"""
+    if segment[:6] != b'Exif\x00\x00':
+        return None
+    tiff = segment[6:]
+    endian = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if endian is None or len(tiff) < 8:
+        return None
+
+    offset = struct.unpack(endian + 'I', tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    count = struct.unpack(endian + 'H', tiff[offset:offset + 2])[0]
+    for entry in range(count):
+        start = offset + 2 + entry * 12
+        if start + 12 > len(tiff):
+            break
+        tag, _type, _count = struct.unpack(endian + 'HHI', tiff[start:start + 8])
+        if tag == 0x0112:
+            return struct.unpack(endian + 'H', tiff[start + 8:start + 10])[0]
+    return None
+
+def jpeg_size(f):
+    """Width and height from the first start-of-frame segment, walking segment headers only"""
+    f.seek(0)
+    if f.read(2) != b'\xff\xd8':
+        return None
+
+    orientation = None
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None
+
+        marker = byte[0]
+        if marker == 0xD9 or marker == 0xDA:
+            return None
+        if 0xD0 <= marker <= 0xD7 or marker == 0x01:
+            continue
+
+        length_bytes = f.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            if orientation in EXIF_TRANSPOSED:
+                return height, width
+            return width, height
+
+        if marker == 0xE1 and orientation is None:
+            orientation = exif_orientation(f.read(length - 2))
+        else:
+            f.seek(length - 2, os.SEEK_CUR)
+
+def svg_length(value):
+    """Pixel length of an SVG width/height attribute, or None for relative units"""
+    match = SVG_LENGTH_PATTERN.match(value or '')
+    return round(float(match.group(1))) if match else None
+
+def svg_size(head):
+    """Width and height attributes of the root <svg>
+
+    An SVG with only a viewBox has no intrinsic size (it stretches to its box),
+    so it gets no attributes rather than its viewBox numbers.
+    """
+    match = SVG_ROOT_PATTERN.search(head)
+    if match is None:
+        return None
+    attrs = parse_attrs(match.group().decode('utf-8', errors='replace')[len('<svg'):-1])
+    width, height = svg_length(attrs.get('width')), svg_length(attrs.get('height'))
+    return (width, height) if width and height else None
+
+def read_dimensions(path):
+    """(width, height) of an image file from its header, or None if unknown"""
+    with open(path, 'rb') as f:
+        head = f.read(32)
+        for reader in (png_size, gif_size, webp_size):
+            size = reader(head)
+            if size is not None:
+                return size
+        if head[:2] == b'\xff\xd8':
+            return jpeg_size(f)
+        if Path(path).suffix.lower() == '.svg':
+            f.seek(0)
+            return svg_size(f.read(SVG_HEAD_BYTES))
+    return None
+
+# Dimension index
+
+_index = None
+_dirty = False
+
+def index_path(base_path):
+    """Location of the dimension index for a site root"""
+    return Path(base_path) / CACHE_DIR / INDEX_NAME
+
+def load_index(base_path):
+    """Load the dimension index once per process"""
+    global _index
+    if _index is None:
+        try:
+            index = json.loads(index_path(base_path).read_text(encoding='utf-8'))
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = {}
+        _index = index.get('images', {}) if index.get('version') == INDEX_VERSION else {}
+    return _index
+
+def save_index(base_path):
+    """Write new entries, merged with what other processes saved meanwhile; not in a dry run"""
+    global _dirty
+    if not _dirty or is_dry_run():
+        return
+
+    path = index_path(base_path)
+    images = dict(_index)
+    try:
+        saved = json.loads(path.read_text(encoding='utf-8'))
+        if saved.get('version') == INDEX_VERSION:
+            images = {**saved['images'], **images}
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{INDEX_NAME}.{os.getpid()}.tmp')
+    tmp_path.write_text(json.dumps({'version': INDEX_VERSION, 'images': images}, indent=1, sort_keys=True),
+                        encoding='utf-8')
+    os.replace(tmp_path, path)
+    _dirty = False
+
+def image_size(base_path, path):
+    """Dimensions of an image under the site root, from the index while the file is unchanged"""
+    global _dirty
+    deps.record_input(path)
+    index = load_index(base_path)
+    stat = path.stat()
+    key = path.relative_to(base_path).as_posix()
+
+    entry = index.get(key)
+    if entry is None or entry[:2] != [stat.st_mtime_ns, stat.st_size]:
+        size = read_dimensions(path)
+        entry = [stat.st_mtime_ns, stat.st_size, *(size or (None, None))]
+        index[key] = entry
+        _dirty = True
+
+    return tuple(entry[2:]) if entry[2] else None
+
+def mirrored_image(base_path, src):
+    """Local mirror of a CDN image, or None"""
+    url = urlsplit(src if not src.startswith('//') else 'https:' + src)
+    if url.hostname not in MIRRORED_HOSTS:
+        return None
+    name = '_'.join(url.path.strip('/').split('/'))
+    for candidate in (name, unquote(name)):
+        path = Path(base_path) / MIRROR_DIR / candidate
+        if path.is_file():
+            return path
+    return None
+
+def resolve_image(base_path, page_dir, src):
+    """File an <img src> points at, or None for remote, inline and missing images"""
+    if not src:
+        return None
+    if REMOTE_URL_PATTERN.match(src):
+        return mirrored_image(base_path, src)
+    src = unquote(src.split('?')[0].split('#')[0])
+    path = (Path(base_path) if src.startswith('/') else Path(page_dir)) / src.lstrip('/')
+    try:
+        path = path.resolve().relative_to(Path(base_path).resolve())
+    except ValueError:
+        return None
+    path = Path(base_path) / path
+    return path if path.is_file() else None
+
+def sized_attributes(attrs, size):
+    """width/height attribute text to add for an image's intrinsic size, or ''"""
+    width, height = size
+    if 'width' not in attrs and 'height' not in attrs:
+        return f' width="{width}" height="{height}"'
+    # One dimension given: add the other at the image's aspect ratio
+    if 'height' not in attrs and attrs['width'].isdigit():
+        return f' height="{round(int(attrs["width"]) * height / width)}"'
+    if 'width' not in attrs and attrs['height'].isdigit():
+        return f' width="{round(int(attrs["height"]) * width / height)}"'
+    return ''
+
+def add_image_dimensions(content, base_path, page_dir=None):
+    """Write intrinsic width/height onto every local <img> missing them"""
+    changes = []
+    base_path = Path(base_path)
+    page_dir = page_dir or base_path
+    missing = []
+    sized = 0
+
+    def size_tag(match):
+        nonlocal sized
+        attrs = parse_attrs(match.group(1))
+        if 'width' in attrs and 'height' in attrs:
+            return match.group()
+
+        path = resolve_image(base_path, page_dir, attrs.get('src'))
+        size = image_size(base_path, path) if path is not None else None
+        added = sized_attributes(attrs, size) if size else ''
+        if not added:
+            missing.append(attrs.get('src', ''))
+            return match.group()
+
+        sized += 1
+        return '<img' + added + match.group()[len('<img'):]
+
+    content = IMG_TAG_PATTERN.sub(size_tag, content)
+    save_index(base_path)
+
+    if sized:
+        changes.append(f"  - Added intrinsic width/height to {sized} images")
+        if 'Image Dimensions' not in content and '</head>' in content:
+            content = content.replace('</head>', DIMENSIONS_CSS + '</head>', 1)
+            changes.append("  - Added height:auto guard for sized images")
+    if missing:
+        changes.append(f"  - Note: {len(missing)} images without a readable size (remote, missing or unsized SVG)")
+
+    return content, changes
+
+def main():
+    """Print the dimensions of every image under assets/images"""
+    base_path = Path(__file__).parent
+    for path in sorted((base_path / 'assets' / 'images').iterdir()):
+        if path.is_file():
+            size = image_size(base_path, path)
+            print(f"{path.name:60} {size[0]}x{size[1]}" if size else f"{path.name:60} ?")
+    save_index(base_path)
+
+if __name__ == "__main__":
+    main()
@@ -6,84 +6,115 @@ Phase 4.2: Replace repetitive "Get Started" with varied, contextual CTAs
 
 import re
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from html_tokenizer import find_element, inner_html
+from page_writer import write_page
+from rule_engine import apply_rule, compile_rules
 
 # CTA improvements - pattern and replacement pairs
 # Each tuple: (pattern_to_match, new_button_text, context_description)
+CTA_IMPROVEMENTS = [
+    # After edge/benefits cards - exploration focus
+    (
+        r'(<div class="card-slider__actions"><a href="/get-started\.html\?category=[^"]*" class="button-22[^"]*">)[^<]*(</a>)',
+        r'\1Explore My Options\2',
+        "Benefits cards CTA"
+    ),
+]
+
+# CTAs located by element rather than by a lazy span across their section
+# Each tuple: (section_tag_start, button_selector, new_button_text, context_description)
+# The search starts at the section's opening tag, so the tokenizer skips the page above it
+GET_STARTED_BUTTON = 'a[class^="button-18"][href^="/get-started.html?category="]'
+ELEMENT_CTA_IMPROVEMENTS = [
+    # Hero section - make it action-oriented
+    (
+        '<div class="testosterone-content"',
+        f'div[class="testosterone-content"] {GET_STARTED_BUTTON}',
+        'Start Your Assessment',
+        "Hero CTA"
+    ),
+
+    # After "We make it easy" section - focus on beginning
+    (
+        '<div class="section__make-it-easy',
+        f'div[class^="section__make-it-easy"] {GET_STARTED_BUTTON}[aria-label]',
+        'Begin My Treatment Plan',
+        "Process section CTA"
+    ),
+
+    # After "Expert care" section - emphasize consultation
+    (
+        '<div class="section__expert-care',
+        f'div[class^="section__expert-care"] {GET_STARTED_BUTTON}[aria-label]',
+        'Schedule Free Consultation',
+        "Expert care CTA"
+    ),
+
+    # After results timeline - qualification focus
+    (
+        '<div class="section__results',
+        f'div[class^="section__results"] {GET_STARTED_BUTTON}[aria-label]',
+        'See If I Qualify',
+        "Results section CTA"
+    ),
+
+    # After testimonials - community/action focus
+    (
+        '<div class="section__testimonials',
+        'div.section__testimonials a.button-21[href^="/get-started.html?category="]',
+        'Get Started Today',
+        "Testimonials CTA"
+    ),
+
+    # Final "Friday feeling" section - strong closing CTA
+    (
+        '<div class="section_fridays-feeling',
+        f'div[class^="section_fridays-feeling"] {GET_STARTED_BUTTON}[aria-label]',
+        'Start My Journey',
+        "Final section CTA"
+    ),
+]
+
+# Compiled once at import
+CTA_RULES = compile_rules(CTA_IMPROVEMENTS, name='CTA_IMPROVEMENTS')
+
+BUTTON_TEXT_PATTERN = re.compile(r'\\1([^\\]+)\\2')
 
 def get_cta_improvements(category):
     """Get category-specific CTA improvements"""
+    # Every category currently shares the common patterns
+    return CTA_RULES
 
-    # Common patterns across all pages
-    improvements = [
-        # Hero section - make it action-oriented
-        (
-            r'(<div class="testosterone-content">.*?<a href="/get-started\.html\?category=[^"]*" class="button-18[^"]*">)[^<]*(</a>)',
-            r'\1Start Your Assessment\2',
-            "Hero CTA"
-        ),
-
-        # After "We make it easy" section - focus on beginning
-        (
-            r'(<div class="section__make-it-easy.*?</div></div><a href="/get-started\.html\?category=[^"]*" class="button-18[^"]*" aria-label="[^"]*">)[^<]*(</a></div></div></div>)',
-            r'\1Begin My Treatment Plan\2',
-            "Process section CTA"
-        ),
-
-        # After "Expert care" section - emphasize consultation
-        (
-            r'(<div class="section__expert-care.*?<div class="text-md mb-2">.*?</div><a href="/get-started\.html\?category=[^"]*" class="button-18[^"]*" aria-label="[^"]*">)[^<]*(</a>)',
-            r'\1Schedule Free Consultation\2',
-            "Expert care CTA"
-        ),
-
-        # After results timeline - qualification focus
-        (
-            r'(<div class="section__results.*?<div class="w-layout-vflex results__card-stack mb-2">.*?</div></div><a href="/get-started\.html\?category=[^"]*" class="button-18[^"]*" aria-label="[^"]*">)[^<]*(</a>)',
-            r'\1See If I Qualify\2',
-            "Results section CTA"
-        ),
-
-        # After edge/benefits cards - exploration focus
-        (
-            r'(<div class="card-slider__actions"><a href="/get-started\.html\?category=[^"]*" class="button-22[^"]*">)[^<]*(</a>)',
-            r'\1Explore My Options\2',
-            "Benefits cards CTA"
-        ),
-
-        # After testimonials - community/action focus
-        (
-            r'(<div class="section__testimonials.*?</div></div></div></div><a href="/get-started\.html\?category=[^"]*" class="button-21[^"]*">)[^<]*(</a>)',
-            r'\1Get Started Today\2',
-            "Testimonials CTA"
-        ),
-
-        # Final "Friday feeling" section - strong closing CTA
-        (
-            r'(<div class="section_fridays-feeling.*?<p class="text-size-medium-4 text-color-white mb-2">.*?</p><a href="/get-started\.html\?category=[^"]*" class="button-18[^"]*" aria-label="[^"]*">)[^<]*(</a>)',
-            r'\1Start My Journey\2',
-            "Final section CTA"
-        ),
-    ]
-
-    return improvements
+# Pages and their page-specific configuration
+PAGES = [
+    ('mens-health.html', "Men's Health"),
+    ('recovery.html', 'Recovery'),
+    ('weight-management.html', 'Weight Management')
+]
 
 def apply_cta_improvements(content, improvements):
     """Apply CTA copy improvements"""
     changes = []
 
-    for pattern, replacement, context in improvements:
-        matches = re.findall(pattern, content, re.DOTALL)
-        if matches:
-            old_content = content
-            content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-            if old_content != content:
-                # Extract the new button text
-                button_text = re.search(r'\\1([^\\]+)\\2', replacement)
-                if button_text:
-                    changes.append(f"  - {context}: '{button_text.group(1)}'")
-                else:
-                    changes.append(f"  - {context}: Updated")
+    for regex, replacement, context in improvements:
+        old_content = content
+        content, count = apply_rule(content, regex, replacement)
+        if count and old_content != content:
+            # Extract the new button text
+            button_text = BUTTON_TEXT_PATTERN.search(replacement)
+            if button_text:
+                changes.append(f"  - {context}: '{button_text.group(1)}'")
+            else:
+                changes.append(f"  - {context}: Updated")
+
+    for section_start, selector, button_text, context in ELEMENT_CTA_IMPROVEMENTS:
+        pos = content.find(section_start)
+        button = find_element(content, selector, pos) if pos != -1 else None
+        if button is not None and inner_html(content, button) != button_text:
+            content = content[:button.open_end] + button_text + content[button.close_start:]
+            changes.append(f"  - {context}: '{button_text}'")
 
     return content, changes
 
@@ -97,10 +128,8 @@ def process_file(file_path, category):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.cta_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'cta')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Get CTA improvements
     improvements = get_cta_improvements(category)
@@ -113,7 +142,7 @@ def process_file(file_path, category):
         return True
 
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"\n✓ CTA copy improved ({len(changes)} buttons updated):")
     for change in changes:
@@ -132,15 +161,9 @@ def main():
 
     base_path = Path("/Users/raiyanabdullah/Desktop/Evolife FInal and last")
 
-    pages = [
-        ('mens-health.html', "Men's Health"),
-        ('recovery.html', 'Recovery'),
-        ('weight-management.html', 'Weight Management')
-    ]
-
     success_count = 0
 
-    for filename, category in pages:
+    for filename, category in PAGES:
         file_path = base_path / filename
         if file_path.exists():
             if process_file(file_path, category):
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Load each page's hero image first: it is the Largest Contentful Paint element
+The first visible image in the first hero section loses loading="lazy", gets
+fetchpriority="high" and a matching <link rel="preload" as="image"> in <head>
+"""
+
+import re
+from pathlib import Path
+
+from backup_store import backup_page
+from html_tokenizer import find_element, iter_elements, parse_attrs, parse_selector
+from page_writer import write_page
+
+# Sections that hold the hero image, most specific first; the first one on the page is used
+HERO_SELECTORS = ['.testosterone-content', '.hero-content', 'header[class*=hero]', 'section[class*=hero]']
+
+# Image classes that are never the LCP element: hidden on desktop (a breakpoint
+# twin is shown instead), or navbar logos and icons
+SKIPPED_CLASS_PATTERN = re.compile(r'(?:tablet|mobile)-only|hide-desktop|^hidden$|logo|icon')
+
+# Narrower images are icons and badges, not the LCP element
+MIN_LCP_WIDTH = 200
+
+LCP_MARKER = '<!-- LCP Image -->'
+LCP_PRELOAD_PATTERN = re.compile(rf'\n{re.escape(LCP_MARKER)}\n<link [^>]*>\n')
+LAZY_ATTR_PATTERN = re.compile(r'\s+loading\s*=\s*(["\']?)lazy\1', re.IGNORECASE)
+CHARSET_META_PATTERN = re.compile(r'<meta charset=[^>]*>', re.IGNORECASE)
+
+IMG_COMPOUND = parse_selector('img')[0]
+
+def find_heroes(html):
+    """Hero elements of the page, most specific selector first"""
+    for selector in HERO_SELECTORS:
+        element = find_element(html, selector)
+        if element is not None:
+            yield element
+
+def is_lcp_candidate(attrs):
+    """True for a content image visible on desktop"""
+    src = attrs.get('src', '')
+    if not src or src.startswith('data:') or src.split('?')[0].lower().endswith('.svg'):
+        return False
+    if any(SKIPPED_CLASS_PATTERN.search(name) for name in attrs.get('class', '').split()):
+        return False
+    width = attrs.get('width', '')
+    return not (width.isdigit() and int(width) < MIN_LCP_WIDTH)
+
+def find_lcp_image(html):
+    """The first candidate <img> in the most specific hero that has one, or None"""
+    for hero in find_heroes(html):
+        for element in iter_elements(html, IMG_COMPOUND, hero.open_end, hero.close_start):
+            if is_lcp_candidate(parse_attrs(element.attr_text)):
+                return element
+    return None
+
+def in_picture(html, pos):
+    """True if pos is inside a <picture>, whose <source> the browser may pick instead"""
+    return html.rfind('<picture', 0, pos) > html.rfind('</picture>', 0, pos)
+
+def preload_link(attrs):
+    """Preload for the image, with its srcset/sizes so the same candidate is fetched"""
+    link = f'<link rel="preload" as="image" href="{attrs["src"]}" fetchpriority="high"'
+    if attrs.get('srcset'):
+        link += f' imagesrcset="{attrs["srcset"]}"'
+        if attrs.get('sizes'):
+            link += f' imagesizes="{attrs["sizes"]}"'
+    return link + '>'
+
+def prioritize_lcp_image(content):
+    """Load the hero image eagerly and at high priority, and preload it"""
+    changes = []
+
+    # Drop an earlier run's preload, so it follows the current hero image
+    previous = LCP_PRELOAD_PATTERN.search(content) if LCP_MARKER in content else None
+    if previous:
+        content = content[:previous.start()] + content[previous.end():]
+
+    element = find_lcp_image(content)
+    if element is None:
+        return content, changes
+
+    attrs = parse_attrs(element.attr_text)
+    tag = content[element.start:element.open_end]
+    new_tag = LAZY_ATTR_PATTERN.sub('', tag)
+    if 'fetchpriority' not in attrs:
+        new_tag = '<img fetchpriority="high"' + new_tag[len('<img'):]
+    if new_tag != tag:
+        content = content[:element.start] + new_tag + content[element.open_end:]
+        changes.append(f"  - Hero image loads eagerly at high priority: {attrs['src'].rsplit('/', 1)[-1]}")
+
+    # A <picture> may serve another format than src/srcset, so a preload could fetch the wrong file
+    if in_picture(content, element.start):
+        return content, changes
+
+    block = f'\n{LCP_MARKER}\n{preload_link(attrs)}\n'
+    charset = CHARSET_META_PATTERN.search(content)
+    if charset:
+        at = charset.end()
+    elif '<head>' in content:
+        at = content.index('<head>') + len('<head>')
+    else:
+        changes.append("  - Warning: Could not find <head> tag")
+        return content, changes
+    content = content[:at] + block + content[at:]
+    # Putting back the preload an earlier run left in the same place is not a change
+    if previous is None or (previous.group(), previous.start()) != (block, at):
+        changes.append("  - Preloaded hero image")
+
+    return content, changes
+
+def process_file(file_path):
+    """Process a single file with LCP prioritization"""
+    print(f"\n{'='*60}")
+    print(f"Processing: {file_path.name}")
+    print(f"{'='*60}")
+
+    # Read file
+    content = file_path.read_text(encoding='utf-8')
+
+    new_content, changes = prioritize_lcp_image(content)
+
+    if new_content == content:
+        print("✓ No hero image to prioritize" if not changes else "✓ Hero image already prioritized")
+        return False
+
+    # Create backup
+    blob = backup_page(file_path, content, 'lcp-image')
+    print(f"✓ Backup stored: {blob[:12]}")
+
+    # Write back
+    write_page(file_path, new_content, content)
+
+    for change in changes:
+        print(change)
+
+    print(f"✓ File updated: {file_path.name}")
+
+    return True
+
+def main():
+    """Main execution"""
+    print("\n" + "="*60)
+    print("EVOLIFE - LCP IMAGE PRIORITY")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+
+    files = sorted(path for path in base_path.glob('*.html')
+                   if len(path.suffixes) == 1 and 'backup' not in path.name)
+
+    updated_count = 0
+    for file_path in files:
+        if process_file(file_path):
+            updated_count += 1
+
+    print("\n" + "="*60)
+    print(f"LCP IMAGE COMPLETE: {updated_count}/{len(files)} pages updated")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
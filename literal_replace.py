@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Multi-literal replacement for plain-string rewrite tables
+A table of (old, new) pairs is built into a matcher once; each document is then
+rewritten in a single left-to-right scan with per-key match counts
+"""
+
+import re
+
+TERMINAL = ''
+
+def build_trie(keys):
+    """Character trie of the table keys; TERMINAL marks the end of a key"""
+    trie = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[TERMINAL] = True
+    return trie
+
+def trie_pattern(node):
+    """Regex for a trie node with shared prefixes factored out
+
+    Sibling branches start with different characters, so the engine never
+    tries more than one of them; the optional tail on terminal nodes is
+    greedy, which gives leftmost-longest matching.
+    """
+    branches = []
+    for char, child in sorted(node.items()):
+        if char == TERMINAL:
+            continue
+        # Follow single-child chains as one literal run
+        run = char
+        while len(child) == 1 and TERMINAL not in child:
+            (char, child), = child.items()
+            run += char
+        branches.append(re.escape(run) + trie_pattern(child))
+
+    if not branches:
+        return ''
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if TERMINAL in node:
+        return '(?:' + pattern + ')?'
+    return pattern
+
+def compile_literals(table):
+    """Build the matcher for an (old, new) table once
+
+    Returns (regex, replacements); replacements keeps the table order. If a
+    key is listed twice the first entry wins, as it did with chained replace().
+    """
+    replacements = {}
+    for old, new in table:
+        replacements.setdefault(old, new)
+    regex = re.compile(trie_pattern(build_trie(replacements))) if replacements else None
+    return regex, replacements
+
+def replace_literals(content, matcher):
+    """Replace every key in one scan and return (content, {key: count})
+
+    Matches never overlap and replaced text is not scanned again.
+    """
+    regex, replacements = matcher
+    counts = {}
+    if regex is None:
+        return content, counts
+
+    def substitute(match):
+        key = match.group()
+        counts[key] = counts.get(key, 0) + 1
+        return replacements[key]
+
+    return regex.sub(substitute, content), counts
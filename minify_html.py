@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Minified copies of the pages for deployment, written to dist/ beside a mirror of assets/
+The pages themselves keep their comments and formatting: the rewrite passes find their
+own earlier output by those markers. Whitespace is collapsed outside <pre>, <textarea>,
+<script> and <style>, comments other than conditional ones are dropped, JSON-LD is written
+compactly and inline CSS and scripts are tightened. Each page is streamed to its output
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+from css_parser import minify_rules, parse_stylesheet
+from html_tokenizer import tokenize
+from parallel import add_jobs_argument, map_pages
+from precompress import ENCODINGS
+
+OUTPUT_DIR = 'dist'
+ASSET_DIR = 'assets'
+
+# Whitespace in <head> and at the edges of <body> never renders, so it is dropped; anywhere
+# else a run of whitespace may separate inline content (even around a <script>), so it
+# becomes one space
+EDGE_TAGS = {'html', 'head', 'body'}
+
+# Script types holding JavaScript; other types (templates, JSON) are data
+JS_TYPES = {'', 'text/javascript', 'application/javascript', 'module'}
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+ATTR_SPACE_PATTERN = re.compile(r'("[^"]*"|\'[^\']*\')|\s+')
+CLASS_VALUE_PATTERN = re.compile(r'(\sclass=)(["\'])([^"\']*)\2', re.IGNORECASE)
+DEFAULT_TYPE_PATTERN = re.compile(r'\s+type=(["\']?)text/(?:javascript|css)\1(?=[\s/]|$)', re.IGNORECASE)
+TYPE_ATTR_PATTERN = re.compile(r'\stype\s*=\s*(["\']?)([^"\'\s>]*)\1', re.IGNORECASE)
+CONDITIONAL_COMMENT_PATTERN = re.compile(r'<!--\s*(?:\[if\b|<!\[endif\]|\[endif\])', re.IGNORECASE)
+
+def minify_start_tag(html, name, start, attr_text):
+    """Start tag with whitespace between attributes collapsed and default type attributes dropped"""
+    tag_name = html[start + 1:start + 1 + len(name)]
+    attrs = ATTR_SPACE_PATTERN.sub(lambda match: match.group(1) or ' ', attr_text).rstrip()
+    if name in ('script', 'style', 'link'):
+        attrs = DEFAULT_TYPE_PATTERN.sub('', attrs)
+    attrs = CLASS_VALUE_PATTERN.sub(
+        lambda match: f'{match.group(1)}{match.group(2)}{" ".join(match.group(3).split())}{match.group(2)}', attrs)
+    return f'<{tag_name}{attrs}>'
+
+def minify_script(text, attr_text):
+    """Inline script content: JSON-LD re-serialized, JavaScript trimmed line by line
+
+    Lines are kept, so automatic semicolon insertion sees the same code; scripts with
+    template literals are left alone, as their lines may be part of a string.
+    """
+    match = TYPE_ATTR_PATTERN.search(attr_text)
+    script_type = match.group(2).lower() if match else ''
+    if script_type == 'application/ld+json':
+        try:
+            return json.dumps(json.loads(text), ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+        except ValueError:
+            return text.strip()
+    if script_type not in JS_TYPES or '`' in text:
+        return text
+    return '\n'.join(line.strip() for line in text.splitlines() if line.strip())
+
+def minify_style(text):
+    """Inline stylesheet written compactly"""
+    css = minify_rules(parse_stylesheet(text))
+    return css if css or not text.strip() else text
+
+def minify_chunks(html):
+    """Yield the minified page piece by piece, in document order"""
+    pos = 0
+    raw = None
+    pre_depth = 0
+    in_head = False
+    previous = None
+    # Text before a dropped comment, joined with the text after it
+    carried = ''
+    space_written = False
+
+    def text_chunk(text, next_name):
+        nonlocal space_written
+        if pre_depth:
+            space_written = False
+            return text
+        collapsed = WHITESPACE_PATTERN.sub(' ', text)
+        if collapsed == ' ' and (in_head or previous in EDGE_TAGS or next_name in EDGE_TAGS):
+            return ''
+        if space_written and collapsed.startswith(' '):
+            collapsed = collapsed[1:]
+        space_written = collapsed.endswith(' ')
+        return collapsed
+
+    for kind, name, start, end, attr_text in tokenize(html):
+        text = carried + html[pos:start]
+        carried = ''
+        if kind == 'comment' and not CONDITIONAL_COMMENT_PATTERN.match(html, start):
+            carried = text
+            pos = end
+            continue
+
+        if raw is not None:
+            raw_name, raw_attrs = raw
+            if raw_name == 'script':
+                yield minify_script(text, raw_attrs)
+            elif raw_name == 'style':
+                yield minify_style(text)
+            elif raw_name == 'title':
+                yield ' '.join(text.split())
+            else:
+                yield text
+            raw = None
+        elif text:
+            yield text_chunk(text, name)
+        pos = end
+
+        space_written = False
+        if kind in ('start', 'empty'):
+            yield minify_start_tag(html, name, start, attr_text)
+            if kind == 'start' and name in ('script', 'style', 'textarea', 'title'):
+                raw = (name, attr_text)
+            elif kind == 'start' and name == 'pre':
+                pre_depth += 1
+            elif name in ('head', 'body'):
+                in_head = name == 'head'
+        elif kind == 'end':
+            yield html[start:end].replace(' ', '').replace('\n', '')
+            if name == 'pre' and pre_depth:
+                pre_depth -= 1
+            elif name == 'head':
+                in_head = False
+        else:
+            yield html[start:end]
+        previous = name
+
+    text = carried + html[pos:]
+    if text:
+        yield text if raw is not None else text_chunk(text, None)
+
+def minify_html(html):
+    """Minified page text"""
+    return ''.join(minify_chunks(html))
+
+def minify_page(source, output):
+    """Stream one minified page to output; runs in pool workers. Returns (bytes before, after)"""
+    source, output = Path(source), Path(output)
+    html = source.read_text(encoding='utf-8')
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(f'{output.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        for chunk in minify_chunks(html):
+            f.write(chunk)
+    # An unchanged page keeps its mtime, and so its precompressed copies stay valid
+    if output.is_file() and filecmp.cmp(tmp_path, output, shallow=False):
+        tmp_path.unlink()
+    else:
+        os.replace(tmp_path, output)
+    return source.stat().st_size, output.stat().st_size
+
+def mirror_assets(base_path, output_dir):
+    """Make output_dir/assets match assets/, hard-linking new and changed files
+
+    Returns (files linked or copied, files removed).
+    """
+    source_root = Path(base_path) / ASSET_DIR
+    target_root = Path(output_dir) / ASSET_DIR
+    updated = 0
+    wanted = set()
+    for path in source_root.rglob('*'):
+        if not path.is_file() or path.name.endswith('.tmp'):
+            continue
+        relative = path.relative_to(source_root)
+        wanted.add(relative)
+        target = target_root / relative
+        stat = path.stat()
+        try:
+            target_stat = target.stat()
+            if (target_stat.st_ino == stat.st_ino
+                    or (target_stat.st_size, target_stat.st_mtime_ns) == (stat.st_size, stat.st_mtime_ns)):
+                continue
+            target.unlink()
+        except FileNotFoundError:
+            pass
+        target.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.link(path, target)
+        except OSError:
+            # Another filesystem: fall back to a copy that keeps the mtime
+            shutil.copy2(path, target)
+        updated += 1
+
+    # Files gone from assets/ go from the mirror too, with their precompressed copies
+    removed = 0
+    if target_root.is_dir():
+        for path in target_root.rglob('*'):
+            relative = path.relative_to(target_root)
+            if path.suffix in ENCODINGS.values():
+                relative = relative.with_suffix('')
+            if path.is_file() and relative not in wanted:
+                path.unlink()
+                removed += 1
+    return updated, removed
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Write minified copies of the pages for deployment")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="output directory (default: %(default)s)")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("EVOLIFE - HTML MINIFY")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    output_dir = Path(args.output) if Path(args.output).is_absolute() else base_path / args.output
+
+    pages = sorted(path for path in base_path.glob('*.html')
+                   if len(path.suffixes) == 1 and 'backup' not in path.name)
+    jobs = [(str(page), str(output_dir / page.name)) for page in pages]
+
+    total_before = total_after = 0
+    for page, (before, after) in zip(pages, map_pages(minify_page, jobs, args.jobs)):
+        total_before += before
+        total_after += after
+        print(f"  - {page.name}: {before // 1024} KB → {after // 1024} KB "
+              f"(-{(before - after) * 100 // max(before, 1)}%, {(before - after) // 1024} KB saved)")
+
+    updated, removed = mirror_assets(base_path, output_dir)
+    print(f"\n✓ Assets mirrored: {updated} updated, {removed} removed")
+
+    print("\n" + "="*60)
+    print(f"MINIFY COMPLETE: {len(pages)} pages, {total_before // 1024} KB → {total_after // 1024} KB "
+          f"({(total_before - total_after) // 1024} KB saved) in {output_dir.relative_to(base_path) if output_dir.is_relative_to(base_path) else output_dir}")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
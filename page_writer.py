@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Write layer for pages and the files the passes generate
+Content identical to what is on disk is never written, so mtimes - and the rebuilds keyed
+on them - stay put. Anything else goes to a temporary file beside the target and is renamed
+over it, so a crash leaves the old file or the new one, never half of each. The temporary file
+is fsynced before the rename, so the rename can never be on disk ahead of the data; the
+directory fsyncs that make the renames themselves durable are batched: sync_writes() syncs
+each directory written to in a run once. In dry-run mode nothing is written; the unified diff
+of each change is collected instead
+"""
+
+import atexit
+import difflib
+import os
+import stat
+from pathlib import Path
+
+# Paths this process wrote since the last sync_writes()
+_written = []
+
+_dry_run = False
+_diffs = []
+
+def set_dry_run(enabled):
+    """Collect diffs instead of writing, for this process"""
+    global _dry_run
+    _dry_run = enabled
+
+def is_dry_run():
+    """True while writes are being turned into diffs; caches that outlive the run check it too"""
+    return _dry_run
+
+def unified_diff(name, old, new):
+    """Unified diff of a file's text, empty if unchanged"""
+    return ''.join(difflib.unified_diff(old.splitlines(keepends=True), new.splitlines(keepends=True),
+                                        f'a/{name}', f'b/{name}'))
+
+def take_diffs():
+    """Diffs collected since the last call, joined"""
+    diffs = ''.join(_diffs)
+    _diffs.clear()
+    return diffs
+
+def take_written():
+    """Paths written since the last call, for a pool worker to hand to the parent's sync_writes()"""
+    written = list(_written)
+    _written.clear()
+    return written
+
+def write_page(file_path, content, original=None):
+    """Write text to file_path unless it already holds it; True if the file changed (or would)
+
+    original is the text read from the file earlier in the run, if any; without it
+    the file is read back to compare.
+    """
+    file_path = Path(file_path)
+    data = content.encode('utf-8')
+    if original is None:
+        try:
+            original = file_path.read_bytes().decode('utf-8')
+        except FileNotFoundError:
+            original = None
+    if original == content:
+        return False
+
+    if _dry_run:
+        _diffs.append(unified_diff(os.path.relpath(file_path), original or '', content))
+        return True
+
+    tmp_path = file_path.with_name(f'{file_path.name}.{os.getpid()}.tmp')
+    with open(tmp_path, 'wb') as tmp_file:
+        tmp_file.write(data)
+        if original is not None:
+            os.fchmod(tmp_file.fileno(), stat.S_IMODE(file_path.stat().st_mode))
+        tmp_file.flush()
+        os.fsync(tmp_file.fileno())
+    os.replace(tmp_path, file_path)
+    _written.append(str(file_path))
+    return True
+
+def sync_writes(paths=()):
+    """fsync the directories of the files written this run (here, or by workers: paths), once each
+
+    The files themselves were synced before their rename, in write_page().
+    """
+    files = set(_written) | {str(path) for path in paths}
+    _written.clear()
+    directories = {os.path.dirname(os.path.abspath(path)) for path in files}
+
+    for directory in directories:
+        try:
+            fd = os.open(directory, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            os.fsync(fd)
+        except OSError:
+            # Some filesystems cannot sync a directory; the renames are still atomic
+            pass
+        finally:
+            os.close(fd)
+
+# Single-process scripts need not call it themselves
+atexit.register(sync_writes)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Shared --jobs N execution layer for per-page work
+Spreads pages across a process pool and hands results back in input order
+"""
+
+import io
+import os
+from contextlib import redirect_stdout
+
+def add_jobs_argument(parser):
+    """Add the standard -j/--jobs option to an argument parser"""
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help="pages to process in parallel (0 = one per CPU, default: 1)")
+
+def resolve_jobs(jobs, item_count):
+    """Clamp a --jobs value to the CPU count and the amount of work"""
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return max(1, min(jobs, item_count))
+
+def call_captured(function, args):
+    """Call function(*args) and return (result, captured stdout)"""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        result = function(*args)
+    return result, buffer.getvalue()
+
+def call_unpacked(function, args):
+    """Call function(*args) - picklable stand-in for a lambda"""
+    return function(*args)
+
+# Pool kept across map_pages calls by a long-running process, so its workers stay warm
+_pool = None
+
+def keep_pool(jobs):
+    """Run every later multi-job map_pages call in this process on one lasting pool"""
+    global _pool
+    from concurrent.futures import ProcessPoolExecutor
+    _pool = ProcessPoolExecutor(max_workers=jobs if jobs > 0 else os.cpu_count() or 1)
+
+def map_pages(function, items, jobs=1, capture=False):
+    """Yield function(*item) for every item, in input order
+
+    With capture=True each result is a (result, output) pair holding what the
+    call printed, so scripts that print per page keep deterministic output even
+    though workers finish in any order.
+    """
+    items = list(items)
+    worker = call_captured if capture else call_unpacked
+
+    if not items:
+        return
+
+    jobs = resolve_jobs(jobs, len(items))
+
+    if jobs == 1:
+        for args in items:
+            yield worker(function, args)
+        return
+
+    if _pool is not None:
+        yield from _pool.map(worker, [function] * len(items), items)
+        return
+
+    # Imported here: the pool machinery is the slowest import on the single-job path
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # executor.map returns results in submission order
+        yield from executor.map(worker, [function] * len(items), items)
@@ -0,0 +1,538 @@
+#!/usr/bin/env python3
+"""
+Run all page rewrite passes in a single read/write cycle per page
+Each page is loaded once, sent through the registered passes in order, and written once
+"""
+
+import argparse
+import importlib
+import io
+import sys
+from contextlib import redirect_stdout
+from functools import lru_cache
+from pathlib import Path
+
+import deps
+import page_writer
+import rule_engine
+from backup_store import RUN_ID, append_journal, journal_entry, store_blob
+from build_cache import content_sha256, load_manifest, page_is_current, record_page, rules_hash, save_manifest
+from parallel import add_jobs_argument, map_pages
+
+# Pages the treatment-page scripts were written for
+TREATMENT_PAGES = ['mens-health.html', 'recovery.html', 'weight-management.html']
+
+# fix_pages matcher for each page, by attribute name
+FIX_PAGES_MATCHERS = {
+    'recovery.html': 'RECOVERY_MATCHER',
+    'weight-management.html': 'WEIGHT_MANAGEMENT_MATCHER',
+}
+
+def page_config(pages, file_path):
+    """Return the page-specific part of a script's PAGES entry"""
+    for entry in pages:
+        if entry[0] == file_path.name:
+            return entry[1:]
+    raise KeyError(f"No configuration for {file_path.name}")
+
+# Pass wrappers - every pass takes (content, file_path) and returns (content, changes)
+# Each imports its script on first use, so only selected passes pay for their module
+
+def components_pass(content, file_path):
+    """components.py: fill navbar/footer slots from components/"""
+    import components
+    return components.expand_components(content, file_path.parent)
+
+def content_replacements_pass(content, file_path):
+    """fix_pages.py: batch content replacements"""
+    import fix_pages
+    return fix_pages.apply_replacements(content, getattr(fix_pages, FIX_PAGES_MATCHERS[file_path.name]))
+
+def incorrect_content_pass(content, file_path):
+    """fix_incorrect_content.py: remove testosterone content"""
+    import fix_incorrect_content
+    fixes, _category = page_config(fix_incorrect_content.PAGES, file_path)
+    return fix_incorrect_content.apply_fixes(content, fixes)
+
+def seo_tags_pass(content, file_path):
+    """add_seo_tags.py: meta, Open Graph and Twitter tags"""
+    import add_seo_tags
+    return add_seo_tags.add_seo_tags(content, add_seo_tags.SEO_TAGS[file_path.name])
+
+def schema_markup_pass(content, file_path):
+    """add_schema_markup.py: JSON-LD structured data"""
+    import add_schema_markup
+    return add_schema_markup.add_schema_markup(content, add_schema_markup.PAGE_SCHEMAS[file_path.name])
+
+def alt_tags_pass(content, file_path):
+    """fix_alt_tags.py: descriptive alt text for empty alts"""
+    import fix_alt_tags
+    return fix_alt_tags.fix_alt_tags_in_content(content)
+
+def empty_alts_pass(content, file_path):
+    """fix_empty_alts_v2.py: empty alts in minified markup"""
+    import fix_empty_alts_v2
+    return fix_empty_alts_v2.fix_empty_alts(content)
+
+def aria_labels_pass(content, file_path):
+    """add_aria_labels.py: ARIA labels for interactive elements"""
+    import add_aria_labels
+    return add_aria_labels.add_aria_labels(content)
+
+def performance_pass(content, file_path):
+    """add_performance_optimizations.py: resource hints and deferred scripts"""
+    import add_performance_optimizations
+    return add_performance_optimizations.apply_performance_optimizations(content, file_path.parent)
+
+def image_dimensions_pass(content, file_path):
+    """image_dimensions.py: intrinsic width/height on images"""
+    import image_dimensions
+    return image_dimensions.add_image_dimensions(content, file_path.parent)
+
+def responsive_images_pass(content, file_path):
+    """responsive_images.py: srcset/sizes for generated variants"""
+    import responsive_images
+    return responsive_images.add_srcsets(content, file_path.parent)
+
+def alt_text_pass(content, file_path):
+    """enhance_alt_text.py: contextual alt text"""
+    import enhance_alt_text
+    specific_improvements, _category = page_config(enhance_alt_text.PAGES, file_path)
+    return enhance_alt_text.enhance_alt_text(content, specific_improvements)
+
+def trust_signals_pass(content, file_path):
+    """add_trust_signals.py: trust badges and HIPAA notes"""
+    import add_trust_signals
+    return add_trust_signals.add_trust_signals(content)
+
+def brand_consistency_pass(content, file_path):
+    """fix_brand_consistency.py: Friday to Evolife references"""
+    import fix_brand_consistency
+    return fix_brand_consistency.apply_brand_fixes(content, fix_brand_consistency.BRAND_RULES)
+
+def mobile_pass(content, file_path):
+    """add_mobile_optimizations.py: mobile CSS and touch script"""
+    import add_mobile_optimizations
+    return add_mobile_optimizations.apply_mobile_optimizations(content)
+
+def color_contrast_pass(content, file_path):
+    """fix_color_contrast.py: WCAG contrast CSS"""
+    import fix_color_contrast
+    return fix_color_contrast.add_contrast_fixes(content)
+
+def testimonials_pass(content, file_path):
+    """enhance_testimonials.py: category-specific testimonials"""
+    import enhance_testimonials
+    testimonials, _category_name, category_class = page_config(enhance_testimonials.PAGES, file_path)
+    return enhance_testimonials.replace_testimonials(content, testimonials, category_class)
+
+def cta_copy_pass(content, file_path):
+    """improve_cta_copy.py: contextual CTA copy"""
+    import improve_cta_copy
+    category, = page_config(improve_cta_copy.PAGES, file_path)
+    return improve_cta_copy.apply_cta_improvements(content, improve_cta_copy.get_cta_improvements(category))
+
+def micro_interactions_pass(content, file_path):
+    """add_micro_interactions.py: hover and transition CSS"""
+    import add_micro_interactions
+    return add_micro_interactions.add_micro_interactions(content)
+
+def shared_css_pass(content, file_path):
+    """shared_css.py: move inlined CSS blocks to cached stylesheets"""
+    import shared_css
+    return shared_css.externalize_styles(content, file_path.parent)
+
+def faqs_pass(content, file_path):
+    """replace_faqs.py: category-specific FAQs"""
+    import replace_faqs
+    faqs, category_name = page_config(replace_faqs.PAGES, file_path)
+    return replace_faqs.replace_faqs(content, faqs, category_name)
+
+def navigation_pass(content, file_path):
+    """update_navigation.py: navbar and footer nav links"""
+    import update_navigation
+    return update_navigation.update_navigation(content)
+
+def treatment_refs_pass(content, file_path):
+    """remove_treatment_refs.py: drop testosterone links and treatment buttons"""
+    import remove_treatment_refs
+    # remove_treatment_elements prints one line per removal; keep them as the change list
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        content, changes_made = remove_treatment_refs.remove_treatment_elements(content)
+    changes = buffer.getvalue().splitlines() if changes_made else []
+    return content, changes
+
+def testimonial_images_pass(content, file_path):
+    """remove_testimonial_images.py: strip testimonial images"""
+    import remove_testimonial_images
+    new_content = remove_testimonial_images.strip_testimonial_images(content)
+    changes = ["  - Removed testimonial images"] if new_content != content else []
+    return new_content, changes
+
+def contact_info_pass(content, file_path):
+    """update_contact_info.py: address, phone and email"""
+    import update_contact_info
+    return update_contact_info.update_contact_info(content)
+
+def social_media_pass(content, file_path):
+    """update_social_media.py: social profile links"""
+    import update_social_media
+    return update_social_media.update_social_links(content)
+
+def lcp_image_pass(content, file_path):
+    """lcp_image.py: eager, high-priority hero image"""
+    import lcp_image
+    return lcp_image.prioritize_lcp_image(content)
+
+def asset_urls_pass(content, file_path):
+    """fingerprint_assets.py: asset URLs pointed at content-hashed copies"""
+    import fingerprint_assets
+    return fingerprint_assets.fingerprint_references(content, file_path.parent, file_path.parent)
+
+def critical_css_pass(content, file_path):
+    """critical_css.py: inline above-the-fold CSS, defer stylesheets"""
+    import critical_css
+    return critical_css.inline_critical_css(content, file_path.parent)
+
+# Registered passes in run order: (name, module name, function, pages)
+# pages is None for every page, a list of pages, or 'module.ATTR' naming the script's
+# own page table, read when the pass is selected
+# The module's source is the pass's rule set; editing it invalidates the build cache
+PASSES = [
+    # First, so the later passes also rewrite the component markup
+    ('components', 'components', components_pass, None),
+    ('content-replacements', 'fix_pages', content_replacements_pass, list(FIX_PAGES_MATCHERS)),
+    ('incorrect-content', 'fix_incorrect_content', incorrect_content_pass, 'fix_incorrect_content.PAGES'),
+    ('seo-tags', 'add_seo_tags', seo_tags_pass, 'add_seo_tags.SEO_TAGS'),
+    ('schema-markup', 'add_schema_markup', schema_markup_pass, 'add_schema_markup.PAGE_SCHEMAS'),
+    ('alt-tags', 'fix_alt_tags', alt_tags_pass, TREATMENT_PAGES),
+    ('empty-alts', 'fix_empty_alts_v2', empty_alts_pass, TREATMENT_PAGES),
+    ('aria-labels', 'add_aria_labels', aria_labels_pass, TREATMENT_PAGES),
+    ('performance', 'add_performance_optimizations', performance_pass, TREATMENT_PAGES),
+    ('image-dimensions', 'image_dimensions', image_dimensions_pass, None),
+    ('responsive-images', 'responsive_images', responsive_images_pass, None),
+    ('alt-text', 'enhance_alt_text', alt_text_pass, 'enhance_alt_text.PAGES'),
+    ('trust-signals', 'add_trust_signals', trust_signals_pass, TREATMENT_PAGES),
+    ('brand-consistency', 'fix_brand_consistency', brand_consistency_pass, TREATMENT_PAGES),
+    ('mobile', 'add_mobile_optimizations', mobile_pass, TREATMENT_PAGES),
+    ('color-contrast', 'fix_color_contrast', color_contrast_pass, TREATMENT_PAGES),
+    ('testimonials', 'enhance_testimonials', testimonials_pass, 'enhance_testimonials.PAGES'),
+    ('cta-copy', 'improve_cta_copy', cta_copy_pass, 'improve_cta_copy.PAGES'),
+    ('micro-interactions', 'add_micro_interactions', micro_interactions_pass, TREATMENT_PAGES),
+    ('shared-css', 'shared_css', shared_css_pass, None),
+    ('faqs', 'replace_faqs', faqs_pass, 'replace_faqs.PAGES'),
+    ('navigation', 'update_navigation', navigation_pass, 'update_navigation.PAGES'),
+    ('treatment-refs', 'remove_treatment_refs', treatment_refs_pass, 'remove_treatment_refs.MAIN_FILES'),
+    ('testimonial-images', 'remove_testimonial_images', testimonial_images_pass, ['index.html']),
+    ('contact-info', 'update_contact_info', contact_info_pass, None),
+    ('social-media', 'update_social_media', social_media_pass, None),
+    ('lcp-image', 'lcp_image', lcp_image_pass, None),
+    ('asset-urls', 'fingerprint_assets', asset_urls_pass, None),
+    # Last, so the fold it reads is the final markup
+    ('critical-css', 'critical_css', critical_css_pass, None),
+]
+
+@lru_cache(maxsize=None)
+def load_page_table(spec):
+    """Page names from a script's page table, given as 'module.ATTR'"""
+    module_name, attr = spec.split('.')
+    table = getattr(importlib.import_module(module_name), attr)
+    # Page tables are lists of names, lists of (name, ...) tuples, or dicts keyed by name
+    return [entry if isinstance(entry, str) else entry[0] for entry in table]
+
+def pass_pages(entry):
+    """The pages a registered pass applies to, or None for every page"""
+    pages = entry[3]
+    return load_page_table(pages) if isinstance(pages, str) else pages
+
+def module_path(module_name):
+    """Source file of a pass module, found without importing it"""
+    return str(Path(__file__).with_name(f'{module_name}.py'))
+
+def select_passes(names):
+    """Return the registered passes matching names, in registry order"""
+    if not names:
+        return PASSES
+
+    known = {name for name, *_ in PASSES}
+    unknown = [name for name in names if name not in known]
+    if unknown:
+        raise SystemExit(f"✗ Unknown pass: {', '.join(unknown)}")
+
+    return [entry for entry in PASSES if entry[0] in names]
+
+def is_source_page(file_path):
+    """True for deployable pages, False for backups and snapshots"""
+    return len(file_path.suffixes) == 1 and 'backup' not in file_path.name
+
+def find_pages(base_path, passes):
+    """Collect every page that at least one pass applies to"""
+    names = set()
+    for entry in passes:
+        pages = pass_pages(entry)
+        if pages is None:
+            # Only list the directory when a pass runs on every page
+            pages = [path.name for path in base_path.glob('*.html') if is_source_page(path)]
+        names.update(pages)
+
+    return [base_path / name for name in sorted(names) if (base_path / name).exists()]
+
+def applicable_passes(file_path, passes):
+    """The passes that apply to a page"""
+    return [entry for entry in passes if pass_pages(entry) is None or file_path.name in pass_pages(entry)]
+
+def pass_hashes(file_path, passes):
+    """Rule-set hash of every pass that applies to a page"""
+    return {
+        name: rules_hash(module_path(module_name), rule_engine.__file__, __file__)
+        for name, module_name, _function, _pages in applicable_passes(file_path, passes)
+    }
+
+def stale_passes(manifest, graph, base_path, file_path, hashes):
+    """Names of the passes a page is due, and whether they resume from its recorded state
+
+    A page whose content or pass rules changed gets every pass. Otherwise the first
+    pass with a changed input (a component, stylesheet, image or manifest) and the
+    passes after it rerun over the page as written; the passes before it would read
+    what they read last time.
+    """
+    names = list(hashes)
+    if not page_is_current(manifest, file_path, hashes):
+        return names, False
+    for index, name in enumerate(names):
+        if deps.changed_inputs(graph, base_path, file_path.name, [name]) != []:
+            return names[index:], True
+    return [], False
+
+def run_passes(content, file_path, passes):
+    """Run every applicable pass over the in-memory content
+
+    Returns (content, report, inputs): inputs maps each pass to the files it read,
+    its own module included, for the dependency graph.
+    """
+    report = []
+    inputs = {}
+
+    for name, module_name, function, _pages in applicable_passes(file_path, passes):
+        rule_engine.set_profile_context(file_path.name, name)
+        deps.start_recording()
+        deps.record_input(module_path(module_name))
+        content, changes = function(content, file_path)
+        inputs[name] = deps.stop_recording()
+        if changes:
+            report.append((name, changes))
+
+    return content, report, inputs
+
+def process_page(file_path, pass_names, dry_run=False):
+    """Read a page once, run all passes, write it once
+
+    Runs inside pool workers, so it only returns its report and the files it wrote;
+    the caller prints and syncs them. A dry run writes nothing and returns the unified
+    diff of every file the run would change - the page, and any stylesheet a pass adds.
+    """
+    page_writer.set_dry_run(dry_run)
+
+    # Read file
+    content = file_path.read_text(encoding='utf-8')
+
+    new_content, report, inputs = run_passes(content, file_path, select_passes(pass_names))
+
+    if new_content == content:
+        return (file_path.name, report, None, content_sha256(content), inputs,
+                page_writer.take_diffs(), page_writer.take_written())
+
+    # Snapshot the original; the parent records it in the journal
+    blob = None if dry_run else store_blob(file_path.parent, content)
+
+    # Write back
+    page_writer.write_page(file_path, new_content, content)
+
+    return (file_path.name, report, blob, content_sha256(new_content), inputs,
+            page_writer.take_diffs(), page_writer.take_written())
+
+def check_page(file_path, pass_names):
+    """Run the passes over a page twice in memory; the diff the second run makes, empty if none
+
+    Any pass may rerun over its own output (a rule, component or pipeline edit reruns
+    every pass), so the second run must leave the page as the first left it.
+    """
+    page_writer.set_dry_run(True)
+    passes = select_passes(pass_names)
+    content = file_path.read_text(encoding='utf-8')
+    once, _report, _inputs = run_passes(content, file_path, passes)
+
+    # Rerun pass by pass to name the ones that change their own output
+    culprits = []
+    twice = once
+    for name, _module_name, function, _pages in applicable_passes(file_path, passes):
+        rerun, _changes = function(twice, file_path)
+        if rerun != twice:
+            culprits.append(name)
+        twice = rerun
+    page_writer.take_diffs()
+    return file_path.name, culprits, page_writer.unified_diff(file_path.name, once, twice)
+
+def print_page_report(page_name, report, blob, diff=''):
+    """Print the per-page change report"""
+    print(f"\n{'='*60}")
+    print(f"Processing: {page_name}")
+    print(f"{'='*60}")
+
+    for name, changes in report:
+        print(f"\n✓ {name}:")
+        for change in changes:
+            print(change)
+
+    if diff:
+        print(f"\n{diff}", end='')
+        return
+    if blob is None:
+        print(f"\n✓ No changes: {page_name}")
+        return
+
+    print(f"\n✓ Backup stored: {blob[:12]}")
+    print(f"✓ File updated: {page_name}")
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Run page rewrite passes in a single read/write per page")
+    parser.add_argument('names', nargs='*', metavar='PASS', help="passes to run (default: all)")
+    parser.add_argument('--pass', dest='passes', action='append', default=[], metavar='NAME',
+                        help="run only this pass (repeatable, default: all)")
+    parser.add_argument('--page', dest='pages', action='append', metavar='FILE',
+                        help="process only this page (repeatable, default: all)")
+    parser.add_argument('--list', action='store_true', help="list registered passes and exit")
+    parser.add_argument('--force', action='store_true',
+                        help="ignore the build cache and process every page")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="write nothing; print the unified diff of every change instead")
+    parser.add_argument('--check-idempotent', action='store_true',
+                        help="write nothing; fail if a second run of the passes would change a page")
+    parser.add_argument('--profile', nargs='?', type=int, const=15, metavar='N',
+                        help="profile rule tables over every page and print the N hottest rules (default: 15); "
+                             "implies --force --dry-run, so nothing is written")
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help="with --profile, write a Chrome trace (.json) or cProfile stats (any other name)")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+
+    # A profile covers every page, and measuring must not rewrite them
+    if args.profile is not None:
+        args.force = True
+        args.dry_run = True
+
+    if args.list:
+        for entry in PASSES:
+            name, _module_name, function, _pages = entry
+            pages = pass_pages(entry)
+            scope = 'all pages' if pages is None else ', '.join(pages)
+            print(f"{name:22} {function.__doc__}  [{scope}]")
+        return
+
+    print("\n" + "="*60)
+    print("EVOLIFE - PAGE REWRITE PIPELINE")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    passes = select_passes(args.names + args.passes)
+
+    file_paths = find_pages(base_path, passes)
+    if args.pages:
+        file_paths = [path for path in file_paths if path.name in args.pages]
+
+    if args.check_idempotent:
+        items = [(file_path, [entry[0] for entry in passes]) for file_path in file_paths]
+        failures = 0
+        for page_name, names, diff in map_pages(check_page, items, args.jobs):
+            if not diff:
+                continue
+            failures += 1
+            print(f"\n✗ {page_name}: rerun changes the page ({', '.join(names)})")
+            print(f"\n{diff}", end='')
+        print("\n" + "="*60)
+        if failures:
+            print(f"IDEMPOTENCE CHECK FAILED: {failures}/{len(file_paths)} pages change on a rerun")
+        else:
+            print(f"✓ IDEMPOTENCE CHECK PASSED: {len(file_paths)} pages unchanged by a rerun")
+        print("="*60)
+        sys.exit(1 if failures else 0)
+
+    # Skip pages whose content and pass rules match the manifest, and whose other
+    # inputs (components, stylesheets, images, the asset manifest) are unchanged;
+    # a changed input reruns only its pass and the ones after it
+    manifest = load_manifest(base_path)
+    graph = deps.load_graph(base_path)
+    hashes = {file_path: pass_hashes(file_path, passes) for file_path in file_paths}
+    if args.force:
+        plans = {file_path: (list(hashes[file_path]), False) for file_path in file_paths}
+    else:
+        plans = {file_path: stale_passes(manifest, graph, base_path, file_path, hashes[file_path])
+                 for file_path in file_paths}
+    stale_paths = [file_path for file_path in file_paths if plans[file_path][0]]
+
+    updated_count = 0
+
+    # Rule timings are collected in this process, so profiling runs the pages sequentially
+    profiler = None
+    if args.profile is not None:
+        args.jobs = 1
+        rule_engine.enable_profiling()
+        if args.profile_out and not args.profile_out.endswith('.json'):
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+    items = [(file_path, plans[file_path][0], args.dry_run) for file_path in stale_paths]
+    results = map_pages(process_page, items, args.jobs)
+    journal = []
+    written = []
+    for file_path, (page_name, report, blob, sha256, inputs, diff, paths) in zip(stale_paths, results):
+        written += paths
+        # A profile run is for the hot rule table; the diffs would bury it
+        if args.profile is None:
+            print_page_report(page_name, report, blob, diff)
+        if args.dry_run:
+            updated_count += bool(diff)
+            continue
+        record_page(manifest, file_path, sha256, hashes[file_path], changed=blob is not None,
+                    resumed=plans[file_path][1])
+        for name, input_paths in inputs.items():
+            deps.record_page(graph, base_path, page_name, name, input_paths)
+        if blob is not None:
+            journal.append(journal_entry(page_name, blob, 'pipeline'))
+            updated_count += 1
+
+    if not args.dry_run:
+        # One fsync per directory the workers wrote to, before the manifest vouches for the renames
+        page_writer.sync_writes(written)
+        save_manifest(base_path, manifest)
+        deps.save_graph(base_path, graph)
+    if journal:
+        append_journal(base_path, journal)
+
+    if args.profile is not None:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_out)
+        profile = rule_engine.disable_profiling()
+        rule_engine.print_hot_rules(profile, args.profile)
+        if args.profile_out and profiler is None:
+            rule_engine.write_chrome_trace(profile, args.profile_out)
+        if args.profile_out:
+            print(f"\n✓ Profile written: {args.profile_out}")
+
+    print("\n" + "="*60)
+    if args.dry_run:
+        print(f"DRY RUN: {updated_count}/{len(file_paths)} pages would change (nothing written)")
+    else:
+        print(f"PIPELINE COMPLETE: {updated_count}/{len(file_paths)} pages updated")
+    print(f"Unchanged pages skipped: {len(file_paths) - len(stale_paths)}")
+    print(f"Passes run: {len(passes)}")
+    if updated_count and not args.dry_run:
+        print(f"Backup run: {RUN_ID} (undo with: python3 backup_store.py restore PAGE {RUN_ID})")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
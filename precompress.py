@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Precompressed .gz and .br siblings for every deployable text file
+Pages and the text files under assets/ are compressed at maximum levels across a process pool;
+.evolife-cache/precompressed.json keeps each file's content hash, so only changed files are redone
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from build_cache import CACHE_DIR
+from parallel import add_jobs_argument, map_pages
+
+CACHE_NAME = 'precompressed.json'
+CACHE_VERSION = 1
+
+# Served as-is by the deploy hosts; images and fonts are compressed already
+COMPRESSED_SUFFIXES = {'.html', '.css', '.js', '.svg', '.json'}
+ASSET_DIR = 'assets'
+
+# Build metadata under assets/ that is read by the tooling, never served
+UNSERVED_FILES = {f'{ASSET_DIR}/manifest.json'}
+
+# Below this a compressed body plus its headers is no smaller than the original
+MIN_SIZE = 256
+
+# Encoding -> suffix of the precompressed sibling
+ENCODINGS = {'gzip': '.gz', 'br': '.br'}
+
+def deployable_files(base_path):
+    """Pages at the site root and text files under assets/"""
+    base_path = Path(base_path)
+    files = [path for path in base_path.glob('*.html') if len(path.suffixes) == 1 and 'backup' not in path.name]
+    files += [path for path in (base_path / ASSET_DIR).rglob('*')
+              if path.suffix.lower() in COMPRESSED_SUFFIXES and path.is_file()
+              and not any(part.startswith('.') for part in path.relative_to(base_path).parts)
+              and path.relative_to(base_path).as_posix() not in UNSERVED_FILES]
+    return sorted(files)
+
+def sibling(path, encoding):
+    """Location of a file's precompressed copy"""
+    return path.with_name(path.name + ENCODINGS[encoding])
+
+def compress(data, encoding):
+    """Compress bytes at the encoding's maximum level"""
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical input
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    import brotli
+    return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+
+def compress_file(path, encodings):
+    """Write the precompressed siblings of one file; runs in pool workers
+
+    A sibling is only kept when it is smaller than the file. It gets the file's
+    mtime, so a server can tell a sibling left over from an older version.
+    Returns {encoding: compressed size or None}.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    stat = path.stat()
+    sizes = {}
+    for encoding in encodings:
+        output = sibling(path, encoding)
+        compressed = compress(data, encoding)
+        if len(compressed) >= len(data):
+            output.unlink(missing_ok=True)
+            sizes[encoding] = None
+            continue
+        tmp_path = output.with_name(f'{output.name}.{os.getpid()}.tmp')
+        tmp_path.write_bytes(compressed)
+        os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        os.replace(tmp_path, output)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+def available_encodings():
+    """Encodings this interpreter can produce; brotli is optional"""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        return ['gzip']
+    return ['gzip', 'br']
+
+def cache_path(base_path, site_path):
+    """Cache for one site directory; the source tree and each build output have their own"""
+    if Path(site_path) == Path(base_path):
+        return Path(base_path) / CACHE_DIR / CACHE_NAME
+    name = Path(site_path).resolve().name
+    return Path(base_path) / CACHE_DIR / CACHE_NAME.replace('.json', f'-{name}.json')
+
+def load_cache(path):
+    """Load a precompression cache: path -> entry"""
+    try:
+        cache = json.loads(path.read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        cache = {}
+    return cache.get('files', {}) if cache.get('version') == CACHE_VERSION else {}
+
+def save_cache(path, files):
+    """Write a precompression cache atomically"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps({'version': CACHE_VERSION, 'files': files}, indent=1, sort_keys=True),
+                        encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def is_current(entry, path, encodings):
+    """True if the siblings recorded for a file are still on disk and cover encodings"""
+    return (entry is not None and set(encodings) <= set(entry['encodings'])
+            and all(size is None or sibling(path, encoding).is_file() for encoding, size in entry['encodings'].items()))
+
+def plan(base_path, files, cache, encodings):
+    """Split files into those to compress and up-to-date cache entries
+
+    An unchanged mtime and size skip a file without reading it; otherwise its
+    content hash decides, so a touched but identical file is not recompressed.
+    """
+    pending = []
+    entries = {}
+    for path in files:
+        key = path.relative_to(base_path).as_posix()
+        stat = path.stat()
+        entry = cache.get(key)
+        if stat.st_size < MIN_SIZE:
+            for encoding in ENCODINGS:
+                sibling(path, encoding).unlink(missing_ok=True)
+            continue
+
+        if is_current(entry, path, encodings) and [entry['mtime_ns'], entry['size']] == [stat.st_mtime_ns, stat.st_size]:
+            entries[key] = entry
+            continue
+
+        digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        if is_current(entry, path, encodings) and entry['sha256'] == digest:
+            entries[key] = {**entry, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+            for encoding, size in entry['encodings'].items():
+                if size is not None:
+                    os.utime(sibling(path, encoding), ns=(stat.st_atime_ns, stat.st_mtime_ns))
+            continue
+
+        entries[key] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+        pending.append(path)
+    return pending, entries
+
+def orphaned_siblings(base_path, files):
+    """Precompressed copies whose file is gone"""
+    sources = set(files)
+    for suffix in ENCODINGS.values():
+        for path in list(Path(base_path).glob(f'*.html{suffix}')) + list((Path(base_path) / ASSET_DIR).rglob(f'*{suffix}')):
+            source = path.with_suffix('')
+            if source.suffix.lower() in COMPRESSED_SUFFIXES and source not in sources:
+                yield path
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Write precompressed .gz/.br copies of the deployable files")
+    parser.add_argument('--force', action='store_true', help="recompress every file")
+    parser.add_argument('--directory', help="site to compress, e.g. dist (default: this folder)")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("EVOLIFE - PRECOMPRESSION")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    encodings = available_encodings()
+    if 'br' not in encodings:
+        print("⚠ brotli is not installed (pip install brotli) - writing .gz only")
+
+    site_path = base_path / args.directory if args.directory else base_path
+    files = deployable_files(site_path)
+    cache_file = cache_path(base_path, site_path)
+    pending, entries = plan(site_path, files, {} if args.force else load_cache(cache_file), encodings)
+    print(f"✓ {len(files)} deployable files, {len(pending)} to compress")
+
+    original_bytes = 0
+    compressed_bytes = dict.fromkeys(encodings, 0)
+    for path, sizes in zip(pending, map_pages(compress_file, [(str(path), encodings) for path in pending], args.jobs)):
+        key = path.relative_to(site_path).as_posix()
+        entries[key]['encodings'] = sizes
+        original_bytes += entries[key]['size']
+        for encoding, size in sizes.items():
+            compressed_bytes[encoding] += size if size is not None else entries[key]['size']
+        print(f"  - {key} ({entries[key]['size'] // 1024} KB → "
+              + ', '.join(f"{encoding} {size // 1024} KB" for encoding, size in sizes.items() if size is not None) + ")")
+
+    for path in orphaned_siblings(site_path, files):
+        path.unlink()
+        print(f"  - Removed {path.relative_to(site_path)} (file is gone)")
+
+    save_cache(cache_file, entries)
+
+    print("\n" + "="*60)
+    summary = ', '.join(f"{encoding} {compressed_bytes[encoding] // 1024} KB" for encoding in encodings)
+    print(f"PRECOMPRESSION COMPLETE: {len(pending)} files, {original_bytes // 1024} KB → {summary}")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
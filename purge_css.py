@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Write pruned copies of the site's stylesheets, keeping only rules the pages can use
+Every class, id and tag in the non-backup HTML files goes into an inverted index
+(name -> pages), so a selector is kept only if one page has everything it needs
+"""
+
+import argparse
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from critical_css import local_stylesheet
+from css_parser import load_rooted_stylesheet, selector_requirements, serialize_rules, split_selectors
+from page_writer import write_page
+from pipeline import PASSES, module_path
+
+PURGED_SUFFIX = '.purged.css'
+
+# Classes set by scripts at runtime, never present in the markup
+ALLOWLIST = {'scrolled', 'active', 'show', 'is-open', 'is-active', 'is-visible', 'nav--shrink'}
+ALLOWLIST_PREFIXES = ('w--', 'w-mod-', 'slick-')
+
+# Directories that hold no site pages
+SKIPPED_DIRS = {'node_modules', 'tests', 'test-results', 'playwright-report'}
+
+CLASS_ATTR_PATTERN = re.compile(r'\sclass\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+ID_ATTR_PATTERN = re.compile(r'\sid\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+TAG_PATTERN = re.compile(r'<([a-zA-Z][\w-]*)')
+STYLESHEET_HREF_PATTERN = re.compile(r'<link\b[^>]*\brel=["\']?stylesheet["\']?[^>]*>', re.IGNORECASE)
+HREF_PATTERN = re.compile(r'\bhref\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
+# Class names passed to classList.add/toggle and jQuery addClass/toggleClass
+SCRIPT_CLASS_PATTERN = re.compile(r'(?:classList\.(?:add|toggle)|(?:add|toggle)Class)\(\s*["\']([\w -]+)["\']')
+
+# Quoted strings in pass scripts that look like class lists ('is-weight-management')
+LITERAL_CLASS_PATTERN = re.compile(r'["\']([a-zA-Z_][\w-]*(?: [a-zA-Z_][\w-]*)*)["\']')
+
+def site_pages(base_path):
+    """Every non-backup HTML file in the site, including components"""
+    for path in sorted(base_path.rglob('*.html')):
+        parts = path.relative_to(base_path).parts
+        if any(part.startswith('.') or part in SKIPPED_DIRS for part in parts[:-1]):
+            continue
+        if len(path.suffixes) == 1 and 'backup' not in path.name:
+            yield path
+
+def page_names(html):
+    """Set of ('tag'|'class'|'id', name) used by a page"""
+    names = {('tag', tag.lower()) for tag in TAG_PATTERN.findall(html)}
+    for match in CLASS_ATTR_PATTERN.finditer(html):
+        names.update(('class', value) for value in (match.group(1) or match.group(2) or '').split())
+    for match in ID_ATTR_PATTERN.finditer(html):
+        value = match.group(1) or match.group(2)
+        if value:
+            names.add(('id', value))
+    return names
+
+def build_index(base_path):
+    """Inverted index (name -> set of page numbers), page paths and the stylesheets they link"""
+    index = defaultdict(set)
+    pages = []
+    stylesheets = {}
+    script_classes = set()
+
+    for number, path in enumerate(site_pages(base_path)):
+        html = path.read_text(encoding='utf-8')
+        pages.append(path)
+        for name in page_names(html):
+            index[name].add(number)
+        script_classes.update(SCRIPT_CLASS_PATTERN.findall(html))
+
+        for link in STYLESHEET_HREF_PATTERN.findall(html):
+            href = HREF_PATTERN.search(link)
+            href = href and (href.group(1) or href.group(2))
+            stylesheet = href and local_stylesheet(path.parent, href)
+            if stylesheet is not None and not stylesheet.name.endswith(PURGED_SUFFIX):
+                stylesheets[stylesheet.resolve()] = stylesheet
+
+    for path in (base_path / 'assets' / 'js').glob('*.js'):
+        script_classes.update(SCRIPT_CLASS_PATTERN.findall(path.read_text(encoding='utf-8', errors='replace')))
+
+    return index, pages, list(stylesheets.values()), {name for value in script_classes for name in value.split()}
+
+def pass_classes():
+    """Class names the rewrite passes add to pages"""
+    names = set()
+    for _name, module_name, _function, _pages in PASSES:
+        source = Path(module_path(module_name)).read_text(encoding='utf-8')
+        for match in CLASS_ATTR_PATTERN.finditer(source):
+            names.update((match.group(1) or match.group(2) or '').split())
+        for value in LITERAL_CLASS_PATTERN.findall(source):
+            names.update(value.split())
+    return names
+
+def is_global(requirement, global_classes):
+    """True for names that may appear on any page"""
+    kind, name = requirement
+    return kind == 'class' and (name in global_classes or name.startswith(ALLOWLIST_PREFIXES))
+
+def selector_used(selector, index, global_classes):
+    """True if some page has every class, id and tag the selector needs"""
+    required = [requirement for requirement in selector_requirements(selector)
+                if not is_global(requirement, global_classes)]
+    if not required:
+        return True
+
+    page_sets = []
+    for requirement in required:
+        pages = index.get(requirement)
+        if not pages:
+            return False
+        page_sets.append(pages)
+
+    page_sets.sort(key=len)
+    return bool(page_sets[0].intersection(*page_sets[1:]))
+
+def purge_rules(rules, index, global_classes):
+    """Rules with unused selectors dropped; empty groups and selector lists go entirely"""
+    kept = []
+    for rule in rules:
+        if rule.children is not None:
+            children = purge_rules(rule.children, index, global_classes)
+            if children:
+                kept.append(rule._replace(children=children))
+        elif rule.prelude.startswith('@'):
+            kept.append(rule)
+        else:
+            selectors = [selector for selector in split_selectors(rule.prelude)
+                         if selector_used(selector, index, global_classes)]
+            if selectors:
+                kept.append(rule._replace(prelude=', '.join(selectors)))
+    return kept
+
+def drop_unused_keyframes(rules):
+    """Remove @keyframes no kept rule animates with"""
+    def bodies(rules):
+        for rule in rules:
+            if rule.children is not None:
+                yield from bodies(rule.children)
+            elif rule.body and not rule.prelude.startswith('@'):
+                yield rule.body
+
+    used = ' '.join(body for body in bodies(rules) if 'animation' in body)
+    used_words = set(re.findall(r'[\w-]+', used))
+
+    kept = []
+    for rule in rules:
+        if rule.children is not None:
+            rule = rule._replace(children=drop_unused_keyframes(rule.children))
+        elif re.match(r'@(?:-\w+-)?keyframes\s', rule.prelude) and rule.prelude.split()[-1] not in used_words:
+            continue
+        kept.append(rule)
+    return kept
+
+def count_rules(rules):
+    """Style rules, counting inside groups"""
+    return sum(count_rules(rule.children) if rule.children is not None else 1 for rule in rules)
+
+def purge_stylesheet(path, index, global_classes):
+    """Write the pruned copy of one stylesheet
+
+    Returns (output path, rules before, rules after, bytes before, bytes after); sizes
+    are of the same compact serialization, so they measure the purge alone.
+    """
+    # Rooted at the sheet's own directory: @imports are inlined, url()s still resolve next to it
+    rules = load_rooted_stylesheet(path, path.parent)
+    kept = drop_unused_keyframes(purge_rules(rules, index, global_classes))
+
+    css = serialize_rules(kept) + '\n'
+    output_path = path.with_name(path.name[:-len('.css')] + PURGED_SUFFIX)
+    write_page(output_path, css)
+    return (output_path, count_rules(rules), count_rules(kept),
+            len(serialize_rules(rules).encode('utf-8')) + 1, len(css.encode('utf-8')))
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Write stylesheets pruned to the selectors the pages use")
+    parser.add_argument('stylesheets', nargs='*', metavar='CSS',
+                        help="stylesheets to purge (default: every local stylesheet the pages link)")
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("EVOLIFE - UNUSED CSS PURGE")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    index, pages, linked, script_classes = build_index(base_path)
+    global_classes = ALLOWLIST | script_classes | pass_classes()
+    print(f"✓ Indexed {len(index)} names across {len(pages)} pages ({len(global_classes)} allowlisted classes)")
+
+    stylesheets = [Path(path) for path in args.stylesheets] or linked
+    total_before = total_after = 0
+    for path in stylesheets:
+        if not path.is_file():
+            print(f"\n✗ File not found: {path}")
+            continue
+
+        output_path, rules_before, rules_after, size_before, size_after = purge_stylesheet(path, index, global_classes)
+        total_before += size_before
+        total_after += size_after
+        print(f"\n✓ {path.relative_to(base_path) if path.is_relative_to(base_path) else path}")
+        print(f"  - Rules kept: {rules_after}/{rules_before}")
+        print(f"  - Size: {size_before // 1024} KB → {size_after // 1024} KB")
+        print(f"  - Written: {output_path.name}")
+
+    print("\n" + "="*60)
+    print(f"PURGE COMPLETE: {total_before // 1024} KB → {total_after // 1024} KB")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
@@ -4,20 +4,13 @@ Remove all images from the testimonial section in index.html
 """
 
 import re
-from datetime import datetime
+from pathlib import Path
 
-def remove_testimonial_images(file_path):
-    """Remove testimonial profile images and before/after images"""
+from backup_store import backup_page
+from page_writer import write_page
 
-    # Read the file
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-
-    # Create backup
-    backup_path = file_path.replace('.html', f'.testimonial_img_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.html')
-    with open(backup_path, 'w', encoding='utf-8') as f:
-        f.write(content)
-    print(f"Backup created: {backup_path}")
+def strip_testimonial_images(content):
+    """Strip testimonial profile and before/after image wrappers"""
 
     # Remove testimonial_client-image-wrapper divs and their contents
     # This pattern matches the entire div including the img tag inside
@@ -37,9 +30,23 @@ def remove_testimonial_images(file_path):
         flags=re.DOTALL
     )
 
+    return content
+
+def remove_testimonial_images(file_path):
+    """Remove testimonial profile images and before/after images"""
+
+    # Read the file
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+
+    # Create backup
+    blob = backup_page(Path(file_path), content, 'testimonial_img')
+    print(f"Backup stored: {blob[:12]}")
+
+    new_content = strip_testimonial_images(content)
+
     # Write the updated content
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(content)
+    write_page(file_path, new_content, content)
 
     print(f"✓ Removed all testimonial images from {file_path}")
     print(f"  - Removed customer profile images")
@@ -4,6 +4,9 @@
 import re
 from pathlib import Path
 
+from backup_store import backup_page
+from page_writer import write_page
+
 # Main files to process (excluding backups)
 MAIN_FILES = [
     'index.html',
@@ -65,14 +68,11 @@ def process_file(file_path):
 
         if changes_made:
             # Create backup
-            backup_path = file_path.with_suffix('.pre_treatment_removal.html')
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                f.write(original_content)
-            print(f"  ✓ Backup saved to {backup_path.name}")
+            blob = backup_page(file_path, original_content, 'pre_treatment_removal')
+            print(f"  ✓ Backup stored: {blob[:12]}")
 
             # Write modified content
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(modified_content)
+            write_page(file_path, modified_content, original_content)
             print(f"  ✓ Updated {file_path.name}")
         else:
             print(f"  - No changes needed")
@@ -4,9 +4,13 @@ Replace incorrect testosterone FAQs with category-specific FAQs
 Creates medically accurate, SEO-optimized FAQ content
 """
 
-import re
+import argparse
 from pathlib import Path
-from datetime import datetime
+
+from backup_store import backup_page
+from html_tokenizer import replace_inner
+from page_writer import sync_writes, write_page
+from parallel import add_jobs_argument, map_pages
 
 # FAQ Content for each page - Medically accurate and helpful
 MENS_HEALTH_FAQS = [
@@ -90,6 +94,16 @@ WEIGHT_MANAGEMENT_FAQS = [
     }
 ]
 
+# Pages and their page-specific configuration
+PAGES = [
+    ('mens-health.html', MENS_HEALTH_FAQS, "Men's Health"),
+    ('recovery.html', RECOVERY_FAQS, "Recovery"),
+    ('weight-management.html', WEIGHT_MANAGEMENT_FAQS, "Weight Management")
+]
+
+# The FAQ accordion list whose items are replaced
+FAQ_STACK_SELECTOR = 'div.accordion-stack.w-dyn-items[role=list]'
+
 def create_faq_html(faqs):
     """Generate HTML for FAQ section"""
     faq_items = []
@@ -112,6 +126,32 @@ def create_faq_html(faqs):
 
     return ''.join(faq_items)
 
+def replace_faqs(content, faqs, category_name):
+    """Replace the FAQ accordion stack with category-specific FAQs"""
+    changes = []
+
+    # Replace the items inside the FAQ accordion stack
+    new_faq_html = create_faq_html(faqs)
+    content, stack = replace_inner(content, FAQ_STACK_SELECTOR, new_faq_html)
+
+    if stack is None:
+        return content, changes
+
+    # Update category-specific classes
+    category_class_map = {
+        "Men's Health": "is-mens-health",
+        "Recovery": "is-recovery",
+        "Weight Management": "is-weight-management"
+    }
+
+    category_class = category_class_map.get(category_name, "is-mens-health")
+    content = content.replace('is-category', category_class)
+
+    for i, faq in enumerate(faqs, 1):
+        changes.append(f"  {i}. {faq['question'][:60]}...")
+
+    return content, changes
+
 def replace_faqs_in_file(file_path, faqs, category_name):
     """Replace FAQ section in HTML file"""
     print(f"\n{'='*60}")
@@ -122,48 +162,22 @@ def replace_faqs_in_file(file_path, faqs, category_name):
     content = file_path.read_text(encoding='utf-8')
 
     # Create backup
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    backup_path = file_path.with_suffix(f'.faq_backup_{timestamp}{file_path.suffix}')
-    backup_path.write_text(content, encoding='utf-8')
-    print(f"✓ Backup created: {backup_path.name}")
+    blob = backup_page(file_path, content, 'faq')
+    print(f"✓ Backup stored: {blob[:12]}")
 
     # Find and replace FAQ section
-    # Pattern to match the entire FAQ accordion stack
-    faq_pattern = r'(<div role="list" class="accordion-stack w-dyn-items">)(.*?)(</div></div></div></div></section>)'
-
-    match = re.search(faq_pattern, content, re.DOTALL)
+    new_content, changes = replace_faqs(content, faqs, category_name)
 
-    if not match:
+    if not changes:
         print("✗ Could not find FAQ section")
         return False
 
-    # Generate new FAQ HTML
-    new_faq_html = create_faq_html(faqs)
-
-    # Replace old FAQs with new ones
-    new_content = re.sub(
-        faq_pattern,
-        r'\1' + new_faq_html + r'\3',
-        content,
-        flags=re.DOTALL
-    )
-
-    # Update category-specific classes
-    category_class_map = {
-        "Men's Health": "is-mens-health",
-        "Recovery": "is-recovery",
-        "Weight Management": "is-weight-management"
-    }
-
-    category_class = category_class_map.get(category_name, "is-mens-health")
-    new_content = new_content.replace('is-category', category_class)
-
     # Write back
-    file_path.write_text(new_content, encoding='utf-8')
+    write_page(file_path, new_content, content)
 
     print(f"✓ Replaced {len(faqs)} FAQ items:")
-    for i, faq in enumerate(faqs, 1):
-        print(f"  {i}. {faq['question'][:60]}...")
+    for change in changes:
+        print(change)
 
     print(f"✓ File updated: {file_path.name}")
 
@@ -171,28 +185,34 @@ def replace_faqs_in_file(file_path, faqs, category_name):
 
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description="Replace testosterone FAQs with category-specific FAQs")
+    add_jobs_argument(parser)
+    args = parser.parse_args()
+
     print("\n" + "="*60)
     print("EVOLIFE - FAQ CONTENT REPLACEMENT")
     print("="*60)
 
     base_path = Path("/Users/raiyanabdullah/Desktop/Evolife FInal and last")
 
-    pages = [
-        ('mens-health.html', MENS_HEALTH_FAQS, "Men's Health"),
-        ('recovery.html', RECOVERY_FAQS, "Recovery"),
-        ('weight-management.html', WEIGHT_MANAGEMENT_FAQS, "Weight Management")
-    ]
-
     success_count = 0
 
-    for filename, faqs, category in pages:
+    items = []
+    for filename, faqs, category in PAGES:
         file_path = base_path / filename
         if file_path.exists():
-            if replace_faqs_in_file(file_path, faqs, category):
-                success_count += 1
+            items.append((file_path, faqs, category))
         else:
             print(f"\n✗ File not found: {filename}")
 
+    # Pages run in parallel; output is replayed in page order
+    for success, output in map_pages(replace_faqs_in_file, items, args.jobs, capture=True):
+        print(output, end='')
+        if success:
+            success_count += 1
+    # The workers wrote the pages; flush them to disk in one pass
+    sync_writes(file_path for file_path, *_ in items)
+
     print("\n" + "="*60)
     print(f"FAQ REPLACEMENT COMPLETE: {success_count}/3 pages updated")
     print("="*60)
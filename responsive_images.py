@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Downscaled WebP/AVIF variants of the site's raster images, and srcset/sizes for pages
+Variants go to a content-addressed directory (one folder per source hash), are only
+encoded when missing, and are recorded in a manifest the rewrite pass reads
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import unquote
+
+import deps
+from build_cache import CACHE_DIR
+from fingerprint_assets import original_asset
+from html_tokenizer import parse_attrs
+from image_dimensions import IMG_TAG_PATTERN, image_size, resolve_image, save_index
+from parallel import add_jobs_argument, map_pages
+
+VARIANT_DIR = 'assets/images/variants'
+MANIFEST_NAME = 'image-variants.json'
+MANIFEST_VERSION = 1
+
+# Widths generated for every source wider than them; the source width is always added
+VARIANT_WIDTHS = [480, 800, 1200, 1600]
+VARIANT_QUALITY = {'webp': 80, 'avif': 60}
+
+# Formats that can be decoded and downscaled
+SOURCE_SUFFIXES = {'.png', '.jpg', '.jpeg', '.webp'}
+
+# Sources narrower than this gain nothing from variants (icons, logos at display size)
+MIN_SOURCE_WIDTH = 600
+
+def manifest_path(base_path):
+    """Location of the variant manifest for a site root"""
+    return Path(base_path) / CACHE_DIR / MANIFEST_NAME
+
+def load_manifest(base_path):
+    """Load the variant manifest: source path -> entry"""
+    try:
+        manifest = json.loads(manifest_path(base_path).read_text(encoding='utf-8'))
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+    return manifest.get('sources', {}) if manifest.get('version') == MANIFEST_VERSION else {}
+
+def save_manifest(base_path, sources):
+    """Write the variant manifest atomically"""
+    path = manifest_path(base_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps({'version': MANIFEST_VERSION, 'sources': sources}, indent=1, sort_keys=True),
+                        encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def entry_is_current(entry, path):
+    """True if a manifest entry was made from the file as it is now"""
+    stat = path.stat()
+    return entry is not None and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+
+def variant_widths(source_width, widths):
+    """Widths to generate for a source, ending with its own width"""
+    return [width for width in widths if width < source_width] + [source_width]
+
+def variant_path(digest, source_path, width, fmt):
+    """Content-addressed location of one variant, relative to the site root"""
+    # Mirrored CDN names hold spaces and %20, which srcset can not carry as they are
+    stem = re.sub(r'[^\w.-]+', '-', unquote(source_path.stem)).strip('-')
+    return f'{VARIANT_DIR}/{digest[:16]}/{stem}-{width}-q{VARIANT_QUALITY[fmt]}.{fmt}'
+
+def encode_variant(source, output, width, fmt):
+    """Downscale one image to width and encode it; runs in pool workers"""
+    from PIL import Image, ImageOps
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image = image.resize((width, round(image.height * width / image.width)), Image.LANCZOS)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'PA') else 'RGB')
+
+        output = Path(output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output.with_name(f'{output.name}.{os.getpid()}.tmp')
+        options = {'method': 6} if fmt == 'webp' else {}
+        image.save(tmp_path, format=fmt.upper(), quality=VARIANT_QUALITY[fmt], **options)
+        os.replace(tmp_path, output)
+
+    return output.stat().st_size
+
+def available_formats(formats):
+    """The requested formats Pillow can encode here, or None without Pillow"""
+    try:
+        from PIL import features
+    except ImportError:
+        return None
+    return [fmt for fmt in formats if features.check(fmt)]
+
+def referenced_sources(base_path):
+    """Raster images the pages use, wide enough for variants"""
+    sources = set()
+    for page in sorted(base_path.glob('*.html')):
+        if len(page.suffixes) != 1 or 'backup' in page.name:
+            continue
+        for match in IMG_TAG_PATTERN.finditer(page.read_text(encoding='utf-8')):
+            path = resolve_image(base_path, page.parent, parse_attrs(match.group(1)).get('src'))
+            if path is not None and path.suffix.lower() in SOURCE_SUFFIXES:
+                sources.add(original_asset(path))
+
+    save_index(base_path)
+    return sorted(path for path in sources if (image_size(base_path, path) or (0, 0))[0] >= MIN_SOURCE_WIDTH)
+
+def plan_variants(base_path, sources, manifest, widths, formats):
+    """Manifest entries for every source, and the (source, output, width, format) encodes missing"""
+    entries = {}
+    missing = []
+    for path in sources:
+        key = path.relative_to(base_path).as_posix()
+        entry = manifest.get(key)
+        if not entry_is_current(entry, path):
+            stat = path.stat()
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                     'sha256': hashlib.sha256(path.read_bytes()).hexdigest()}
+
+        source_width, source_height = image_size(base_path, path)
+        entry['width'], entry['height'] = source_width, source_height
+        entry['variants'] = {}
+        for fmt in formats:
+            entry['variants'][fmt] = []
+            for width in variant_widths(source_width, widths):
+                output = variant_path(entry['sha256'], path, width, fmt)
+                entry['variants'][fmt].append([width, output])
+                if not (base_path / output).exists():
+                    missing.append((str(path), str(base_path / output), width, fmt))
+        entries[key] = entry
+    return entries, missing
+
+def srcset(variants, page_prefix):
+    """srcset value for a list of [width, path] variants"""
+    return ', '.join(f'{posixpath.join(page_prefix, output) if page_prefix else output} {width}w'
+                     for width, output in variants)
+
+def sizes_for(attrs, source_width):
+    """sizes value: full viewport width until the image reaches its rendered width
+
+    Images here are capped by max-width:100% and never upscaled, so the width
+    attribute (or the source width) bounds the displayed width.
+    """
+    width = attrs.get('width')
+    width = int(width) if width and width.isdigit() else source_width
+    return f'(max-width: {width}px) 100vw, {width}px'
+
+# Manifest loaded once per process, and again if the file changes under a watch process
+_manifest = None
+_manifest_stat = None
+
+def current_manifest(base_path):
+    """The manifest, reloaded only when its mtime or size moved since the last load"""
+    global _manifest, _manifest_stat
+    try:
+        stat = manifest_path(base_path).stat()
+        key = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        key = None
+    if _manifest is None or key != _manifest_stat:
+        _manifest, _manifest_stat = load_manifest(base_path), key
+    return _manifest
+
+def add_srcsets(content, base_path, page_dir=None):
+    """Point every <img> with generated variants at them through srcset and sizes"""
+    changes = []
+    base_path = Path(base_path)
+    page_dir = Path(page_dir or base_path)
+    deps.record_input(manifest_path(base_path))
+    manifest = current_manifest(base_path)
+    if not manifest:
+        return content, changes
+
+    page_prefix = posixpath.relpath(base_path.resolve().as_posix(), page_dir.resolve().as_posix())
+    page_prefix = '' if page_prefix == '.' else page_prefix
+    rewritten = 0
+    pictures = 0
+
+    def rewrite(match):
+        nonlocal rewritten, pictures
+        attrs = parse_attrs(match.group(1))
+        if 'srcset' in attrs:
+            return match.group()
+        path = resolve_image(base_path, page_dir, attrs.get('src'))
+        if path is None:
+            return match.group()
+        path = original_asset(path)
+        deps.record_input(path)
+        entry = manifest.get(path.relative_to(base_path).as_posix())
+        if entry is None or not entry_is_current(entry, path) or not entry['variants'].get('webp'):
+            return match.group()
+
+        sizes = sizes_for(attrs, entry['width'])
+        tag = (f'<img srcset="{srcset(entry["variants"]["webp"], page_prefix)}" sizes="{sizes}"'
+               + match.group()[len('<img'):])
+        rewritten += 1
+
+        # AVIF needs <picture>: one srcset can not offer a fallback format
+        if entry['variants'].get('avif'):
+            pictures += 1
+            tag = (f'<picture><source type="image/avif" srcset="{srcset(entry["variants"]["avif"], page_prefix)}" '
+                   f'sizes="{sizes}">{tag}</picture>')
+        return tag
+
+    content = IMG_TAG_PATTERN.sub(rewrite, content)
+    if rewritten:
+        changes.append(f"  - Added srcset/sizes to {rewritten} images")
+    if pictures:
+        changes.append(f"  - Wrapped {pictures} images in <picture> for AVIF")
+    return content, changes
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Generate downscaled WebP/AVIF variants of the site's images")
+    parser.add_argument('--widths', default=','.join(map(str, VARIANT_WIDTHS)),
+                        help="comma-separated variant widths (default: %(default)s)")
+    parser.add_argument('--avif', action='store_true', help="also generate AVIF variants (served through <picture>)")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+
+    print("\n" + "="*60)
+    print("EVOLIFE - RESPONSIVE IMAGE VARIANTS")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    widths = sorted(int(width) for width in args.widths.split(','))
+    requested = ['webp', 'avif'] if args.avif else ['webp']
+    formats = available_formats(requested)
+    if formats is None:
+        raise SystemExit("✗ Pillow is not installed (pip install Pillow)")
+    for fmt in requested:
+        if fmt not in formats:
+            print(f"⚠ This Pillow build can not encode {fmt.upper()} - skipped")
+
+    sources = referenced_sources(base_path)
+    entries, missing = plan_variants(base_path, sources, load_manifest(base_path), widths, formats)
+    print(f"✓ {len(sources)} source images, {len(missing)} variants to encode")
+
+    encoded_bytes = 0
+    for (source, output, width, fmt), size in zip(missing, map_pages(encode_variant, missing, args.jobs)):
+        encoded_bytes += size
+        print(f"  - {Path(output).relative_to(base_path)} ({size // 1024} KB)")
+
+    save_manifest(base_path, entries)
+    variant_count = sum(len(variants) for entry in entries.values() for variants in entry['variants'].values())
+
+    print("\n" + "="*60)
+    print(f"VARIANTS COMPLETE: {len(missing)} encoded ({encoded_bytes // 1024} KB), "
+          f"{variant_count - len(missing)} up to date")
+    print("Add them to the pages with: python3 pipeline.py --pass responsive-images")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
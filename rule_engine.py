@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Shared regex rule engine for the rewrite scripts
+Rule tables are compiled once at import and each rule is applied in a single subn scan
+Opt-in profiling records wall time, matches and characters scanned per rule per page
+"""
+
+import json
+import os
+import re
+import time
+
+# Table names of compiled rules, for reports: regex -> 'TABLE[index]'
+RULE_NAMES = {}
+
+# Profile being recorded, or None when profiling is off
+_profile = None
+_context = {'page': None, 'pass': None}
+
+def name_rules(rules, name):
+    """Remember where each compiled rule came from"""
+    if name:
+        for index, (regex, *_rest) in enumerate(rules):
+            RULE_NAMES.setdefault(regex, f'{name}[{index}]')
+    return rules
+
+def compile_rules(table, flags=0, name=None):
+    """Precompile a rule table
+
+    Rules are (pattern, replacement, *extra) tuples; extra fields such as a
+    context description are kept as they are.
+    """
+    rules = [(re.compile(pattern, flags), replacement, *extra) for pattern, replacement, *extra in table]
+    return name_rules(rules, name)
+
+def compile_flagged_rules(table, name=None):
+    """Precompile a table of (pattern, replacement, flags) rules, each with its own flags"""
+    rules = [(re.compile(pattern, flags), replacement) for pattern, replacement, flags in table]
+    return name_rules(rules, name)
+
+def rule_name(regex):
+    """Table name of a rule, or the start of its pattern"""
+    return RULE_NAMES.get(regex) or regex.pattern[:60]
+
+def apply_rule(content, regex, replacement):
+    """Apply one compiled rule in a single scan and return (content, match count)"""
+    if _profile is None:
+        return regex.subn(replacement, content)
+
+    start = time.perf_counter()
+    new_content, count = regex.subn(replacement, content)
+    record_rule(regex, start, time.perf_counter() - start, count, len(content))
+    return new_content, count
+
+# Profiling
+
+def enable_profiling():
+    """Start recording per-rule timings"""
+    global _profile
+    _profile = {'rules': {}, 'events': [], 'origin': time.perf_counter()}
+
+def disable_profiling():
+    """Stop recording and return the profile"""
+    global _profile
+    profile, _profile = _profile, None
+    return profile
+
+def set_profile_context(page=None, pass_name=None):
+    """Attribute the following rule applications to a page and pass"""
+    _context['page'] = page
+    _context['pass'] = pass_name
+
+def record_rule(regex, start, elapsed, count, scanned):
+    """Add one rule application to the profile"""
+    name = rule_name(regex)
+    key = (name, _context['page'])
+    stats = _profile['rules'].setdefault(key, {'pass': _context['pass'], 'calls': 0, 'seconds': 0.0,
+                                              'matches': 0, 'scanned': 0})
+    stats['calls'] += 1
+    stats['seconds'] += elapsed
+    stats['matches'] += count
+    stats['scanned'] += scanned
+
+    _profile['events'].append({
+        'name': name,
+        'cat': _context['pass'] or 'rule',
+        'ph': 'X',
+        'ts': round((start - _profile['origin']) * 1e6, 1),
+        'dur': round(elapsed * 1e6, 1),
+        'pid': os.getpid(),
+        'tid': 0,
+        'args': {'page': _context['page'], 'matches': count, 'scanned': scanned},
+    })
+
+def hot_rules(profile, top=15):
+    """Rules by total time across pages: (name, pass, calls, seconds, worst page, worst seconds, matches, scanned)"""
+    totals = {}
+    for (name, page), stats in profile['rules'].items():
+        total = totals.setdefault(name, [stats['pass'], 0, 0.0, None, 0.0, 0, 0])
+        total[1] += stats['calls']
+        total[2] += stats['seconds']
+        if stats['seconds'] > total[4]:
+            total[3], total[4] = page, stats['seconds']
+        total[5] += stats['matches']
+        total[6] += stats['scanned']
+
+    rows = [(name, *total) for name, total in totals.items()]
+    rows.sort(key=lambda row: row[3], reverse=True)
+    return rows[:top]
+
+def print_hot_rules(profile, top=15):
+    """Print the top-N hottest rules table"""
+    rows = hot_rules(profile, top)
+    print(f"\n{'='*60}")
+    print(f"HOTTEST RULES (top {len(rows)})")
+    print(f"{'='*60}")
+    print(f"{'Rule':34} {'pass':20} {'calls':>6} {'total ms':>9} {'worst ms':>9} {'matches':>8} {'MB':>7}  worst page")
+    for name, pass_name, calls, seconds, worst_page, worst_seconds, matches, scanned in rows:
+        print(f"{name[:34]:34} {(pass_name or '-')[:20]:20} {calls:6} {seconds * 1000:9.2f} "
+              f"{worst_seconds * 1000:9.2f} {matches:8} {scanned / 1e6:7.2f}  {worst_page or '-'}")
+
+def write_chrome_trace(profile, path):
+    """Write rule applications as a Chrome trace (chrome://tracing, Perfetto)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': profile['events'], 'displayTimeUnit': 'ms'}, f)
@@ -28,7 +28,7 @@ const path = require('path');
 // ===================================================================
 
 const TEMPLATE_PATH = path.join(__dirname, '..', 'semaglutide-new.html');
-const PRODUCTS_DATA_PATH = path.join(__dirname, '..', 'product-content.json');
+const PRODUCTS_DATA_PATH = path.join(__dirname, '..', 'data', 'product-content.json');
 const OUTPUT_DIR = path.join(__dirname, '..');
 
 // ===================================================================
@@ -44,7 +44,7 @@ function loadProductsData() {
     return JSON.parse(data);
   } catch (error) {
     console.error('❌ Error loading product data:', error.message);
-    console.log('💡 Make sure product-content.json exists in the root directory.');
+    console.log('💡 Make sure data/product-content.json exists.');
     process.exit(1);
   }
 }
@@ -170,7 +170,7 @@ ${mechanismItems}
   }
 
   // ===== KEY BENEFITS =====
-  if (product.benefits && product.benefits.length >= 6) {
+  if (product.benefits && product.benefits.items.length >= 6) {
     const benefitsRegex = /<section class="section section--padded section--bg-light">[\s\S]*?<h2 class="display-md">Key Benefits<\/h2>[\s\S]*?<div class="grid grid--3">[\s\S]*?<\/div>\s*<\/div>\s*<\/section>/;
 
     const benefitsHTML = `<section class="section section--padded section--bg-light">
@@ -183,7 +183,7 @@ ${mechanismItems}
     </div>
 
     <div class="grid grid--3">
-${product.benefits.slice(0, 6).map(benefit => `      <!-- Benefit: ${benefit.title} -->
+${product.benefits.items.slice(0, 6).map(benefit => `      <!-- Benefit: ${benefit.title} -->
       <div class="card card--benefit">
         <div class="icon-circle">
           <span class="icon-lg">${benefit.icon}</span>
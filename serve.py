@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+"""
+Preview server for the site that behaves like the production hosts
+Threaded, HTTP/1.1 keep-alive; serves the .br/.gz siblings precompress.py writes when the client
+accepts them, with strong ETags, 304s, byte ranges, an in-memory LRU of small files and
+sendfile() for large ones. Fingerprinted assets are sent with immutable cache headers
+"""
+
+import argparse
+import email.utils
+import hashlib
+import mimetypes
+import posixpath
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+from fingerprint_assets import load_manifest, manifest_path
+from precompress import COMPRESSED_SUFFIXES, ENCODINGS, sibling
+
+DEFAULT_PORT = 8080
+
+# Files up to this size are kept in memory; larger ones are sent with sendfile()
+MAX_CACHED_FILE = 1024 * 1024
+DEFAULT_CACHE_MB = 64
+
+# Preferred encoding first, when the client accepts several at the same quality
+ENCODING_PREFERENCE = ['br', 'gzip']
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Unhashed files may change under the same URL, so clients revalidate them (cheap with ETags)
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+EXTRA_TYPES = {'.avif': 'image/avif', '.webp': 'image/webp', '.woff2': 'font/woff2', '.woff': 'font/woff',
+               '.svg': 'image/svg+xml', '.js': 'text/javascript', '.json': 'application/json'}
+
+def content_type(path):
+    """Content-Type of a file, with a charset for text"""
+    mime = EXTRA_TYPES.get(path.suffix.lower()) or mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    if mime.startswith('text/') or mime in ('application/json', 'image/svg+xml'):
+        mime += '; charset=utf-8'
+    return mime
+
+def accepted_encodings(header):
+    """Encodings from an Accept-Encoding header that have siblings, best first"""
+    qualities = {}
+    for item in (header or '').split(','):
+        name, _semicolon, params = item.strip().partition(';')
+        name = name.strip().lower()
+        quality = 1.0
+        for param in params.split(';'):
+            key, _equals, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name == '*':
+            for encoding in ENCODING_PREFERENCE:
+                qualities.setdefault(encoding, quality)
+        elif name in ENCODINGS:
+            qualities[name] = quality
+
+    return sorted((encoding for encoding, quality in qualities.items() if quality > 0),
+                  key=lambda encoding: (-qualities[encoding], ENCODING_PREFERENCE.index(encoding)))
+
+def parse_range(header, size):
+    """(first, last) byte of a single bytes= range, or None to send the whole file
+
+    Multiple ranges are answered with the whole file, which RFC 9110 allows.
+    Raises ValueError for a range that lies outside the file.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, dash, last = header[len('bytes='):].strip().partition('-')
+    if not dash or not (first.isdigit() or last.isdigit()):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError(header)
+        return max(0, size - int(last)), size - 1
+    if last and not last.isdigit():
+        return None
+    first, last = int(first), min(int(last), size - 1) if last else size - 1
+    if first >= size or (last < first):
+        raise ValueError(header)
+    return first, last
+
+class FileCache:
+    """Strong ETags for every file, and the bodies of small files, least recently used evicted first
+
+    Entries are keyed by path and checked against the file's mtime and size, so edits
+    show up on the next request without a restart.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bodies = OrderedDict()
+        self.body_bytes = 0
+        self.etags = {}
+        self.lock = threading.Lock()
+
+    def lookup(self, path, stat):
+        """(etag, body) for a file; body is None for files sent with sendfile()"""
+        key = str(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.bodies.get(key)
+            if entry is not None and entry[0] == version:
+                self.bodies.move_to_end(key)
+                return entry[1], entry[2]
+            etag = self.etags.get(key)
+            if etag is not None and etag[0] == version and stat.st_size > MAX_CACHED_FILE:
+                return etag[1], None
+
+        # Read outside the lock, so one slow file does not stall other requests
+        if stat.st_size <= MAX_CACHED_FILE:
+            body = path.read_bytes()
+            etag = f'"{hashlib.sha256(body).hexdigest()[:20]}"'
+            with self.lock:
+                self.store(key, (version, etag, body))
+            return etag, body
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        etag = f'"{digest.hexdigest()[:20]}"'
+        with self.lock:
+            self.etags[key] = (version, etag)
+        return etag, None
+
+    def store(self, key, entry):
+        """Insert a body and evict least recently used ones beyond the size limit"""
+        old = self.bodies.pop(key, None)
+        if old is not None:
+            self.body_bytes -= len(old[2])
+        if len(entry[2]) > self.max_bytes:
+            return
+        self.bodies[key] = entry
+        self.body_bytes += len(entry[2])
+        while self.body_bytes > self.max_bytes:
+            _key, evicted = self.bodies.popitem(last=False)
+            self.body_bytes -= len(evicted[2])
+
+class ImmutablePaths:
+    """Fingerprinted asset paths from assets/manifest.json, reloaded when it changes"""
+
+    def __init__(self, root):
+        self.root = root
+        self.version = None
+        self.paths = frozenset()
+        self.lock = threading.Lock()
+
+    def __contains__(self, relative_path):
+        try:
+            stat = manifest_path(self.root).stat()
+            version = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            version = None
+        with self.lock:
+            if version != self.version:
+                self.paths = frozenset(load_manifest(self.root).values()) if version else frozenset()
+                self.version = version
+            return relative_path in self.paths
+
+class SiteRequestHandler(BaseHTTPRequestHandler):
+    """GET/HEAD for files under the server's root"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'EvolifePreview/1.0'
+
+    def do_GET(self):
+        self.send_file(head_only=False)
+
+    def do_HEAD(self):
+        self.send_file(head_only=True)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+    def resolve(self):
+        """File for the request path, or None; the path never leaves the root"""
+        path = posixpath.normpath(unquote(urlsplit(self.path).path))
+        parts = [part for part in path.split('/') if part]
+        if any(part.startswith('.') for part in parts):
+            return None
+
+        file_path = self.server.root.joinpath(*parts)
+        if file_path.is_dir():
+            file_path = file_path / 'index.html'
+        elif not file_path.exists() and file_path.suffix == '':
+            # Extensionless page URLs, as the deploy hosts serve them
+            file_path = file_path.with_name(file_path.name + '.html')
+        return file_path if file_path.is_file() else None
+
+    def representation(self, path):
+        """(file to send, Content-Encoding or None, its stat) for the client's Accept-Encoding
+
+        A sibling counts only if precompress.py wrote it for the current file, which
+        it marks by giving the sibling the file's mtime.
+        """
+        stat = path.stat()
+        if path.suffix.lower() in COMPRESSED_SUFFIXES:
+            for encoding in accepted_encodings(self.headers.get('Accept-Encoding')):
+                try:
+                    sibling_stat = sibling(path, encoding).stat()
+                except FileNotFoundError:
+                    continue
+                if sibling_stat.st_mtime_ns == stat.st_mtime_ns:
+                    return sibling(path, encoding), encoding, sibling_stat
+        return path, None, stat
+
+    def not_modified(self, etag, stat):
+        """True if the client's cached copy is current"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(stat.st_mtime) <= since
+        return False
+
+    def send_file(self, head_only):
+        path = self.resolve()
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        source_stat = path.stat()
+        body_path, encoding, stat = self.representation(path)
+        etag, body = self.server.cache.lookup(body_path, stat)
+
+        relative_path = path.relative_to(self.server.root).as_posix()
+        headers = {
+            'Content-Type': content_type(path),
+            'ETag': etag,
+            'Last-Modified': email.utils.formatdate(source_stat.st_mtime, usegmt=True),
+            'Cache-Control': (IMMUTABLE_CACHE_CONTROL if relative_path in self.server.immutable
+                              else REVALIDATE_CACHE_CONTROL),
+            'Accept-Ranges': 'bytes',
+        }
+        if path.suffix.lower() in COMPRESSED_SUFFIXES:
+            headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            headers['Content-Encoding'] = encoding
+
+        if self.not_modified(etag, source_stat):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name in ('ETag', 'Cache-Control', 'Vary'):
+                if name in headers:
+                    self.send_header(name, headers[name])
+            self.end_headers()
+            return
+
+        size = stat.st_size
+        first, last = 0, size - 1
+        status = HTTPStatus.OK
+        if_range = self.headers.get('If-Range')
+        if if_range is None or if_range == etag:
+            try:
+                byte_range = parse_range(self.headers.get('Range'), size)
+            except ValueError:
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range is not None:
+                first, last = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+                headers['Content-Range'] = f'bytes {first}-{last}/{size}'
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(last - first + 1))
+        self.end_headers()
+        if head_only or size == 0:
+            return
+
+        if body is not None:
+            self.wfile.write(body[first:last + 1])
+        else:
+            # Zero-copy from the page cache where the platform supports it
+            with open(body_path, 'rb') as f:
+                self.connection.sendfile(f, first, last - first + 1)
+
+def make_server(root, bind, port, cache_mb=DEFAULT_CACHE_MB, quiet=False):
+    """A threaded server for root, not yet serving"""
+    server = ThreadingHTTPServer((bind, port), SiteRequestHandler)
+    server.daemon_threads = True
+    server.root = Path(root).resolve()
+    server.cache = FileCache(cache_mb * 1024 * 1024)
+    server.immutable = ImmutablePaths(server.root)
+    server.quiet = quiet
+    return server
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Serve the site locally like the production hosts")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on (default: %(default)s)")
+    parser.add_argument('--bind', default='127.0.0.1', help="address to bind (default: %(default)s)")
+    parser.add_argument('--directory', default=str(Path(__file__).parent), help="site root (default: this folder)")
+    parser.add_argument('--cache-mb', type=int, default=DEFAULT_CACHE_MB,
+                        help="memory for cached small files, in MB (default: %(default)s)")
+    parser.add_argument('--quiet', action='store_true', help="do not log requests (for load tests)")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.directory, args.bind, args.port, args.cache_mb, args.quiet)
+    print(f"✓ Serving {server.root} at http://{args.bind}:{args.port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n✓ Stopped")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
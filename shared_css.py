@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Move the CSS blocks the rewrite scripts inline into every page to shared stylesheets
+Each block is written once to a content-hashed file under assets/css/ and replaced by a
+<link>, so browsers cache it across pages; running it over old pages migrates them
+"""
+
+import hashlib
+import re
+from pathlib import Path
+
+from backup_store import backup_page
+from page_writer import write_page
+
+SHARED_CSS_DIR = 'assets/css'
+
+# Inline blocks moved out of the pages: marker comment -> stylesheet name stem
+# The marker stays in the page next to the <link>, so the scripts that add the
+# blocks still see them as present and do not inline them again
+SHARED_BLOCKS = {
+    'Mobile Optimizations': 'evolife-mobile',
+    'WCAG Color Contrast Fixes': 'evolife-color-contrast',
+    'Micro-interactions & Polish': 'evolife-micro-interactions',
+}
+
+BLOCK_PATTERNS = {
+    marker: re.compile(rf'<!-- {re.escape(marker)} -->\s*<style>\n?(.*?)</style>\n?', re.DOTALL)
+    for marker in SHARED_BLOCKS
+}
+
+def stylesheet_name(stem, css):
+    """Content-hashed file name: a changed block gets a new URL instead of a stale cache hit"""
+    return f"{stem}.{hashlib.sha256(css.encode('utf-8')).hexdigest()[:10]}.css"
+
+def write_stylesheet(base_path, name, css):
+    """Write a shared stylesheet unless it already exists
+
+    Names are content hashes, so an existing file already holds this CSS. The
+    write is atomic because pool workers may race on it.
+    """
+    path = Path(base_path) / SHARED_CSS_DIR / name
+    if path.exists():
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return write_page(path, css)
+
+def link_block(marker, name):
+    """Marker comment and <link> that replace an inline block"""
+    return f'<!-- {marker} -->\n<link href="{SHARED_CSS_DIR}/{name}" rel="stylesheet" type="text/css"/>\n'
+
+def externalize_styles(content, base_path):
+    """Replace every inline shared block with a link to its stylesheet"""
+    changes = []
+
+    for marker, stem in SHARED_BLOCKS.items():
+        match = BLOCK_PATTERNS[marker].search(content)
+        if not match:
+            continue
+
+        css = match.group(1)
+        name = stylesheet_name(stem, css)
+        if write_stylesheet(base_path, name, css):
+            changes.append(f"  - Wrote {SHARED_CSS_DIR}/{name} ({len(css.encode('utf-8')) // 1024} KB)")
+
+        content = content[:match.start()] + link_block(marker, name) + content[match.end():]
+        changes.append(f"  - Linked {marker} CSS: {name}")
+
+    return content, changes
+
+def process_file(file_path):
+    """Migrate a single file's inline blocks"""
+    print(f"\n{'='*60}")
+    print(f"Processing: {file_path.name}")
+    print(f"{'='*60}")
+
+    # Read file
+    content = file_path.read_text(encoding='utf-8')
+
+    new_content, changes = externalize_styles(content, file_path.parent)
+
+    if not changes:
+        print("✓ No inline shared CSS")
+        return False
+
+    # Create backup
+    blob = backup_page(file_path, content, 'shared-css')
+    print(f"✓ Backup stored: {blob[:12]}")
+
+    # Write back
+    write_page(file_path, new_content, content)
+
+    for change in changes:
+        print(change)
+
+    saved = len(content.encode('utf-8')) - len(new_content.encode('utf-8'))
+    print(f"✓ File updated: {file_path.name} ({saved // 1024} KB smaller)")
+
+    return True
+
+def main():
+    """Main execution"""
+    print("\n" + "="*60)
+    print("EVOLIFE - SHARED STYLESHEET EXTRACTION")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+
+    files = sorted(path for path in base_path.glob('*.html')
+                   if len(path.suffixes) == 1 and 'backup' not in path.name)
+
+    updated_count = 0
+    for file_path in files:
+        if process_file(file_path):
+            updated_count += 1
+
+    print("\n" + "="*60)
+    print(f"SHARED CSS COMPLETE: {updated_count}/{len(files)} pages migrated")
+    print("="*60)
+
+if __name__ == "__main__":
+    main()
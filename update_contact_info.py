@@ -6,6 +6,9 @@ import os
 import glob
 import re
 
+from literal_replace import compile_literals, replace_literals
+from page_writer import write_page
+
 # New contact information
 OLD_ADDRESS = '500 E Palmetto Park Rd, Boca Raton, FL 33432'
 NEW_ADDRESS = '7777 Glades Rd STE 100, Boca Raton, FL 33434, United States'
@@ -15,58 +18,84 @@ OLD_PHONE_TEL = 'tel:(561)5550100'
 NEW_PHONE_TEL = 'tel:+15618954000'
 EMAIL = 'info@evolifewellness.com'
 
-# Get all main HTML files (excluding backups, node_modules, and treatment-pages)
-html_files = []
-for file in glob.glob('*.html'):
-    # Skip backup files and temporary files
-    if any(x in file for x in ['backup', 'pre_treatment', '_P2', 'testimonial_img',
-                                 '.alt_', '.seo_', '.perf_', '.aria_', '.schema_',
-                                '.content_fix_', '.interactions_', '.contrast_',
-                                '.mobile_', '.brand_', '.trust_', '.alt_enhanced_',
-                                '.testimonials_', '.cta_', '.faq_', 'temp_']):
-        continue
-    html_files.append(file)
-
-print(f"Found {len(html_files)} HTML files to update:")
-for f in sorted(html_files):
-    print(f"  - {f}")
-
-updated_count = 0
-
-for html_file in html_files:
-    try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        original_content = content
-
-        # Update address
-        content = content.replace(OLD_ADDRESS, NEW_ADDRESS)
-
-        # Update phone display
-        content = content.replace(OLD_PHONE_DISPLAY, NEW_PHONE_DISPLAY)
-
-        # Update phone tel link
-        content = content.replace(OLD_PHONE_TEL, NEW_PHONE_TEL)
-
-        # Add email if footer links exist but no email (check if address exists but email doesn't)
-        if NEW_ADDRESS in content and EMAIL not in content:
-            # Pattern to find the phone link and add email after it
-            pattern = r'(<a href="tel:\+15618954000" class="footer_link">\(\+1\) 561 895 4000</a>)'
-            replacement = r'\1<a href="mailto:info@evolifewellness.com" class="footer_link">info@evolifewellness.com</a>'
-            content = re.sub(pattern, replacement, content)
-
-        # Only write if changes were made
-        if content != original_content:
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-            print(f"✓ Updated: {html_file}")
-            updated_count += 1
-        else:
-            print(f"  No changes needed: {html_file}")
-
-    except Exception as e:
-        print(f"✗ Error updating {html_file}: {e}")
-
-print(f"\n{'='*50}")
-print(f"Update complete! Updated {updated_count} of {len(html_files)} files.")
+# Literal rewrites, applied together in one scan
+CONTACT_REPLACEMENTS = [
+    (OLD_ADDRESS, NEW_ADDRESS),
+    (OLD_PHONE_DISPLAY, NEW_PHONE_DISPLAY),
+    (OLD_PHONE_TEL, NEW_PHONE_TEL),
+]
+CONTACT_MATCHER = compile_literals(CONTACT_REPLACEMENTS)
+
+CHANGE_MESSAGES = {
+    OLD_ADDRESS: "  - Updated address",
+    OLD_PHONE_DISPLAY: "  - Updated phone number",
+    OLD_PHONE_TEL: "  - Updated phone link",
+}
+
+# Backup and temporary file markers to skip
+SKIP_MARKERS = ['backup', 'pre_treatment', '_P2', 'testimonial_img',
+                '.alt_', '.seo_', '.perf_', '.aria_', '.schema_',
+                '.content_fix_', '.interactions_', '.contrast_',
+                '.mobile_', '.brand_', '.trust_', '.alt_enhanced_',
+                '.testimonials_', '.cta_', '.faq_', 'temp_']
+
+def update_contact_info(content):
+    """Update address, phone and email in a page"""
+    changes = []
+
+    # Update address, phone display and phone tel link
+    content, counts = replace_literals(content, CONTACT_MATCHER)
+    for old, message in CHANGE_MESSAGES.items():
+        if counts.get(old):
+            changes.append(message)
+
+    # Add email if footer links exist but no email (check if address exists but email doesn't)
+    if NEW_ADDRESS in content and EMAIL not in content:
+        # Pattern to find the phone link and add email after it
+        pattern = r'(<a href="tel:\+15618954000" class="footer_link">\(\+1\) 561 895 4000</a>)'
+        replacement = r'\1<a href="mailto:info@evolifewellness.com" class="footer_link">info@evolifewellness.com</a>'
+        content, count = re.subn(pattern, replacement, content)
+        if count:
+            changes.append("  - Added email link")
+
+    return content, changes
+
+def main():
+    """Main execution"""
+    # Get all main HTML files (excluding backups, node_modules, and treatment-pages)
+    html_files = []
+    for file in glob.glob('*.html'):
+        # Skip backup files and temporary files
+        if any(x in file for x in SKIP_MARKERS):
+            continue
+        html_files.append(file)
+
+    print(f"Found {len(html_files)} HTML files to update:")
+    for f in sorted(html_files):
+        print(f"  - {f}")
+
+    updated_count = 0
+
+    for html_file in html_files:
+        try:
+            with open(html_file, 'r', encoding='utf-8') as f:
+                content = f.read()
+
+            new_content, changes = update_contact_info(content)
+
+            # Only write if changes were made
+            if changes:
+                write_page(html_file, new_content, content)
+                print(f"✓ Updated: {html_file}")
+                updated_count += 1
+            else:
+                print(f"  No changes needed: {html_file}")
+
+        except Exception as e:
+            print(f"✗ Error updating {html_file}: {e}")
+
+    print(f"\n{'='*50}")
+    print(f"Update complete! Updated {updated_count} of {len(html_files)} files.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Rebuild pages while their sources are edited: evolife watch
+The pages, data/, components/, design-system/ and assets/ are watched through inotify,
+or by polling where inotify is unavailable. A burst of events is collected until it
+settles, the changed files are mapped through the dependency graph to the pages built
+from them, and those pages get only their due passes - run in this process, whose pass
+modules, compiled rules and product template stay loaded between rebuilds
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import deps
+import pipeline
+from backup_store import RUN_ID, append_journal, journal_entry
+from build_cache import load_manifest, record_page, save_manifest
+from generate_product_pages import DATA_PATH, load_products, render_products, stale_products
+from page_writer import sync_writes
+from parallel import add_jobs_argument, keep_pool, map_pages
+
+WATCHED_DIRS = ['data', 'components', 'design-system', 'assets']
+
+# Quiet time that ends a burst of events (an editor's save, a checkout, a build's own writes)
+DEBOUNCE_MS = 50
+POLL_INTERVAL = 0.1
+
+# Written by the build itself, or by editors while saving
+IGNORED_SUFFIXES = ('.tmp', '.swp', '.swx', '~', '.gz', '.br')
+
+# inotify(7)
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+def is_watched(base_path, path):
+    """True for pages and tool scripts at the site root and for files in the watched folders"""
+    try:
+        parts = Path(path).relative_to(base_path).parts
+    except ValueError:
+        return False
+    if not parts or any(part.startswith('.') for part in parts) or parts[-1].endswith(IGNORED_SUFFIXES):
+        return False
+    if len(parts) == 1:
+        return parts[0].endswith('.py') or (parts[0].endswith('.html') and pipeline.is_source_page(Path(path)))
+    return parts[0] in WATCHED_DIRS
+
+class InotifyWatcher:
+    """Changed paths reported by inotify; folders created later are watched as they appear"""
+
+    kind = 'inotify'
+
+    def __init__(self, base_path):
+        self.base_path = Path(base_path)
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+        self.add_watch(self.base_path)
+        for name in WATCHED_DIRS:
+            self.add_tree(self.base_path / name)
+
+    def add_watch(self, path):
+        """Watch one directory"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {path}")
+        self.dirs[wd] = Path(path)
+
+    def add_tree(self, root):
+        """Watch a directory and every one below it; returns the files already in them"""
+        files = []
+        for dir_path, dir_names, file_names in os.walk(root):
+            dir_names[:] = [name for name in dir_names if not name.startswith('.')]
+            self.add_watch(dir_path)
+            files += [Path(dir_path) / name for name in file_names]
+        return files
+
+    def read(self, timeout):
+        """Paths changed within timeout seconds (None waits); None if the kernel dropped events"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0'))
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None or not name:
+                continue
+
+            path = directory / name
+            changed.add(path)
+            # A new folder may already hold files by the time it is watched
+            if (mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO) and not name.startswith('.')
+                    and (directory != self.base_path or name in WATCHED_DIRS)):
+                changed.update(self.add_tree(path))
+        return changed
+
+    def close(self):
+        """Release the inotify descriptor"""
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Changed paths found by comparing mtimes and sizes every POLL_INTERVAL"""
+
+    kind = 'polling'
+
+    def __init__(self, base_path):
+        self.base_path = Path(base_path)
+        self.stats = self.scan()
+
+    def scan(self):
+        """Stat of every watched file"""
+        paths = [path for path in self.base_path.iterdir() if path.is_file()]
+        for name in WATCHED_DIRS:
+            paths += [path for path in (self.base_path / name).rglob('*') if path.is_file()]
+        stats = {}
+        for path in paths:
+            if is_watched(self.base_path, path):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def read(self, timeout):
+        """Paths changed within timeout seconds (None waits)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(POLL_INTERVAL if deadline is None else max(0, min(POLL_INTERVAL, deadline - time.monotonic())))
+            stats = self.scan()
+            changed = {path for path in stats.keys() | self.stats.keys() if stats.get(path) != self.stats.get(path)}
+            self.stats = stats
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        """Nothing to release"""
+
+def open_watcher(base_path, poll=False):
+    """An inotify watcher, or a polling one if asked for or if inotify is unavailable"""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(base_path)
+        except (OSError, AttributeError) as e:
+            print(f"⚠ inotify unavailable ({e}) - polling instead")
+    return PollingWatcher(base_path)
+
+def next_changes(watcher, base_path, debounce):
+    """Wait for a burst of changes and return its watched paths once no event came for debounce seconds
+
+    None means events were lost, so anything may have changed.
+    """
+    changed = set()
+    overflowed = False
+    while True:
+        events = watcher.read(debounce if changed or overflowed else None)
+        if events is None:
+            overflowed = True
+            continue
+        events = {path for path in events if is_watched(base_path, path)}
+        if not events and (changed or overflowed):
+            return None if overflowed else changed
+        changed |= events
+
+def affected_pages(graph, base_path, changed):
+    """{page: [steps]} recorded as built from the changed paths"""
+    pages = {}
+    for path in changed:
+        for page_name, steps in deps.dependents(graph, deps.node_name(base_path, path)).items():
+            pages.setdefault(page_name, []).extend(steps)
+    return pages
+
+def warm_up(base_path):
+    """Run the passes over every page in memory, so the first edit finds modules imported and caches filled"""
+    for file_path in pipeline.find_pages(base_path, pipeline.PASSES):
+        pipeline.run_passes(file_path.read_text(encoding='utf-8'), file_path, pipeline.PASSES)
+
+def rebuild(base_path, changed, jobs=1):
+    """Bring the pages built from the changed paths up to date; every page when changed is None
+
+    Returns (log lines, pages written); no lines means nothing was due, as after the
+    events of the build's own writes.
+    """
+    base_path = Path(base_path)
+    manifest = load_manifest(base_path)
+    graph = deps.load_graph(base_path)
+    journal = []
+    written = []
+    log = []
+
+    if changed is None:
+        affected = None
+        candidates = {path.name for path in pipeline.find_pages(base_path, pipeline.PASSES)}
+    else:
+        affected = affected_pages(graph, base_path, changed)
+        candidates = set(affected) | {path.name for path in changed if path.parent == base_path}
+
+    # Product pages first; the pipeline then finishes them like any other page
+    if affected is None or base_path / DATA_PATH in changed or any('products' in steps for steps in affected.values()):
+        products = stale_products(base_path, graph, load_products(base_path))
+        for page_name, blob in render_products(base_path, graph, products, jobs):
+            if blob is None:
+                continue
+            if blob:
+                journal.append(journal_entry(page_name, blob, 'product-pages'))
+            written.append(base_path / page_name)
+            candidates.add(page_name)
+            log.append(f"  - {page_name}: rendered from {DATA_PATH}")
+
+    file_paths = [base_path / name for name in sorted(candidates)
+                  if name.endswith('.html') and pipeline.is_source_page(base_path / name) and (base_path / name).exists()]
+    hashes = {file_path: pipeline.pass_hashes(file_path, pipeline.PASSES) for file_path in file_paths}
+    plans = {file_path: pipeline.stale_passes(manifest, graph, base_path, file_path, hashes[file_path])
+             for file_path in file_paths}
+    stale_paths = [file_path for file_path in file_paths if plans[file_path][0]]
+
+    items = [(file_path, plans[file_path][0]) for file_path in stale_paths]
+    for file_path, (page_name, report, blob, sha256, inputs, _diff, paths) in zip(
+            stale_paths, map_pages(pipeline.process_page, items, jobs)):
+        written += paths
+        record_page(manifest, file_path, sha256, hashes[file_path], changed=blob is not None,
+                    resumed=plans[file_path][1])
+        for name, input_paths in inputs.items():
+            deps.record_page(graph, base_path, page_name, name, input_paths)
+        if blob is not None:
+            journal.append(journal_entry(page_name, blob, 'watch'))
+        names = plans[file_path][0]
+        log.append(f"  - {page_name}: {names[0] if len(names) == 1 else f'{len(names)} passes'}, "
+                   f"{'updated' if blob is not None else 'unchanged'}")
+        log += [f"    {change.strip()}" for _name, changes in report for change in changes if 'Warning' in change]
+
+    if stale_paths or journal:
+        sync_writes(written)
+        save_manifest(base_path, manifest)
+        deps.save_graph(base_path, graph)
+    if journal:
+        append_journal(base_path, journal)
+    return log, len(journal)
+
+def describe(base_path, changed):
+    """Short list of changed paths for the log"""
+    if changed is None:
+        return "events were dropped - checking every page"
+    names = sorted(path.relative_to(base_path).as_posix() for path in changed)
+    return ', '.join(names[:3]) + (f" and {len(names) - 3} more" if len(names) > 3 else '')
+
+def main(argv=None):
+    """Main execution"""
+    parser = argparse.ArgumentParser(description="Rebuild the pages affected by each edit, as it is saved")
+    parser.add_argument('--poll', action='store_true', help="poll for changes instead of using inotify")
+    parser.add_argument('--debounce', type=int, default=DEBOUNCE_MS, metavar='MS',
+                        help="quiet time that ends a burst of changes (default: %(default)s)")
+    add_jobs_argument(parser)
+    args = parser.parse_args(argv)
+    sys.stdout.reconfigure(line_buffering=True)
+
+    print("\n" + "="*60)
+    print("EVOLIFE - WATCH")
+    print("="*60)
+
+    base_path = Path(__file__).parent
+    if args.jobs != 1:
+        keep_pool(args.jobs)
+
+    # Catch up on edits made while nothing was watching
+    started = time.perf_counter()
+    log, updated = rebuild(base_path, None, args.jobs)
+    for line in log:
+        print(line)
+    warm_up(base_path)
+    print(f"✓ Up to date: {updated} pages updated, passes loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    watcher = open_watcher(base_path, args.poll)
+    print(f"✓ Watching pages, {', '.join(f'{name}/' for name in WATCHED_DIRS)} ({watcher.kind}) - Ctrl+C to stop")
+
+    try:
+        while True:
+            changed = next_changes(watcher, base_path, args.debounce / 1000)
+            scripts = sorted(path.name for path in changed or () if path.suffix == '.py')
+            if scripts:
+                # Pass rules live in the scripts: start over with the new code
+                print(f"\n⚠ {', '.join(scripts)} changed - restarting")
+                watcher.close()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+
+            started = time.perf_counter()
+            log, updated = rebuild(base_path, changed, args.jobs)
+            if log:
+                print(f"\n[{datetime.now():%H:%M:%S}] {describe(base_path, changed)}")
+                for line in log:
+                    print(line)
+                print(f"✓ {updated} pages updated in {(time.perf_counter() - started) * 1000:.0f} ms")
+    except KeyboardInterrupt:
+        watcher.close()
+        print("\n" + "="*60)
+        print(f"WATCH STOPPED (undo this session with: python3 backup_store.py restore PAGE {RUN_ID})")
+        print("="*60)
+
+if __name__ == "__main__":
+    main()